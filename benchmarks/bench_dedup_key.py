@@ -0,0 +1,182 @@
+"""
+Dedup Key Benchmark
+===================
+Compares storage layouts for the ``kpi_facts`` dedup key on synthetic
+CUIC-shaped data: insert throughput, the per-report range load the
+diff-based upsert performs, update throughput, and on-disk size per
+table/index.
+
+  current     id rowid + UNIQUE (report_key, data_datetime, metric_key,
+              category_key) — the layout created by migrations 5/6
+  row_key     64-bit hash of the key in its own UNIQUE index; the diff
+              range scan still needs (report_key, data_datetime)
+  clustered   WITHOUT ROWID, PRIMARY KEY on the natural key (no id column)
+
+Usage:
+    python benchmarks/bench_dedup_key.py
+    python benchmarks/bench_dedup_key.py --reports 40 --days 30 --intervals 48
+
+Runs in a temporary directory with plain sqlite3; the real database is
+never touched.
+"""
+
+import os
+import time
+import random
+import struct
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+_COLUMNS = "report_key, metric_key, category_key, data_datetime, data_date, scrape_timestamp, value"
+
+LAYOUTS = {
+    'current': """
+        CREATE TABLE kpi_facts (
+            id INTEGER PRIMARY KEY, report_key INTEGER NOT NULL, metric_key INTEGER NOT NULL,
+            category_key INTEGER NOT NULL, data_datetime TEXT NOT NULL, data_date TEXT NOT NULL,
+            scrape_timestamp TEXT NOT NULL, value TEXT NOT NULL, value_num REAL,
+            value_kind INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE UNIQUE INDEX idx_facts_dedup ON kpi_facts (report_key, data_datetime, metric_key, category_key);
+        CREATE INDEX idx_facts_data_date ON kpi_facts (data_date);
+    """,
+    'row_key': """
+        CREATE TABLE kpi_facts (
+            id INTEGER PRIMARY KEY, row_key INTEGER NOT NULL, report_key INTEGER NOT NULL,
+            metric_key INTEGER NOT NULL, category_key INTEGER NOT NULL, data_datetime TEXT NOT NULL,
+            data_date TEXT NOT NULL, scrape_timestamp TEXT NOT NULL, value TEXT NOT NULL,
+            value_num REAL, value_kind INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE UNIQUE INDEX idx_facts_row_key ON kpi_facts (row_key);
+        CREATE INDEX idx_facts_report_datetime ON kpi_facts (report_key, data_datetime);
+        CREATE INDEX idx_facts_data_date ON kpi_facts (data_date);
+    """,
+    'clustered': """
+        CREATE TABLE kpi_facts (
+            report_key INTEGER NOT NULL, data_datetime TEXT NOT NULL, metric_key INTEGER NOT NULL,
+            category_key INTEGER NOT NULL, data_date TEXT NOT NULL, scrape_timestamp TEXT NOT NULL,
+            value TEXT NOT NULL, value_num REAL, value_kind INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (report_key, data_datetime, metric_key, category_key)
+        ) WITHOUT ROWID;
+        CREATE INDEX idx_facts_data_date ON kpi_facts (data_date);
+    """,
+}
+
+
+def row_key(report_key: int, metric_key: int, category_key: int, data_datetime: str) -> int:
+    """Stable signed 64-bit hash of the dedup key (fits SQLite INTEGER)."""
+    digest = hashlib.blake2b(f"{report_key}\x1f{metric_key}\x1f{category_key}\x1f{data_datetime}".encode(),
+                             digest_size=8).digest()
+    return struct.unpack('<q', digest)[0]
+
+
+def _batches(reports: int, days: int, intervals: int, metrics: int, categories: int):
+    """One batch per report, like one replace-mode upsert per report."""
+    rng = random.Random(42)
+    first = date.today() - timedelta(days=days)
+    step = 24 * 60 // intervals
+    for r in range(1, reports + 1):
+        batch = []
+        for d in range(days):
+            day = (first + timedelta(days=d)).isoformat()
+            for i in range(intervals):
+                stamp = f"{day} {i * step // 60:02d}:{i * step % 60:02d}:00"
+                for m in range(1, metrics + 1):
+                    for c in range(1, categories + 1):
+                        batch.append((r, m, c, stamp, day, '2026-01-01 00:00:00', f"{rng.randrange(5000):,}"))
+        yield batch
+
+
+def _index_sizes(conn: sqlite3.Connection) -> str:
+    try:
+        sizes = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY name").fetchall()
+    except sqlite3.OperationalError:
+        return '(dbstat not available)'
+    return ', '.join(f"{name} {size / 1e6:.1f}" for name, size in sizes if name != 'sqlite_schema')
+
+
+def run_layout(name: str, path: str, batches, days: int) -> dict:
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(LAYOUTS[name])
+    keyed = name == 'row_key'
+    insert_sql = (
+        f"INSERT INTO kpi_facts (row_key, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)" if keyed
+        else f"INSERT INTO kpi_facts ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+    )
+    total = 0
+    started = time.perf_counter()
+    for batch in batches:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(insert_sql, ((row_key(*row[:4]),) + row for row in batch) if keyed else batch)
+        conn.execute("COMMIT")
+        total += len(batch)
+    insert_s = time.perf_counter() - started
+
+    # What _current_facts does for an incremental CUIC run: the last few days of one report.
+    reports = conn.execute("SELECT MAX(report_key) FROM kpi_facts").fetchone()[0]
+    since = (date.today() - timedelta(days=min(days, 5))).isoformat()
+    started = time.perf_counter()
+    loaded = []
+    for r in range(1, reports + 1):
+        loaded.extend(conn.execute(
+            "SELECT report_key, metric_key, category_key, data_datetime FROM kpi_facts "
+            "WHERE report_key = ? AND data_datetime BETWEEN ? AND ?", (r, since, '9999')
+        ).fetchall())
+    load_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    if keyed:
+        conn.executemany("UPDATE kpi_facts SET value = 'x' WHERE row_key = ?", ((row_key(*key),) for key in loaded))
+    else:
+        conn.executemany(
+            "UPDATE kpi_facts SET value = 'x' WHERE report_key = ? AND metric_key = ? "
+            "AND category_key = ? AND data_datetime = ?", loaded
+        )
+    conn.execute("COMMIT")
+    update_s = time.perf_counter() - started
+
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    result = {
+        'rows': total,
+        'insert_rps': total / insert_s,
+        'load_ms': load_s * 1000,
+        'update_rps': len(loaded) / update_s if update_s else 0.0,
+        'file_mb': os.path.getsize(path) / 1e6,
+        'objects': _index_sizes(conn),
+    }
+    conn.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--reports', type=int, default=20)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--intervals', type=int, default=24)
+    parser.add_argument('--metrics', type=int, default=12)
+    parser.add_argument('--categories', type=int, default=6)
+    args = parser.parse_args()
+
+    batches = list(_batches(args.reports, args.days, args.intervals, args.metrics, args.categories))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in LAYOUTS:
+            results[name] = run_layout(name, os.path.join(tmp, f"{name}.db"), batches, args.days)
+
+    print(f"{results['current']['rows']:,} rows\n")
+    print(f"{'layout':<11}{'insert rows/s':>15}{'range load ms':>15}{'update rows/s':>15}{'file MB':>10}")
+    for name, r in results.items():
+        print(f"{name:<11}{r['insert_rps']:>15,.0f}{r['load_ms']:>15.0f}{r['update_rps']:>15,.0f}{r['file_mb']:>10.1f}")
+    print("\nSize per table/index (MB):")
+    for name, r in results.items():
+        print(f"  {name:<11}{r['objects']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Export Format Benchmark
+=======================
+Compares the CSV projection with the Parquet exporter on a synthetic
+database: file size and write time for the same export window.
+
+Usage:
+    python benchmarks/bench_export_formats.py
+    python benchmarks/bench_export_formats.py --reports 40 --days 30 --intervals 48
+
+Runs entirely in a temporary directory; output/ and the real database are
+never touched.  Requires pyarrow for the Parquet half.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import core.database as db
+import core.parquet_export as parquet_export
+from core.parquet_export import PARQUET_FILENAME, export_parquet
+
+
+def _populate(reports: int, days: int, intervals: int, metrics: int, categories: int) -> int:
+    """Fill the temp database with CUIC-shaped interval data. Returns rows written."""
+    rng = random.Random(42)
+    today = datetime.now()
+    step = 24 * 60 // intervals
+    total = 0
+    for r in range(reports):
+        rows = []
+        for d in range(days):
+            day = (today - timedelta(days=d)).strftime('%Y-%m-%d')
+            for i in range(intervals):
+                stamp = f"{day} {i * step // 60:02d}:{i * step % 60:02d}:00"
+                for m in range(metrics):
+                    kind = m % 3
+                    for c in range(categories):
+                        if kind == 0:
+                            value = f"{rng.random() * 100:.1f}%"
+                        elif kind == 1:
+                            value = f"00:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+                        else:
+                            value = f"{rng.randrange(5000):,}"
+                        rows.append({
+                            'data_datetime': stamp,
+                            'metric_title': f"CUIC_Report {r} Metric Header {m}",
+                            'category': f"Call_Type_Group_{c}",
+                            'value': value,
+                        })
+        result = db.upsert_metrics(
+            'cuic', rows, replace_report=True,
+            report_id=f"{r:032x}", report_name=f"Benchmark Report {r}",
+        )
+        total += result.inserted
+    return total
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--reports', type=int, default=20)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--intervals', type=int, default=24)
+    parser.add_argument('--metrics', type=int, default=12)
+    parser.add_argument('--categories', type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db._db_path = lambda: os.path.join(tmp, 'kpi_data.db')
+        db.get_global_settings = parquet_export.get_global_settings = lambda: {'csv_export_days': args.days}
+        db.init_db()
+
+        print(f"Populating {args.reports} reports x {args.days} days x {args.intervals} intervals ...")
+        rows = _populate(args.reports, args.days, args.intervals, args.metrics, args.categories)
+
+        csv_s = _timed(lambda: db.export_csv(tmp, shared_drive_path='', force=True))
+        parquet_s = _timed(lambda: export_parquet(tmp, shared_drive_path='', force=True))
+        csv_mb = os.path.getsize(os.path.join(tmp, db.CSV_FILENAME)) / 1e6
+        parquet_mb = os.path.getsize(os.path.join(tmp, PARQUET_FILENAME)) / 1e6
+        db.close_connections()
+
+    print(f"\n{rows:,} rows")
+    print(f"{'format':<10}{'size MB':>10}{'write s':>10}")
+    print(f"{'csv':<10}{csv_mb:>10.2f}{csv_s:>10.2f}")
+    print(f"{'parquet':<10}{parquet_mb:>10.2f}{parquet_s:>10.2f}")
+    print(f"\nParquet is {csv_mb / parquet_mb:.1f}x smaller")
+
+
+if __name__ == '__main__':
+    main()
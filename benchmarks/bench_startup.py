@@ -0,0 +1,133 @@
+"""
+Startup Benchmark
+=================
+Measures the cold start of the two entry points in fresh interpreters:
+
+  run.py              interpreter start -> ``core.driver`` imported, workers
+                      discovered and the first worker module loaded (the
+                      work every run, and every spawned worker process, pays
+                      before a browser is started)
+  settings_server.py  interpreter start -> ``settings_server`` imported
+
+For each target it prints the wall-clock median over ``--runs`` launches,
+an ``-X importtime`` breakdown (self time summed per top-level package),
+and which heavy dependencies (pandas, Playwright, pyarrow) were imported.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --check
+
+``--check`` compares against ``benchmarks/startup_thresholds.json`` and
+exits 1 when a median exceeds its ``median_ms`` or a ``forbidden_modules``
+entry was imported — run it after touching imports in core/ or workers/.
+Nothing is written; the driver's log handler may create an empty dated log.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_thresholds.json')
+
+HEAVY_MODULES = ('pandas', 'numpy', 'playwright', 'pyarrow')
+
+_READY = "import sys, json; print('READY ' + json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)), flush=True)"
+
+TARGETS = {
+    'run.py': (
+        "import core.driver as driver\n"
+        "driver.load_worker_module(sorted(driver.discover_workers())[0])\n"
+    ),
+    'settings_server.py': "import settings_server\n",
+}
+
+
+def _child_code(target: str) -> str:
+    return TARGETS[target] + _READY.format(heavy=HEAVY_MODULES)
+
+
+def time_start(target: str) -> tuple:
+    """Launch one interpreter; return (ms until READY, heavy modules loaded)."""
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-c', _child_code(target)], cwd=PROJECT_ROOT,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        for line in proc.stdout:
+            if line.startswith('READY '):
+                elapsed = (time.perf_counter() - started) * 1000
+                return elapsed, json.loads(line[6:])
+    finally:
+        proc.stdout.close()
+        proc.wait()
+    raise RuntimeError(f"{target}: child exited with {proc.returncode} before it was ready")
+
+
+def import_breakdown(target: str, top: int) -> list:
+    """``-X importtime`` self time summed per top-level package, largest first (ms)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _child_code(target)], cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    totals = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        totals[name.strip().split('.')[0]] += int(self_us)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [(name, us / 1000) for name, us in ranked[:top]]
+
+
+def _load_thresholds() -> dict:
+    with open(THRESHOLDS_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=12, help='packages shown in the import breakdown')
+    parser.add_argument('--check', action='store_true', help='fail on a regression past startup_thresholds.json')
+    args = parser.parse_args()
+
+    thresholds = _load_thresholds() if args.check else {}
+    failures = []
+    for target in TARGETS:
+        time_start(target)  # warm the OS file cache and __pycache__
+        samples, heavy = [], []
+        for _ in range(max(1, args.runs)):
+            elapsed, heavy = time_start(target)
+            samples.append(elapsed)
+        median = statistics.median(samples)
+
+        print(f"{target}: median {median:.0f} ms, min {min(samples):.0f} ms over {len(samples)} run(s)")
+        print(f"  heavy modules imported: {', '.join(heavy) or 'none'}")
+        print("  import self time by package (ms):")
+        for name, ms in import_breakdown(target, args.top):
+            print(f"    {name:<28}{ms:>8.1f}")
+
+        limits = thresholds.get(target, {})
+        if limits.get('median_ms') and median > limits['median_ms']:
+            failures.append(f"{target}: median {median:.0f} ms > {limits['median_ms']} ms")
+        forbidden = sorted(set(heavy) & set(limits.get('forbidden_modules', [])))
+        if forbidden:
+            failures.append(f"{target}: imports {', '.join(forbidden)} at startup")
+        print()
+
+    if args.check:
+        if failures:
+            print("STARTUP REGRESSION:\n  " + "\n  ".join(failures))
+            sys.exit(1)
+        print(f"Within {os.path.basename(THRESHOLDS_PATH)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -81,6 +81,7 @@ def _rule_diagnose(source: str, report_id: str, label: str, events: List[Dict[st
     error_streak = _status_streak(events, "error")
     no_data_streak = _status_streak(events, "no_data")
     skipped_streak = _status_streak(events, "skipped")
+    timeout_streak = _status_streak(events, "timeout")
 
     evidence = {
         "report_id": report_id,
@@ -90,11 +91,29 @@ def _rule_diagnose(source: str, report_id: str, label: str, events: List[Dict[st
         "error_streak": error_streak,
         "no_data_streak": no_data_streak,
         "skipped_streak": skipped_streak,
+        "timeout_streak": timeout_streak,
         "last_timestamp": last.get("timestamp", ""),
         "data_type": (cfg or {}).get("data_type", "ongoing"),
         "enabled": (cfg or {}).get("enabled", True),
     }
 
+    if last_status == "timeout":
+        return {
+            "source": source,
+            "report_id": report_id,
+            "report_label": label,
+            "severity": "high" if timeout_streak >= 2 else "medium",
+            "confidence": 0.9,
+            "suspected_root_cause": "time_budget_exceeded",
+            "why": "The report was stopped at its time budget or at the run deadline.",
+            "recommended_actions": [
+                "Check the log for the wait point named in the message (wizard step, grid scroll, ...).",
+                "Raise this report's time_budget if it is legitimately slow.",
+                "If several reports time out together, raise run_deadline or reduce the reports per run.",
+            ],
+            "evidence": evidence,
+        }
+
     if last_status == "error":
         if _contains_any(msg_l, ["sso", "microsoft", "login", "mfa", "session expired", "auth"]):
             return {
@@ -303,7 +322,6 @@ def build_report_insight(
         return {"error": "source and report_label are required"}
 
     lookback = max(50, min(_parse_int(lookback, 500), 5000))
-    events = get_scrape_log(lookback)
     cfg_idx = _config_index()
     cfg_by_label = {
         ((rep or {}).get('label') or '').strip(): rep
@@ -311,6 +329,9 @@ def build_report_insight(
     }
     requested_cfg = cfg_by_label.get(report_label)
     requested_id = ((requested_cfg or {}).get('report_id') or '').strip()
+    events = get_scrape_log(
+        lookback, source=source, report_id=requested_id, report_label=report_label
+    )
     scoped = [
         e for e in events
         if (e.get("source") or "").strip().lower() == source
@@ -353,6 +374,7 @@ def build_health_summary() -> Dict[str, Any]:
     err = sum(1 for r in latest if (r.get("status") or "").lower() == "error")
     no_data = sum(1 for r in latest if (r.get("status") or "").lower() == "no_data")
     skipped = sum(1 for r in latest if (r.get("status") or "").lower() == "skipped")
+    timeout = sum(1 for r in latest if (r.get("status") or "").lower() == "timeout")
 
     success_rate = round((ok / total) * 100, 1) if total else 0.0
 
@@ -362,6 +384,7 @@ def build_health_summary() -> Dict[str, Any]:
         "error": err,
         "no_data": no_data,
         "skipped": skipped,
+        "timeout": timeout,
         "success_rate": success_rate,
     }
 
@@ -7,10 +7,13 @@ Handles common operations like browser setup, login patterns, and error handling
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-from playwright.sync_api import sync_playwright, Browser, Page, BrowserContext
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
 import logging
 import os
+import time
+
+if TYPE_CHECKING:  # Playwright is imported when a browser is started (setup_browser)
+    from playwright.sync_api import Browser, Page, BrowserContext
 
 
 DEFAULT_HEADLESS_VIEWPORT = {'width': 1920, 'height': 1080}
@@ -27,6 +30,24 @@ except ImportError:
     def get_global_settings(): return {}
     def get_log_dir(): return 'logs'
 
+
+class ReportTimeout(Exception):
+    """Raised at a wait point once the current report's time budget (or the run deadline) is spent."""
+
+
+# Wall-clock (time.time()) deadline of the current driver run; None = unlimited.
+_run_deadline: Optional[float] = None
+
+
+def set_run_deadline(deadline: Optional[float]):
+    """Set by the driver before a worker runs (in the worker's own process)."""
+    global _run_deadline
+    _run_deadline = deadline
+
+
+def get_run_deadline() -> Optional[float]:
+    return _run_deadline
+
 # Note: logging is configured by driver.py which adds FileHandler.
 # Do NOT call basicConfig here — it would prevent the driver's FileHandler from being added.
 
@@ -51,10 +72,12 @@ class BaseWorker(ABC):
     
     def __init__(self):
         self.logger = logging.getLogger(self.SOURCE_NAME)
-        self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
-        self.page: Optional[Page] = None
+        self.browser: Optional['Browser'] = None
+        self.context: Optional['BrowserContext'] = None
+        self.page: Optional['Page'] = None
         self._playwright = None
+        self._report_deadline: Optional[float] = None
+        self._report_budget_s = 0
 
     def _browser_launch_args(self, headed: bool) -> List[str]:
         args = [
@@ -101,7 +124,7 @@ class BaseWorker(ABC):
             f"context={persistence}, window={window_policy}"
         )
 
-    def _normalize_page_layout(self, page: Page, headless: bool):
+    def _normalize_page_layout(self, page: 'Page', headless: bool):
         if headless:
             return
         try:
@@ -149,7 +172,7 @@ class BaseWorker(ABC):
         except Exception as e:
             self.logger.debug(f"Viewport logging skipped: {e}")
     
-    def setup_browser(self, headless: bool = None, use_system_chrome: bool = None, ignore_https_errors: bool = True, storage_state: str = None) -> Page:
+    def setup_browser(self, headless: bool = None, use_system_chrome: bool = None, ignore_https_errors: bool = True, storage_state: str = None) -> 'Page':
         """
         Initialize Playwright browser with common settings.
         Settings are read from config/settings.json unless explicitly overridden.
@@ -166,6 +189,7 @@ class BaseWorker(ABC):
             use_system_chrome = cfg.get('use_system_chrome', True)
         self._screenshot_steps = cfg.get('screenshot_steps', False)
         self._screenshot_errors = cfg.get('screenshot_errors', True)
+        from playwright.sync_api import sync_playwright
         self._playwright = sync_playwright().start()
         headed = not headless
         launch_args = self._browser_launch_args(headed=headed)
@@ -344,6 +368,124 @@ class BaseWorker(ABC):
         except Exception as e:
             self.logger.debug(f"Screenshot '{name}' failed: {e}")
 
+    # ── Time budgets ──────────────────────────────────────────────────────
+    # Enforced cooperatively: loops and fixed waits call budget_wait() /
+    # check_budget(), Playwright timeouts are capped with budget_timeout().
+
+    def start_report_budget(self, report: Dict[str, Any], started: float = None):
+        """Start the clock for one report (``time_budget``, capped by the run deadline).
+
+        *started* (``time.time()``) resumes a budget whose clock started
+        earlier, for workers that work on a report in several phases.
+        """
+        from core.config import get_report_budget_seconds
+
+        self._report_budget_s = get_report_budget_seconds(report)
+        if started is None:
+            started = time.time()
+        self._report_deadline = started + self._report_budget_s if self._report_budget_s else None
+
+    def clear_report_budget(self):
+        self._report_deadline = None
+        self._report_budget_s = 0
+
+    def run_deadline_passed(self) -> bool:
+        return _run_deadline is not None and time.time() >= _run_deadline
+
+    def budget_left(self) -> float:
+        """Seconds until the report budget or the run deadline, whichever is first."""
+        deadlines = [d for d in (self._report_deadline, _run_deadline) if d is not None]
+        return min(deadlines) - time.time() if deadlines else float('inf')
+
+    def budget_timeout(self, timeout_ms: int) -> int:
+        """*timeout_ms* capped to the remaining budget (at least 1 ms), for Playwright calls."""
+        left = self.budget_left()
+        if left == float('inf'):
+            return timeout_ms
+        return max(1, min(int(timeout_ms), int(left * 1000) + 1))
+
+    def check_budget(self, where: str = ''):
+        """Raise ReportTimeout if the budget is spent."""
+        if self.budget_left() > 0:
+            return
+        if self._report_deadline is not None and (_run_deadline is None or self._report_deadline <= _run_deadline):
+            reason = f"Time budget of {self._report_budget_s}s exceeded"
+        else:
+            reason = "Run deadline reached"
+        raise ReportTimeout(f"{reason} ({where})" if where else reason)
+
+    def budget_wait(self, timeout_ms: int, where: str = '', page: 'Page' = None):
+        """``page.wait_for_timeout`` that stops at the budget, then raises ReportTimeout if it is spent."""
+        self.check_budget(where)
+        (page or self.page).wait_for_timeout(self.budget_timeout(timeout_ms))
+        self.check_budget(where)
+
+    # Slack for refresh_interval: a report scraped at the start of one cycle
+    # must still be due at the matching cycle one interval later.
+    FRESHNESS_SLACK_S = 60
+
+    def fresh_skip_reason(self, report: Dict[str, Any], report_id: str, definition_hash: str) -> str:
+        """Why *report* can be skipped this run because of its ``refresh_interval`` ('' = scrape it).
+
+        Age is measured from the start of the last successful scrape.
+        """
+        from core.config import get_report_refresh_seconds
+        from core.database import last_successful_scrape
+
+        interval = get_report_refresh_seconds(report)
+        if not interval or report.get('data_type') == 'historical':
+            return ''
+        last = last_successful_scrape(self.SOURCE_NAME, report_id, definition_hash)
+        if not last:
+            return ''
+        try:
+            started = datetime.strptime(last[0], '%Y-%m-%d %H:%M:%S').timestamp() - float(last[1] or 0)
+        except (TypeError, ValueError):
+            return ''
+        age = datetime.now().timestamp() - started
+        if 0 <= age < interval - self.FRESHNESS_SLACK_S:
+            return f"Fresh - scraped {age / 60:.0f} min ago, refresh every {interval / 60:g} min"
+        return ''
+
+    def fresh_run_result(self, reports: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        If no report in *reports* is due (fresh, or historical and already
+        scraped), log each as skipped and return the run result, so the
+        worker can return without starting a browser.  None if any is due.
+        """
+        from core.config import get_report_definition_hash
+        from core.database import has_historical_data, log_scrape
+
+        skipped = []
+        for report in reports:
+            report_id = report.get('report_id', '')
+            definition_hash = get_report_definition_hash(self.SOURCE_NAME, report)
+            if report.get('data_type') == 'historical' and has_historical_data(
+                self.SOURCE_NAME, report_id, definition_hash
+            ):
+                reason = 'Historical data already exists'
+            else:
+                reason = self.fresh_skip_reason(report, report_id, definition_hash)
+            if not reason:
+                return None
+            skipped.append((report.get('label') or report_id, report_id, definition_hash, reason))
+
+        self.logger.info(f"All {len(skipped)} report(s) are fresh - no browser needed this run")
+        batches = []
+        for label, report_id, definition_hash, reason in skipped:
+            log_scrape(
+                self.SOURCE_NAME, label, 'skipped', 0, 0, reason,
+                report_id=report_id, definition_hash=definition_hash,
+            )
+            batches.append({
+                'report_id': report_id,
+                'definition_hash': definition_hash,
+                'report_name': label,
+                'status': 'skipped',
+                'rows': [],
+            })
+        return {'report_batches': batches, 'worker_success': True}
+
     def run(self) -> Dict[str, Any]:
         """
         Execute the worker with proper setup and teardown.
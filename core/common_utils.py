@@ -9,11 +9,13 @@ Supports two data formats:
 """
 
 import os
-import pandas as pd
-from datetime import datetime
-from typing import Dict, Any, List, Set, Union
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Any, List, Set, Union
 import logging
 
+if TYPE_CHECKING:  # pandas is only imported by the legacy CSV helpers below
+    import pandas as pd
+
 try:
     from core.config import get_output_dir, get_docs_dir, PROJECT_ROOT
     from core.database import init_db, upsert_metrics, export_csv, cleanup_old_data, migrate_csv_to_db
@@ -43,7 +45,7 @@ def get_output_path(filename: str, output_dir: str = None) -> str:
     return os.path.join(output_dir, filename)
 
 
-def load_or_create_csv(output_dir: str = None, use_long_format: bool = True) -> pd.DataFrame:
+def load_or_create_csv(output_dir: str = None, use_long_format: bool = True) -> 'pd.DataFrame':
     """
     Load existing CSV or create a new one with base columns.
     
@@ -54,6 +56,7 @@ def load_or_create_csv(output_dir: str = None, use_long_format: bool = True) ->
     Returns:
         pandas DataFrame with the appropriate columns
     """
+    import pandas as pd
     csv_path = get_output_path(CSV_FILENAME, output_dir)
     columns = LONG_FORMAT_COLUMNS if use_long_format else WIDE_FORMAT_COLUMNS
     
@@ -71,7 +74,7 @@ def load_or_create_csv(output_dir: str = None, use_long_format: bool = True) ->
 
 
 
-def save_csv(df: pd.DataFrame, output_dir: str = None):
+def save_csv(df: 'pd.DataFrame', output_dir: str = None):
     """Save DataFrame to CSV file (atomic write to prevent partial reads)."""
     csv_path = get_output_path(CSV_FILENAME, output_dir)
     tmp_path = csv_path + ".tmp"
@@ -85,11 +88,11 @@ def save_csv(df: pd.DataFrame, output_dir: str = None):
 # ============================================================
 
 def update_snapshot_long(
-    df: pd.DataFrame,
+    df: 'pd.DataFrame',
     source_name: str,
     data: List[Dict[str, Any]],
     current_date: str = None
-) -> pd.DataFrame:
+) -> 'pd.DataFrame':
     """
     Update or insert snapshot rows using LONG format (idempotent).
     
@@ -107,6 +110,7 @@ def update_snapshot_long(
     Returns:
         Updated DataFrame
     """
+    import pandas as pd
     if current_date is None:
         current_date = datetime.now().strftime('%Y-%m-%d')
     
@@ -159,7 +163,8 @@ def update_snapshot_long(
 def process_worker_result_long(
     source_name: str,
     data: List[Dict[str, Any]],
-    output_dir: str = None
+    output_dir: str = None,
+    write_results: list = None
 ) -> bool:
     """
     Process worker results: write to SQLite (source of truth).
@@ -169,6 +174,8 @@ def process_worker_result_long(
         source_name: Worker identifier (e.g., 'smax')
         data: List of dicts with keys: metric_title, category, value
         output_dir: Output directory (defaults to script directory)
+        write_results: Optional list; the database WriteResult is appended
+            so the caller can tell whether anything actually changed
         
     Returns:
         True if successful, False otherwise
@@ -178,7 +185,9 @@ def process_worker_result_long(
         init_db()
 
         # Upsert into SQLite (single transaction, instant)
-        upsert_metrics(source_name, data)
+        result = upsert_metrics(source_name, data)
+        if write_results is not None:
+            write_results.append(result)
         
         # Update data dictionary for any new metrics
         current_metrics = set(item.get('metric_title', '') for item in data)
@@ -197,9 +206,14 @@ def process_worker_result_long(
 def process_worker_report_batches(
     source_name: str,
     report_batches: List[Dict[str, Any]],
-    output_dir: str = None
+    output_dir: str = None,
+    write_results: list = None
 ) -> bool:
-    """Persist per-report scrape batches with replace-on-completion semantics."""
+    """Persist per-report scrape batches with replace-on-completion semantics.
+
+    Each report is diffed against its stored rows; the per-report
+    WriteResult is appended to *write_results* when a list is given.
+    """
     try:
         init_db()
         processed_any = False
@@ -216,7 +230,7 @@ def process_worker_report_batches(
                 continue
 
             rows = batch.get('rows') or []
-            upsert_metrics(
+            result = upsert_metrics(
                 source_name,
                 rows,
                 replace_report=True,
@@ -224,6 +238,8 @@ def process_worker_report_batches(
                 definition_hash=str(batch.get('definition_hash', '') or ''),
                 report_name=str(batch.get('report_name', '') or ''),
             )
+            if write_results is not None:
+                write_results.append(result)
             current_metrics.update(
                 item.get('metric_title', '') for item in rows if item.get('metric_title')
             )
@@ -342,11 +358,11 @@ Use the table below to find the exact name of the metric you want to display.
 
 
 def update_snapshot(
-    df: pd.DataFrame,
+    df: 'pd.DataFrame',
     source_name: str,
     data: Dict[str, Any],
     current_date: str = None
-) -> pd.DataFrame:
+) -> 'pd.DataFrame':
     """
     Update or insert a snapshot row using the idempotent replacement logic.
     
@@ -364,6 +380,7 @@ def update_snapshot(
     Returns:
         Updated DataFrame
     """
+    import pandas as pd
     if current_date is None:
         current_date = datetime.now().strftime('%Y-%m-%d')
     
@@ -400,6 +417,8 @@ def update_snapshot(
 
 def get_existing_columns(output_dir: str = None) -> Set[str]:
     """Get the set of columns currently in the CSV."""
+    import pandas as pd
+
     csv_path = get_output_path(CSV_FILENAME, output_dir)
     
     if os.path.exists(csv_path):
@@ -523,7 +542,7 @@ def process_worker_result(
         return False
 
 
-def get_latest_snapshot(source_name: str = None, output_dir: str = None) -> pd.DataFrame:
+def get_latest_snapshot(source_name: str = None, output_dir: str = None) -> 'pd.DataFrame':
     """
     Get the latest snapshot(s) from the CSV.
     
@@ -564,7 +583,7 @@ def cleanup_old_data(days_to_keep: int = 90, output_dir: str = None):
     if df.empty:
         return
     
-    cutoff_date = (datetime.now() - pd.Timedelta(days=days_to_keep)).strftime('%Y-%m-%d')
+    cutoff_date = (datetime.now() - timedelta(days=days_to_keep)).strftime('%Y-%m-%d')
     df = df[df['date'] >= cutoff_date]
     
     save_csv(df, output_dir)
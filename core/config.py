@@ -168,11 +168,59 @@ def get_report_definition_hash(worker_name: str, report: Dict[str, Any]) -> str:
         payload = deepcopy(report)
         payload.pop('label', None)
         payload.pop('enabled', None)
+        payload.pop('refresh_interval', None)
+        payload.pop('time_budget', None)
         payload.pop(REPORT_ID_KEY, None)
 
     return hashlib.sha256(_stable_json(payload).encode('utf-8')).hexdigest()
 
 
+_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def _duration_seconds(value: Any, name: str) -> int:
+    """Minutes as a number, or a string with a unit: ``"90s"``, ``"15m"``, ``"2h"``, ``"1d"``."""
+    if value in (None, '', 0, False):
+        return 0
+    try:
+        if isinstance(value, str):
+            text = value.strip().lower()
+            if text[-1:] in _DURATION_UNITS:
+                return max(0, int(float(text[:-1]) * _DURATION_UNITS[text[-1]]))
+            value = float(text)
+        return max(0, int(float(value) * 60))
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid {name} {value!r}")
+        return 0
+
+
+def get_report_refresh_seconds(report: Dict[str, Any]) -> int:
+    """Seconds a successful scrape of *report* stays fresh (0 = scrape every run).
+
+    ``refresh_interval`` is minutes as a number, or a string with a unit:
+    ``"90s"``, ``"15m"``, ``"2h"``, ``"1d"``.  It is not part of the
+    definition hash, so changing the cadence keeps the report's history.
+    """
+    return _duration_seconds((report or {}).get('refresh_interval'), 'refresh_interval')
+
+
+def get_report_budget_seconds(report: Dict[str, Any]) -> int:
+    """Time budget for one scrape of *report* (0 = only the run deadline applies).
+
+    The report's ``time_budget``, else the global ``report_time_budget``;
+    same format as ``refresh_interval``.  Not part of the definition hash.
+    """
+    value = (report or {}).get('time_budget')
+    if value in (None, ''):
+        value = get_global_settings().get('report_time_budget')
+    return _duration_seconds(value, 'time_budget')
+
+
+def get_run_deadline_seconds() -> int:
+    """Seconds a driver run may take before workers stop starting reports (0 = no deadline)."""
+    return _duration_seconds(get_global_settings().get('run_deadline'), 'run_deadline')
+
+
 # ══════════════════════════════════════════════════════════════════════════
 #  PUBLIC API
 # ══════════════════════════════════════════════════════════════════════════
@@ -285,7 +333,34 @@ def _default_settings() -> dict:
             "output_dir": "output",
             "log_dir": "logs",
             "data_retention_days": 90,
-            "shared_drive_csv": ""
+            "scrape_log_retention_days": 180,
+            "shared_drive_csv": "",
+            "shared_drive_parquet": "",
+            "shared_drive_partition_dir": "",
+            "export_formats": ["csv"],
+            "value_history": False,
+            "storage_layout": "single",
+            "shard_hot_months": 2,
+            "max_parallel_workers": 2,
+            "run_deadline": "",
+            "report_time_budget": "",
+            "daemon": {
+                "interval_minutes": 5,
+                "keep_worker_processes": True
+            },
+            "sqlite": {
+                "synchronous": "NORMAL",
+                "busy_timeout_ms": 5000,
+                "cache_size_kb": 16384,
+                "mmap_size_mb": 64,
+                "temp_store": "memory",
+                "reader_pool_size": 4
+            },
+            "vacuum": {
+                "incremental_pages": 1000,
+                "max_incremental_passes": 10,
+                "full_vacuum_hour": 3
+            }
         },
         "workers": {
             "cuic": {
@@ -12,13 +12,23 @@ The CSV is a *projection* of the database, not the other way around.
 """
 
 import os
+import csv
+import json
+import time
+import shutil
+import atexit
+import signal
 import sqlite3
 import logging
 import hashlib
-import pandas as pd
+import threading
+from collections import defaultdict
+from contextlib import AbstractContextManager
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, NamedTuple, Optional
 
+from core.db_connection import ConnectionManager
+from core.value_kinds import VALUE_KIND_NAMES, parse_value
 from core.config import (
     get_output_dir,
     get_global_settings,
@@ -28,6 +38,9 @@ from core.config import (
     REPORT_ID_KEY,
 )
 
+if TYPE_CHECKING:  # pandas is only imported by the DataFrame helpers below
+    import pandas as pd
+
 logger = logging.getLogger('database')
 
 # ── Paths ─────────────────────────────────────────────────────────────────
@@ -40,13 +53,48 @@ def _db_path() -> str:
     return os.path.join(get_output_dir(), DB_FILENAME)
 
 
-def _get_conn() -> sqlite3.Connection:
-    """Open a connection with WAL mode for safe concurrent reads."""
-    conn = sqlite3.connect(_db_path(), timeout=10)
-    conn.execute("PRAGMA journal_mode=WAL")      # safe for readers
-    conn.execute("PRAGMA synchronous=NORMAL")     # good perf, still safe
-    conn.execute("PRAGMA busy_timeout=5000")
-    return conn
+def _sqlite_options() -> Dict[str, Any]:
+    """Connection pragmas from settings.json ``global.sqlite``."""
+    return get_global_settings().get('sqlite', {}) or {}
+
+
+# One writer + thread-local readers per process (see core/db_connection.py).
+_connections = ConnectionManager(lambda: _db_path(), _sqlite_options)
+
+
+def transaction() -> AbstractContextManager[sqlite3.Connection]:
+    """Context manager: one write transaction on the shared writer connection."""
+    return _connections.transaction()
+
+
+def read_connection() -> AbstractContextManager[sqlite3.Connection]:
+    """Context manager: a pooled read connection for the calling thread."""
+    return _connections.reader()
+
+
+def window_connection(start_date: str = None, end_date: str = None) -> AbstractContextManager[sqlite3.Connection]:
+    """Context manager: a read connection that also sees monthly shards in the window.
+
+    Same as ``read_connection()`` unless shard files overlap the dates
+    (see ``core/shards.py``).
+    """
+    from core.shards import window_reader
+    return window_reader(start_date, end_date)
+
+
+def window_connections(start_date: str = None, end_date: str = None) -> Iterator[sqlite3.Connection]:
+    """Yield read connections that together cover every shard in the window.
+
+    For windows that may span more monthly shards than one connection can
+    attach; run the same query on each and combine (see ``core/shards.py``).
+    """
+    from core.shards import window_readers
+    return window_readers(start_date, end_date)
+
+
+def close_connections():
+    """Close all pooled connections (e.g. before the output dir changes)."""
+    _connections.close_all()
 
 
 # ══════════════════════════════════════════════════════════════════════════
@@ -100,12 +148,23 @@ def _ensure_column(conn: sqlite3.Connection, table_name: str, column_name: str,
         conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_sql}")
 
 
+def _execute_script(conn: sqlite3.Connection, script: str):
+    """Run a multi-statement DDL script inside the caller's transaction.
+
+    ``executescript()`` would COMMIT first, so statements are issued one by one.
+    """
+    for statement in script.split(';'):
+        if statement.strip():
+            conn.execute(statement)
+
+
 def _legacy_report_id(source: str, label: str) -> str:
     raw = f"{source.strip().lower()}|{label.strip()}".encode('utf-8')
     return f"legacy:{hashlib.sha1(raw).hexdigest()}"
 
 
-def _sync_report_identity_from_settings(conn: sqlite3.Connection):
+def _settings_report_identities():
+    """Yield ``(source, label, report_id, definition_hash)`` for each configured report."""
     settings = get_settings() or {}
     workers = settings.get('workers', {})
 
@@ -117,17 +176,21 @@ def _sync_report_identity_from_settings(conn: sqlite3.Connection):
 
             if not label or not report_id:
                 continue
+            yield source_name, label, report_id, definition_hash
 
-            conn.execute(
-                "UPDATE kpi_snapshots SET report_id = ?, definition_hash = ? "
-                "WHERE source = ? AND report_name = ? AND (report_id = '' OR definition_hash = '')",
-                (report_id, definition_hash, source_name, label),
-            )
-            conn.execute(
-                "UPDATE scrape_log SET report_id = ?, definition_hash = ? "
-                "WHERE source = ? AND report_label = ? AND (report_id = '' OR definition_hash = '')",
-                (report_id, definition_hash, source_name, label),
-            )
+
+def _sync_report_identity_from_settings(conn: sqlite3.Connection):
+    for source_name, label, report_id, definition_hash in _settings_report_identities():
+        conn.execute(
+            "UPDATE kpi_snapshots SET report_id = ?, definition_hash = ? "
+            "WHERE source = ? AND report_name = ? AND (report_id = '' OR definition_hash = '')",
+            (report_id, definition_hash, source_name, label),
+        )
+        conn.execute(
+            "UPDATE scrape_log SET report_id = ?, definition_hash = ? "
+            "WHERE source = ? AND report_label = ? AND (report_id = '' OR definition_hash = '')",
+            (report_id, definition_hash, source_name, label),
+        )
 
 
 def _backfill_legacy_report_identity(conn: sqlite3.Connection):
@@ -154,6 +217,90 @@ def _backfill_legacy_report_identity(conn: sqlite3.Connection):
         )
 
 
+def _sync_blank_report_ids():
+    """Give rows stored without a report_id the id of the configured report with their label.
+
+    Runs on every ``init_db`` (once per process): rows imported from a legacy
+    CSV, or logged before a report had an id, get the id and definition of
+    the settings entry with the same label, as before normalization.  Only
+    rows with ``report_id = ''`` are touched, and when there are none this is
+    a few index seeks.  Facts already rotated into monthly shards are left
+    as they are.
+    """
+    identities = list(_settings_report_identities())
+    if not identities:
+        return
+    sources = sorted({identity[0] for identity in identities})
+    with read_connection() as conn:
+        blank_reports = {
+            source: key for key, source in conn.execute("SELECT id, source FROM reports WHERE report_id = ''")
+        }
+        blank_logs = [
+            source for source in sources
+            if conn.execute("SELECT 1 FROM scrape_log WHERE source = ? AND report_id = '' LIMIT 1", (source,)).fetchone()
+        ]
+    if not blank_reports and not blank_logs:
+        return
+
+    with transaction() as conn:
+        for source, label, report_id, definition_hash in identities:
+            if source in blank_logs and conn.execute(
+                "UPDATE scrape_log SET report_id = ?, definition_hash = ? "
+                "WHERE source = ? AND report_label = ? AND report_id = ''",
+                (report_id, definition_hash, source, label),
+            ).rowcount:
+                conn.execute(
+                    "DELETE FROM scrape_status_latest WHERE source = ? AND report_identity = ? AND report_id = ''",
+                    (source, label),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO scrape_status_latest (source, report_identity, log_id, timestamp, "
+                    "report_id, definition_hash, report_label, status, row_count, duration_s, message) "
+                    "SELECT source, report_id, id, timestamp, report_id, definition_hash, report_label, "
+                    "status, row_count, duration_s, message FROM scrape_log "
+                    "WHERE id = (SELECT MAX(id) FROM scrape_log WHERE source = ? AND report_id = ?)",
+                    (source, report_id),
+                )
+
+            blank_key = blank_reports.get(source)
+            if blank_key is None:
+                continue
+            versions = [row[0] for row in conn.execute(
+                "SELECT id FROM report_versions WHERE report_key = ? AND report_name = ?", (blank_key, label)
+            )]
+            if not versions:
+                continue
+            marks = ', '.join('?' for _ in versions)
+            days = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT data_date FROM kpi_facts WHERE report_key = ? AND version_key IN ({marks})",
+                (blank_key, *versions),
+            )]
+            if not days:
+                continue
+            conn.execute(_UPSERT_REPORT_SQL, (source, report_id, definition_hash, label))
+            report_key = conn.execute(
+                "SELECT id FROM reports WHERE source = ? AND report_id = ?", (source, report_id)
+            ).fetchone()[0]
+            version_key = _dimension_keys(
+                conn, 'report_versions', ('report_key', 'definition_hash', 'report_name'),
+                [(report_key, definition_hash, label)],
+            )[(report_key, definition_hash, label)]
+            # A key the report already holds keeps its newer, id-carrying row.
+            conn.execute(
+                f"UPDATE OR IGNORE kpi_facts SET report_key = ?, version_key = ? "
+                f"WHERE report_key = ? AND version_key IN ({marks})",
+                (report_key, version_key, blank_key, *versions),
+            )
+            conn.execute(
+                "UPDATE reports SET last_seen = MAX(last_seen, COALESCE("
+                "(SELECT MAX(scrape_timestamp) FROM kpi_facts WHERE report_key = reports.id), '')) WHERE id = ?",
+                (report_key,),
+            )
+            _touch_days(conn, days)
+            _refresh_rollups(conn, [(key, day) for key in (blank_key, report_key) for day in days])
+            logger.info(f"Assigned report_id {report_id} to {source} rows labelled '{label}'")
+
+
 def _dedupe_kpi_snapshots(conn: sqlite3.Connection) -> int:
     cur = conn.execute(
         "DELETE FROM kpi_snapshots WHERE id NOT IN ("
@@ -164,63 +311,624 @@ def _dedupe_kpi_snapshots(conn: sqlite3.Connection) -> int:
     return cur.rowcount or 0
 
 
-def init_db():
-    """Create table + dedup index if they don't exist."""
-    conn = _get_conn()
+# ── Versioned migrations ──────────────────────────────────────────────────
+# Each step runs exactly once per database and is recorded in schema_version.
+# Steps must stay idempotent so databases created before versioning existed
+# (which already carry some of these changes) can replay them safely.
+
+_CREATE_SCHEMA_VERSION = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version    INTEGER PRIMARY KEY,
+    name       TEXT    NOT NULL,
+    applied_at TEXT    NOT NULL
+);
+"""
+
+
+def _migrate_base_tables(conn: sqlite3.Connection):
+    conn.execute(_CREATE_TABLE)
+    conn.execute(_CREATE_SCRAPE_LOG)
+    cols = _get_table_columns(conn, 'kpi_snapshots')
+    if 'data_date' in cols and 'data_datetime' not in cols:
+        conn.execute("ALTER TABLE kpi_snapshots ADD COLUMN data_datetime TEXT NOT NULL DEFAULT ''")
+        if 'interval' in cols:
+            conn.execute(
+                "UPDATE kpi_snapshots SET data_datetime = "
+                "CASE WHEN COALESCE(interval, '') <> '' THEN TRIM(data_date || ' ' || interval) ELSE COALESCE(data_date, '') END "
+                "WHERE COALESCE(data_datetime, '') = ''"
+            )
+        else:
+            conn.execute(
+                "UPDATE kpi_snapshots SET data_datetime = COALESCE(data_date, '') "
+                "WHERE COALESCE(data_datetime, '') = ''"
+            )
+    _ensure_column(conn, 'kpi_snapshots', 'report_name', "report_name TEXT NOT NULL DEFAULT ''")
+    _ensure_column(conn, 'kpi_snapshots', 'report_id', "report_id TEXT NOT NULL DEFAULT ''")
+    _ensure_column(conn, 'kpi_snapshots', 'definition_hash', "definition_hash TEXT NOT NULL DEFAULT ''")
+    _ensure_column(conn, 'scrape_log', 'report_id', "report_id TEXT NOT NULL DEFAULT ''")
+    _ensure_column(conn, 'scrape_log', 'definition_hash', "definition_hash TEXT NOT NULL DEFAULT ''")
+
+
+def _migrate_report_identity(conn: sqlite3.Connection):
+    _sync_report_identity_from_settings(conn)
+    _backfill_legacy_report_identity(conn)
+
+
+def _migrate_dedup_index(conn: sqlite3.Connection):
+    deleted_duplicates = _dedupe_kpi_snapshots(conn)
+    if deleted_duplicates:
+        logger.warning(f"Removed {deleted_duplicates} duplicate KPI snapshot rows during schema migration")
+    conn.execute("DROP INDEX IF EXISTS idx_kpi_dedup")
+    conn.execute(_CREATE_INDEX)
+    conn.execute("DELETE FROM kpi_snapshots WHERE metric_title = 'Unknown Report'")
+
+
+def _migrate_data_date(conn: sqlite3.Connection):
+    # Databases from before data_datetime already carry a data_date column;
+    # the backfill below makes it consistent with data_datetime either way.
+    _ensure_column(conn, 'kpi_snapshots', 'data_date', "data_date TEXT NOT NULL DEFAULT ''")
+    conn.execute(
+        "UPDATE kpi_snapshots SET data_date = substr(data_datetime, 1, 10) "
+        "WHERE data_date IS NOT substr(data_datetime, 1, 10)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_kpi_data_date ON kpi_snapshots (data_date)")
+
+
+# ── Normalized storage ────────────────────────────────────────────────────
+# Long strings (source, report ids, definition hashes, metric titles, call
+# types) are stored once in small lookup tables; the fact table holds integer
+# keys only.  The kpi_snapshots VIEW keeps the original wide projection.
+# A fact is identified by its report (report_key); the label and definition
+# it was written under are a separate key (version_key), so renaming or
+# redefining a report does not relabel its history.
+
+_CREATE_DIMENSIONS = """
+CREATE TABLE IF NOT EXISTS reports (
+    id              INTEGER PRIMARY KEY,
+    source          TEXT    NOT NULL,
+    report_id       TEXT    NOT NULL DEFAULT '',
+    definition_hash TEXT    NOT NULL DEFAULT '',   -- latest definition written
+    report_name     TEXT    NOT NULL DEFAULT '',   -- latest settings label
+    UNIQUE (source, report_id)
+);
+CREATE TABLE IF NOT EXISTS report_versions (
+    id              INTEGER PRIMARY KEY,
+    report_key      INTEGER NOT NULL REFERENCES reports (id),
+    definition_hash TEXT    NOT NULL DEFAULT '',
+    report_name     TEXT    NOT NULL DEFAULT '',
+    UNIQUE (report_key, definition_hash, report_name)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    id           INTEGER PRIMARY KEY,
+    metric_title TEXT    NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS categories (
+    id           INTEGER PRIMARY KEY,
+    category     TEXT    NOT NULL DEFAULT '',
+    sub_category TEXT    NOT NULL DEFAULT '',
+    UNIQUE (category, sub_category)
+);
+"""
+
+_CREATE_FACTS = """
+CREATE TABLE IF NOT EXISTS kpi_facts (
+    id               INTEGER PRIMARY KEY,
+    report_key       INTEGER NOT NULL REFERENCES reports (id),
+    version_key      INTEGER NOT NULL REFERENCES report_versions (id),
+    metric_key       INTEGER NOT NULL REFERENCES metrics (id),
+    category_key     INTEGER NOT NULL REFERENCES categories (id),
+    data_datetime    TEXT    NOT NULL DEFAULT '',
+    data_date        TEXT    NOT NULL DEFAULT '',
+    scrape_timestamp TEXT    NOT NULL,
+    value            TEXT    NOT NULL DEFAULT ''
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_facts_dedup
+    ON kpi_facts (report_key, data_datetime, metric_key, category_key);
+CREATE INDEX IF NOT EXISTS idx_facts_data_date ON kpi_facts (data_date);
+"""
+
+_CREATE_SNAPSHOT_VIEW = """
+CREATE VIEW IF NOT EXISTS kpi_snapshots AS
+SELECT f.id, f.scrape_timestamp, f.data_datetime, f.data_date,
+       r.source, r.report_id, v.definition_hash, v.report_name,
+       m.metric_title, c.category, c.sub_category, f.value
+FROM kpi_facts f
+JOIN reports    r ON r.id = f.report_key
+JOIN report_versions v ON v.id = f.version_key
+JOIN metrics    m ON m.id = f.metric_key
+JOIN categories c ON c.id = f.category_key;
+"""
+
+
+def _migrate_normalized_storage(conn: sqlite3.Connection):
+    for script in (_CREATE_DIMENSIONS, _CREATE_FACTS):
+        _execute_script(conn, script)
+    # reports carries the latest label/definition; every one a row was
+    # written under is kept in report_versions.
+    conn.execute(
+        "INSERT OR IGNORE INTO reports (source, report_id, definition_hash, report_name) "
+        "SELECT s.source, s.report_id, s.definition_hash, s.report_name FROM kpi_snapshots s "
+        "JOIN (SELECT MAX(id) AS id FROM kpi_snapshots GROUP BY source, report_id) latest ON latest.id = s.id"
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO report_versions (report_key, definition_hash, report_name) "
+        "SELECT DISTINCT r.id, s.definition_hash, s.report_name FROM kpi_snapshots s "
+        "JOIN reports r ON r.source = s.source AND r.report_id = s.report_id"
+    )
+    conn.execute("INSERT OR IGNORE INTO metrics (metric_title) SELECT DISTINCT metric_title FROM kpi_snapshots")
+    conn.execute(
+        "INSERT OR IGNORE INTO categories (category, sub_category) "
+        "SELECT DISTINCT category, sub_category FROM kpi_snapshots"
+    )
+    conn.execute(
+        "INSERT INTO kpi_facts (id, report_key, version_key, metric_key, category_key, "
+        "data_datetime, data_date, scrape_timestamp, value) "
+        "SELECT s.id, r.id, v.id, m.id, c.id, s.data_datetime, s.data_date, s.scrape_timestamp, s.value "
+        "FROM kpi_snapshots s "
+        "JOIN reports    r ON r.source = s.source AND r.report_id = s.report_id "
+        "JOIN report_versions v ON v.report_key = r.id "
+        "AND v.definition_hash = s.definition_hash AND v.report_name = s.report_name "
+        "JOIN metrics    m ON m.metric_title = s.metric_title "
+        "JOIN categories c ON c.category = s.category AND c.sub_category = s.sub_category"
+    )
+    conn.execute("DROP TABLE kpi_snapshots")
+    conn.execute(_CREATE_SNAPSHOT_VIEW)
+
+
+def _sql_value_num(value):
+    return parse_value(value)[0]
+
+
+def _sql_value_kind(value):
+    return parse_value(value)[1]
+
+
+def _migrate_typed_values(conn: sqlite3.Connection):
+    _ensure_column(conn, 'kpi_facts', 'value_num', "value_num REAL")
+    _ensure_column(conn, 'kpi_facts', 'value_kind', "value_kind INTEGER NOT NULL DEFAULT 0")
+    conn.create_function('kpi_value_num', 1, _sql_value_num, deterministic=True)
+    conn.create_function('kpi_value_kind', 1, _sql_value_kind, deterministic=True)
+    conn.execute("UPDATE kpi_facts SET value_num = kpi_value_num(value), value_kind = kpi_value_kind(value)")
+    kind_case = ' '.join(f"WHEN {code} THEN '{name}'" for code, name in sorted(VALUE_KIND_NAMES.items()))
+    conn.execute("DROP VIEW IF EXISTS kpi_snapshots")
+    conn.execute(f"""
+        CREATE VIEW kpi_snapshots AS
+        SELECT f.id, f.scrape_timestamp, f.data_datetime, f.data_date,
+               r.source, r.report_id, v.definition_hash, v.report_name,
+               m.metric_title, c.category, c.sub_category, f.value,
+               f.value_num, CASE f.value_kind {kind_case} END AS value_kind
+        FROM kpi_facts f
+        JOIN reports    r ON r.id = f.report_key
+        JOIN report_versions v ON v.id = f.version_key
+        JOIN metrics    m ON m.id = f.metric_key
+        JOIN categories c ON c.id = f.category_key
+    """)
+
+
+_CREATE_DB_META = """
+CREATE TABLE IF NOT EXISTS db_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL DEFAULT ''
+);
+"""
+
+_CREATE_MAINTENANCE_LOG = """
+CREATE TABLE IF NOT EXISTS maintenance_log (
+    id              INTEGER PRIMARY KEY,
+    timestamp       TEXT    NOT NULL,
+    operation       TEXT    NOT NULL,            -- retention / incremental_vacuum / full_vacuum
+    rows_deleted    INTEGER NOT NULL DEFAULT 0,
+    pages_before    INTEGER NOT NULL DEFAULT 0,
+    pages_after     INTEGER NOT NULL DEFAULT 0,
+    pages_reclaimed INTEGER NOT NULL DEFAULT 0,
+    duration_s      REAL    NOT NULL DEFAULT 0
+);
+"""
+
+
+def _migrate_maintenance_tables(conn: sqlite3.Connection):
+    conn.execute(_CREATE_DB_META)
+    conn.execute(_CREATE_MAINTENANCE_LOG)
+
+
+def _migrate_incremental_auto_vacuum(conn: sqlite3.Connection):
+    # auto_vacuum only takes effect on an existing file after a full VACUUM.
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+_CREATE_SCRAPE_STATUS_LATEST = """
+CREATE TABLE IF NOT EXISTS scrape_status_latest (
+    source          TEXT    NOT NULL,
+    report_identity TEXT    NOT NULL,            -- report_id, or report_label for legacy rows
+    log_id          INTEGER NOT NULL,            -- scrape_log.id of the latest event
+    timestamp       TEXT    NOT NULL,
+    report_id       TEXT    NOT NULL DEFAULT '',
+    definition_hash TEXT    NOT NULL DEFAULT '',
+    report_label    TEXT    NOT NULL DEFAULT '',
+    status          TEXT    NOT NULL,
+    row_count       INTEGER DEFAULT 0,
+    duration_s      REAL    DEFAULT 0,
+    message         TEXT    DEFAULT '',
+    PRIMARY KEY (source, report_identity)
+);
+"""
+
+# Keeps scrape_status_latest current on every scrape_log insert.
+_CREATE_SCRAPE_STATUS_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_scrape_status_latest
+AFTER INSERT ON scrape_log
+BEGIN
+    INSERT OR REPLACE INTO scrape_status_latest (
+        source, report_identity, log_id, timestamp, report_id, definition_hash,
+        report_label, status, row_count, duration_s, message
+    ) VALUES (
+        NEW.source,
+        CASE WHEN COALESCE(NEW.report_id, '') <> '' THEN NEW.report_id ELSE NEW.report_label END,
+        NEW.id, NEW.timestamp, COALESCE(NEW.report_id, ''), COALESCE(NEW.definition_hash, ''),
+        COALESCE(NEW.report_label, ''), NEW.status, NEW.row_count, NEW.duration_s, NEW.message
+    );
+END;
+"""
+
+
+def _migrate_scrape_status_latest(conn: sqlite3.Connection):
+    conn.execute(_CREATE_SCRAPE_STATUS_LATEST)
+    conn.execute(_CREATE_SCRAPE_STATUS_TRIGGER)
+    # One pass over the existing history; afterwards the trigger keeps it current.
+    conn.execute("""
+        INSERT OR REPLACE INTO scrape_status_latest (
+            source, report_identity, log_id, timestamp, report_id, definition_hash,
+            report_label, status, row_count, duration_s, message
+        )
+        SELECT s.source, latest.report_identity, s.id, s.timestamp, COALESCE(s.report_id, ''),
+               COALESCE(s.definition_hash, ''), COALESCE(s.report_label, ''), s.status,
+               s.row_count, s.duration_s, s.message
+        FROM scrape_log s
+        INNER JOIN (
+            SELECT CASE WHEN COALESCE(report_id, '') <> '' THEN report_id ELSE report_label END AS report_identity,
+                   MAX(id) AS max_id
+            FROM scrape_log
+            GROUP BY source, report_identity
+        ) latest ON s.id = latest.max_id
+    """)
+
+
+_CREATE_SCRAPE_LOG_DAILY = """
+CREATE TABLE IF NOT EXISTS scrape_log_daily (
+    day             TEXT    NOT NULL,            -- YYYY-MM-DD of the archived events
+    source          TEXT    NOT NULL,
+    report_identity TEXT    NOT NULL,
+    definition_hash TEXT    NOT NULL DEFAULT '',
+    status          TEXT    NOT NULL,
+    report_id       TEXT    NOT NULL DEFAULT '',
+    report_label    TEXT    NOT NULL DEFAULT '',
+    events          INTEGER NOT NULL DEFAULT 0,
+    rows_total      INTEGER NOT NULL DEFAULT 0,
+    duration_total_s REAL   NOT NULL DEFAULT 0,
+    duration_max_s  REAL    NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, source, report_identity, definition_hash, status)
+);
+"""
+
+# Matched to the scrape_log query shapes: idx_scrape_log_history serves
+# has_historical_data(), last_successful_scrape() (rowid-ordered within the
+# key, so ORDER BY id DESC LIMIT 1 is one seek) and the per-report
+# get_scrape_log() filters used by agent_insights.
+_CREATE_SCRAPE_LOG_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_scrape_log_history
+    ON scrape_log (source, report_id, definition_hash, status);
+CREATE INDEX IF NOT EXISTS idx_scrape_log_label
+    ON scrape_log (source, report_label);
+CREATE INDEX IF NOT EXISTS idx_scrape_log_daily_history
+    ON scrape_log_daily (source, report_id, definition_hash, status);
+"""
+
+
+def _migrate_scrape_log_retention(conn: sqlite3.Connection):
+    conn.execute(_CREATE_SCRAPE_LOG_DAILY)
+    _execute_script(conn, _CREATE_SCRAPE_LOG_INDEXES)
+
+
+_CREATE_DAY_VERSIONS = """
+CREATE TABLE IF NOT EXISTS kpi_day_versions (
+    data_date TEXT    PRIMARY KEY,
+    version   INTEGER NOT NULL                   -- time_ns of the last change to that day
+) WITHOUT ROWID;
+"""
+
+
+def _migrate_day_versions(conn: sqlite3.Connection):
+    conn.execute(_CREATE_DAY_VERSIONS)
+    conn.execute(
+        "INSERT OR IGNORE INTO kpi_day_versions (data_date, version) "
+        "SELECT DISTINCT data_date, ? FROM kpi_facts",
+        (time.time_ns(),),
+    )
+
+
+_CREATE_PUBLISH_TABLES = """
+CREATE TABLE IF NOT EXISTS publish_queue (
+    id              INTEGER PRIMARY KEY,
+    op              TEXT    NOT NULL,            -- copy / delete
+    source_path     TEXT    NOT NULL DEFAULT '',
+    target_path     TEXT    NOT NULL UNIQUE,
+    enqueued_at     TEXT    NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TEXT    NOT NULL,
+    last_error      TEXT    NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS published_files (
+    target_path     TEXT    PRIMARY KEY,
+    source_path     TEXT    NOT NULL,
+    sha256          TEXT    NOT NULL,
+    size            INTEGER NOT NULL,
+    mtime_ns        INTEGER NOT NULL,
+    published_at    TEXT    NOT NULL
+);
+"""
+
+
+def _migrate_publish_queue(conn: sqlite3.Connection):
+    _execute_script(conn, _CREATE_PUBLISH_TABLES)
+
+
+# Hour/day aggregates of value_num per report/metric/category.  Rows whose
+# value has no numeric form (value_kind text) are not counted.  Date-only
+# facts (consolidated daily rows, data_datetime 'YYYY-MM-DD') are not
+# interval data: they stay out of the hour grain and get their own day
+# rollup row (day_level 1) next to the one folded from the hours (day_level 0),
+# so a day total is never added to the intervals it summarises.
+_CREATE_ROLLUPS = """
+CREATE TABLE IF NOT EXISTS kpi_rollup_hour (
+    report_key   INTEGER NOT NULL REFERENCES reports(id),
+    metric_key   INTEGER NOT NULL REFERENCES metrics(id),
+    category_key INTEGER NOT NULL REFERENCES categories(id),
+    bucket       TEXT    NOT NULL,               -- 'YYYY-MM-DD HH'
+    value_kind   INTEGER NOT NULL,
+    n            INTEGER NOT NULL,
+    sum          REAL    NOT NULL,
+    min          REAL    NOT NULL,
+    max          REAL    NOT NULL,
+    PRIMARY KEY (report_key, bucket, metric_key, category_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS kpi_rollup_day (
+    report_key   INTEGER NOT NULL REFERENCES reports(id),
+    metric_key   INTEGER NOT NULL REFERENCES metrics(id),
+    category_key INTEGER NOT NULL REFERENCES categories(id),
+    bucket       TEXT    NOT NULL,               -- 'YYYY-MM-DD'
+    day_level    INTEGER NOT NULL DEFAULT 0,     -- 0: folded from hours, 1: date-only rows
+    value_kind   INTEGER NOT NULL,
+    n            INTEGER NOT NULL,
+    sum          REAL    NOT NULL,
+    min          REAL    NOT NULL,
+    max          REAL    NOT NULL,
+    PRIMARY KEY (report_key, bucket, metric_key, category_key, day_level)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_rollup_hour_bucket ON kpi_rollup_hour (bucket);
+CREATE INDEX IF NOT EXISTS idx_rollup_day_bucket ON kpi_rollup_day (bucket);
+"""
+
+
+def _migrate_rollups(conn: sqlite3.Connection):
+    _execute_script(conn, _CREATE_ROLLUPS)
+    _refresh_rollups(conn, conn.execute("SELECT DISTINCT report_key, data_date FROM kpi_facts").fetchall())
+
+
+# Change-only value history (setting ``value_history``): one row per value a
+# key held, open-ended (valid_to NULL) while it is the current value.
+_CREATE_VALUE_HISTORY = """
+CREATE TABLE IF NOT EXISTS kpi_value_history (
+    report_key    INTEGER NOT NULL REFERENCES reports(id),
+    data_datetime TEXT    NOT NULL,
+    metric_key    INTEGER NOT NULL REFERENCES metrics(id),
+    category_key  INTEGER NOT NULL REFERENCES categories(id),
+    valid_from    TEXT    NOT NULL,
+    valid_to      TEXT,
+    value         TEXT,
+    value_num     REAL,
+    value_kind    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (report_key, data_datetime, metric_key, category_key, valid_from)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_value_history_datetime ON kpi_value_history (data_datetime);
+"""
+
+
+def _migrate_value_history(conn: sqlite3.Connection):
+    _execute_script(conn, _CREATE_VALUE_HISTORY)
+
+
+# scrape_timestamp is when a fact's value was last written (unchanged values
+# are not rewritten); reports.last_seen is when the report last delivered a
+# batch, i.e. when all of its unchanged values were last confirmed.
+def _migrate_report_last_seen(conn: sqlite3.Connection):
+    _ensure_column(conn, 'reports', 'last_seen', "last_seen TEXT NOT NULL DEFAULT ''")
+    conn.execute(
+        "UPDATE reports SET last_seen = COALESCE("
+        "(SELECT MAX(scrape_timestamp) FROM kpi_facts WHERE report_key = reports.id), '')"
+    )
+    kind_case = ' '.join(f"WHEN {code} THEN '{name}'" for code, name in sorted(VALUE_KIND_NAMES.items()))
+    conn.execute("DROP VIEW IF EXISTS kpi_snapshots")
+    conn.execute(f"""
+        CREATE VIEW kpi_snapshots AS
+        SELECT f.id, f.scrape_timestamp, f.data_datetime, f.data_date,
+               r.source, r.report_id, v.definition_hash, v.report_name,
+               m.metric_title, c.category, c.sub_category, f.value,
+               f.value_num, CASE f.value_kind {kind_case} END AS value_kind,
+               r.last_seen
+        FROM kpi_facts f
+        JOIN reports    r ON r.id = f.report_key
+        JOIN report_versions v ON v.id = f.version_key
+        JOIN metrics    m ON m.id = f.metric_key
+        JOIN categories c ON c.id = f.category_key
+    """)
+
+
+# (version, name, step, in_transaction) — append only; never renumber or
+# edit a shipped step.  Steps with in_transaction=False (VACUUM) run on the
+# writer connection outside BEGIN/COMMIT.
+_MIGRATIONS = [
+    (1, 'base tables and legacy columns', _migrate_base_tables, True),
+    (2, 'report identity backfill', _migrate_report_identity, True),
+    (3, 'dedupe snapshots and unique index', _migrate_dedup_index, True),
+    (4, 'indexed data_date column', _migrate_data_date, True),
+    (5, 'normalized dimension tables', _migrate_normalized_storage, True),
+    (6, 'typed numeric values', _migrate_typed_values, True),
+    (7, 'metadata and maintenance log tables', _migrate_maintenance_tables, True),
+    (8, 'incremental auto_vacuum', _migrate_incremental_auto_vacuum, False),
+    (9, 'latest scrape status table', _migrate_scrape_status_latest, True),
+    (10, 'scrape_log archive and indexes', _migrate_scrape_log_retention, True),
+    (11, 'per-day change versions', _migrate_day_versions, True),
+    (12, 'shared-drive publish queue', _migrate_publish_queue, True),
+    (13, 'hourly and daily rollups', _migrate_rollups, True),
+    (14, 'change-only value history', _migrate_value_history, True),
+    (15, 'report last_seen column', _migrate_report_last_seen, True),
+]
+
+SCHEMA_VERSION = _MIGRATIONS[-1][0]
+
+# DB paths already verified as current by this process (init_db fast path).
+_initialized_paths: set[str] = set()
+
+
+def _current_schema_version(conn: sqlite3.Connection) -> int:
     try:
-        conn.execute(_CREATE_TABLE)
-        conn.execute(_CREATE_SCRAPE_LOG)
-        # Schema migrations for existing databases (safe to run repeatedly).
-        cols = _get_table_columns(conn, 'kpi_snapshots')
-        if 'data_date' in cols and 'data_datetime' not in cols:
-            conn.execute("ALTER TABLE kpi_snapshots ADD COLUMN data_datetime TEXT NOT NULL DEFAULT ''")
-            if 'interval' in cols:
-                conn.execute(
-                    "UPDATE kpi_snapshots SET data_datetime = "
-                    "CASE WHEN COALESCE(interval, '') <> '' THEN TRIM(data_date || ' ' || interval) ELSE COALESCE(data_date, '') END "
-                    "WHERE COALESCE(data_datetime, '') = ''"
-                )
-            else:
-                conn.execute(
-                    "UPDATE kpi_snapshots SET data_datetime = COALESCE(data_date, '') "
-                    "WHERE COALESCE(data_datetime, '') = ''"
-                )
-        _ensure_column(conn, 'kpi_snapshots', 'report_name', "report_name TEXT NOT NULL DEFAULT ''")
-        _ensure_column(conn, 'kpi_snapshots', 'report_id', "report_id TEXT NOT NULL DEFAULT ''")
-        _ensure_column(conn, 'kpi_snapshots', 'definition_hash', "definition_hash TEXT NOT NULL DEFAULT ''")
-        _ensure_column(conn, 'scrape_log', 'report_id', "report_id TEXT NOT NULL DEFAULT ''")
-        _ensure_column(conn, 'scrape_log', 'definition_hash', "definition_hash TEXT NOT NULL DEFAULT ''")
-        _sync_report_identity_from_settings(conn)
-        _backfill_legacy_report_identity(conn)
-        deleted_duplicates = _dedupe_kpi_snapshots(conn)
-        if deleted_duplicates:
-            logger.warning(f"Removed {deleted_duplicates} duplicate KPI snapshot rows during schema migration")
-        # Rebuild dedup index
-        conn.execute("DROP INDEX IF EXISTS idx_kpi_dedup")
-        conn.execute(_CREATE_INDEX)
-        conn.execute("DELETE FROM kpi_snapshots WHERE metric_title = 'Unknown Report'")
-        conn.commit()
-        logger.debug("Database initialized")
-    finally:
-        conn.close()
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0] or 0)
+
+
+def _apply_migrations() -> int:
+    """Run every pending migration step in its own transaction. Returns steps applied."""
+    with transaction() as conn:
+        conn.execute(_CREATE_SCHEMA_VERSION)
+    applied = 0
+    for version, name, step, in_transaction in _MIGRATIONS:
+        if not in_transaction:
+            with _connections.writer() as conn:
+                if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                    continue
+                step(conn)
+        with transaction() as conn:
+            # Re-check under the write lock: another process may have migrated.
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                continue
+            if in_transaction:
+                step(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (version, name, datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+            )
+        applied += 1
+        logger.info(f"Applied schema migration {version}: {name}")
+    return applied
+
+
+def init_db():
+    """Bring the schema up to date. Returns immediately once the schema is current."""
+    path = _db_path()
+    if path in _initialized_paths:
+        return
+    with read_connection() as conn:
+        current = _current_schema_version(conn)
+    if current < SCHEMA_VERSION:
+        _apply_migrations()
+    _sync_blank_report_ids()
+    _initialized_paths.add(path)
+    logger.debug("Database initialized")
 
 
 # ══════════════════════════════════════════════════════════════════════════
 #  WRITE  (upsert — insert or replace)
 # ══════════════════════════════════════════════════════════════════════════
 
-_UPSERT_SQL = """
-INSERT INTO kpi_snapshots (scrape_timestamp, data_datetime, source, report_id, definition_hash, report_name, metric_title, category, sub_category, value)
-VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-ON CONFLICT (data_datetime, source, report_id, metric_title, category, sub_category)
+# {facts} is main.kpi_facts or an attached monthly shard's kpi_facts
+# (core/shards.py); fact ids are only unique within one of those tables.
+_INSERT_FACT_SQL = """
+INSERT INTO {facts} (report_key, version_key, metric_key, category_key, data_datetime, data_date, scrape_timestamp, value, value_num, value_kind)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+_UPDATE_FACT_SQL = """
+UPDATE {facts} SET scrape_timestamp = ?, value = ?, value_num = ?, value_kind = ?, version_key = ? WHERE id = ?;
+"""
+
+# History upkeep, keyed by the fact id being updated/deleted.  A key that
+# predates the history (or the setting) is seeded from kpi_facts first; its
+# scrape_timestamp is when that value was written, since unchanged values
+# are never rewritten.
+_SEED_HISTORY_SQL = """
+INSERT OR IGNORE INTO kpi_value_history
+    (report_key, data_datetime, metric_key, category_key, valid_from, value, value_num, value_kind)
+SELECT f.report_key, f.data_datetime, f.metric_key, f.category_key, f.scrape_timestamp, f.value, f.value_num, f.value_kind
+FROM {facts} f
+WHERE f.id = ? AND NOT EXISTS (
+    SELECT 1 FROM kpi_value_history h
+    WHERE h.report_key = f.report_key AND h.data_datetime = f.data_datetime
+      AND h.metric_key = f.metric_key AND h.category_key = f.category_key AND h.valid_to IS NULL
+);
+"""
+
+_CLOSE_HISTORY_SQL = """
+UPDATE kpi_value_history SET valid_to = ?
+WHERE valid_to IS NULL
+  AND (report_key, data_datetime, metric_key, category_key) =
+      (SELECT report_key, data_datetime, metric_key, category_key FROM {facts} WHERE id = ?);
+"""
+
+_OPEN_HISTORY_SQL = """
+INSERT OR REPLACE INTO kpi_value_history
+    (report_key, data_datetime, metric_key, category_key, valid_from, value, value_num, value_kind)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+_UPSERT_REPORT_SQL = """
+INSERT INTO reports (source, report_id, definition_hash, report_name)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (source, report_id)
 DO UPDATE SET
-    scrape_timestamp = excluded.scrape_timestamp,
-    definition_hash  = excluded.definition_hash,
-    report_name      = excluded.report_name,
-    value            = excluded.value;
+    definition_hash = COALESCE(NULLIF(excluded.definition_hash, ''), definition_hash),
+    report_name     = COALESCE(NULLIF(excluded.report_name, ''), report_name)
+WHERE definition_hash IS NOT COALESCE(NULLIF(excluded.definition_hash, ''), definition_hash)
+   OR report_name     IS NOT COALESCE(NULLIF(excluded.report_name, ''), report_name);
 """
 
 
+def _data_date(data_datetime: str) -> str:
+    """Day part of a data_datetime ('YYYY-MM-DD[ HH:MM:SS]') — stored for range scans."""
+    return str(data_datetime or '')[:10]
+
+
+class MetricRow(NamedTuple):
+    """One KPI value in its logical (denormalized) shape, ready to encode."""
+    scrape_timestamp: str
+    data_datetime: str
+    data_date: str
+    source: str
+    report_id: str
+    definition_hash: str
+    report_name: str
+    metric_title: str
+    category: str
+    sub_category: str
+    value: str
+    value_num: Optional[float]
+    value_kind: int
+
+
+def _metric_row(scraped_at: str, data_datetime: str, source: str, report_id: str,
+                definition_hash: str, report_name: str, metric_title: str,
+                category: str, sub_category: str, value: Any) -> MetricRow:
+    """Build a MetricRow, deriving data_date and the parsed numeric value."""
+    value_num, value_kind = parse_value(value)
+    return MetricRow(
+        scraped_at, data_datetime, _data_date(data_datetime), source, report_id,
+        definition_hash, report_name, metric_title, category, sub_category,
+        str(value), value_num, value_kind,
+    )
+
+
 def _build_metric_rows(
     source_name: str,
     data: List[Dict[str, Any]],
@@ -230,13 +938,12 @@ def _build_metric_rows(
     report_id: str = '',
     definition_hash: str = '',
     report_name: str = '',
-) -> List[tuple]:
+) -> List[MetricRow]:
     rows = []
     for item in data:
-        data_datetime = item.get('data_datetime', '') or current_date
-        rows.append((
+        rows.append(_metric_row(
             scraped_at,
-            data_datetime,
+            item.get('data_datetime', '') or current_date,
             source_name,
             item.get('report_id', report_id or ''),
             item.get('definition_hash', definition_hash or ''),
@@ -244,27 +951,303 @@ def _build_metric_rows(
             item.get('metric_title', ''),
             item.get('category', ''),
             item.get('sub_category', ''),
-            str(item.get('value', '')),
+            item.get('value', ''),
         ))
     return rows
 
 
+def _dimension_keys(conn: sqlite3.Connection, table: str, columns: tuple, values) -> Dict[tuple, int]:
+    """Return {value_tuple: surrogate id}, inserting unseen values."""
+    values = list(dict.fromkeys(values))
+    if not values:
+        return {}
+    cols = ', '.join(columns)
+    marks = ', '.join('?' for _ in columns)
+    where = ' AND '.join(f"{col} = ?" for col in columns)
+    conn.executemany(f"INSERT OR IGNORE INTO {table} ({cols}) VALUES ({marks})", values)
+    return {value: conn.execute(f"SELECT id FROM {table} WHERE {where}", value).fetchone()[0] for value in values}
+
+
+def _report_keys(conn: sqlite3.Connection, rows: List[MetricRow]) -> Dict[tuple, int]:
+    """Upsert report dimension rows; the last label/definition in the batch wins.
+
+    Also stamps each report's ``last_seen`` with the batch's latest scrape
+    time — one row per report, while unchanged facts are left untouched.
+    """
+    latest: Dict[tuple, tuple] = {}
+    seen: Dict[tuple, str] = {}
+    for row in rows:
+        key = (row.source, row.report_id)
+        latest[key] = (row.source, row.report_id, row.definition_hash, row.report_name)
+        seen[key] = max(seen.get(key, ''), row.scrape_timestamp)
+    keys = {}
+    for key, values in latest.items():
+        conn.execute(_UPSERT_REPORT_SQL, values)
+        keys[key] = conn.execute(
+            "SELECT id FROM reports WHERE source = ? AND report_id = ?", key
+        ).fetchone()[0]
+    conn.executemany(
+        "UPDATE reports SET last_seen = ? WHERE id = ? AND last_seen < ?",
+        [(seen[key], keys[key], seen[key]) for key in keys],
+    )
+    return keys
+
+
+class WriteResult(NamedTuple):
+    """Row-level outcome of one metric write, so callers can skip work when nothing changed."""
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+    def __add__(self, other):
+        return WriteResult(*(a + b for a, b in zip(self, other)))
+
+
+_MAIN_FACTS = 'main.kpi_facts'
+
+
+def _facts_table(shards: Dict[str, str], data_date: str) -> str:
+    """Table holding the facts of *data_date*: its attached shard, else the main database."""
+    alias = shards.get(data_date[:7]) if shards else None
+    return f"{alias}.kpi_facts" if alias else _MAIN_FACTS
+
+
+def _current_facts(conn: sqlite3.Connection, report_key: int, datetimes=None,
+                   tables=(_MAIN_FACTS,)) -> tuple:
+    """Return ``({(data_datetime, metric_key, category_key): (id, value, table, version_key)}, stale)`` for one report.
+
+    With *datetimes* only that data_datetime range is loaded (dedup index range
+    scan).  *tables* are read in order and a later copy of a key wins, as in
+    shard rotation, so list shards before main; every losing copy is returned
+    in *stale* as ``(table, id, data_datetime)`` for deletion.
+    """
+    sql = "SELECT data_datetime, metric_key, category_key, id, value, version_key FROM {facts} WHERE report_key = ?"
+    params: tuple = (report_key,)
+    if datetimes is not None:
+        sql += " AND data_datetime BETWEEN ? AND ?"
+        params += (min(datetimes), max(datetimes))
+    current: Dict[tuple, tuple] = {}
+    stale: List[tuple] = []
+    for table in tables:
+        for dt, m, c, fact_id, value, version_key in conn.execute(sql.format(facts=table), params):
+            previous = current.get((dt, m, c))
+            if previous is not None:
+                stale.append((previous[2], previous[0], dt))
+            current[(dt, m, c)] = (fact_id, value, table, version_key)
+    return current, stale
+
+
+def _touch_days(conn: sqlite3.Connection, dates):
+    """Bump the change version of each data_date (drives the incremental CSV export)."""
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    conn.executemany(
+        "INSERT INTO kpi_day_versions (data_date, version) VALUES (?, ?) "
+        "ON CONFLICT (data_date) DO UPDATE SET version = MAX(version + 1, excluded.version)",
+        [(date, time.time_ns()) for date in dates],
+    )
+
+
+_ROLLUP_FACT_COLUMNS = 'report_key, metric_key, category_key, data_datetime, value_num, value_kind'
+
+
+def _refresh_rollups(conn: sqlite3.Connection, report_days, shards: Dict[str, str] = None):
+    """Recompute hour and day rollups for each touched (report_key, data_date).
+
+    One report-day is a range scan on the facts dedup index.  Interval rows
+    feed the hour buckets and the day row folded from them (day_level 0);
+    date-only rows are a day total of their own (day_level 1) and are never
+    added to the intervals.  Days of a month in *shards* ({month: attached
+    alias}) are read from that shard together with main.
+    """
+    for report_key, day in sorted(set(report_days)):
+        next_day = (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d') if day else ''
+        facts = _facts_table(shards, day)
+        if facts != _MAIN_FACTS:
+            facts = (
+                f"(SELECT {_ROLLUP_FACT_COLUMNS} FROM {_MAIN_FACTS} "
+                f"UNION ALL SELECT {_ROLLUP_FACT_COLUMNS} FROM {facts})"
+            )
+        conn.execute(
+            "DELETE FROM kpi_rollup_hour WHERE report_key = ? AND bucket >= ? AND bucket < ?",
+            (report_key, day, next_day),
+        )
+        conn.execute(
+            "INSERT INTO kpi_rollup_hour (report_key, metric_key, category_key, bucket, value_kind, n, sum, min, max) "
+            "SELECT report_key, metric_key, category_key, substr(data_datetime, 1, 13), MAX(value_kind), "
+            "COUNT(*), SUM(value_num), MIN(value_num), MAX(value_num) "
+            f"FROM {facts} "
+            "WHERE report_key = ? AND data_datetime >= ? AND data_datetime < ? "
+            "AND length(data_datetime) >= 13 AND value_num IS NOT NULL "
+            "GROUP BY metric_key, category_key, 4",
+            (report_key, day, next_day),
+        )
+        conn.execute("DELETE FROM kpi_rollup_day WHERE report_key = ? AND bucket = ?", (report_key, day))
+        conn.execute(
+            "INSERT INTO kpi_rollup_day "
+            "(report_key, metric_key, category_key, bucket, day_level, value_kind, n, sum, min, max) "
+            "SELECT report_key, metric_key, category_key, ?, 0, MAX(value_kind), SUM(n), SUM(sum), MIN(min), MAX(max) "
+            "FROM kpi_rollup_hour WHERE report_key = ? AND bucket >= ? AND bucket < ? "
+            "GROUP BY metric_key, category_key",
+            (day, report_key, day, next_day),
+        )
+        conn.execute(
+            "INSERT INTO kpi_rollup_day "
+            "(report_key, metric_key, category_key, bucket, day_level, value_kind, n, sum, min, max) "
+            "SELECT report_key, metric_key, category_key, ?, 1, MAX(value_kind), "
+            "COUNT(*), SUM(value_num), MIN(value_num), MAX(value_num) "
+            f"FROM {facts} "
+            "WHERE report_key = ? AND data_datetime >= ? AND data_datetime < ? "
+            "AND length(data_datetime) < 13 AND value_num IS NOT NULL "
+            "GROUP BY metric_key, category_key",
+            (day, report_key, day, next_day),
+        )
+
+
+def _write_history(conn: sqlite3.Connection, closed_at: str, closes: Dict[str, List[tuple]], opens: List[tuple]):
+    """Close the open history interval of each updated/deleted fact id ({table: [(id,)]}), then open the new values."""
+    for table, ids in closes.items():
+        conn.executemany(_SEED_HISTORY_SQL.format(facts=table), ids)
+        conn.executemany(_CLOSE_HISTORY_SQL.format(facts=table), [(closed_at, fact_id) for fact_id, in ids])
+    if opens:
+        conn.executemany(_OPEN_HISTORY_SQL, opens)
+
+
+def _write_metric_rows(conn: sqlite3.Connection, rows: List[MetricRow], *,
+                       replace_report: Optional[tuple] = None,
+                       history: bool = False,
+                       shards: Dict[str, str] = None) -> WriteResult:
+    """Encode *rows* (from ``_build_metric_rows``) and apply only the delta.
+
+    Current values are loaded per report and compared with the batch: new
+    keys are inserted, changed values (or a changed label/definition)
+    updated, identical values left alone.
+    For the ``(source, report_id)`` in *replace_report* every stored row that
+    is missing from the batch is deleted as well.  With *history* every
+    insert/update/delete is also recorded in ``kpi_value_history``.
+
+    *shards* ({month: alias}, see ``core.shards.attached_for_write``) are the
+    monthly shards attached to *conn*: they are diffed together with main,
+    and rows of those months are written to (and deleted from) their shard.
+    """
+    report_keys = _report_keys(conn, rows)
+    if replace_report and replace_report not in report_keys:
+        row = conn.execute(
+            "SELECT id FROM reports WHERE source = ? AND report_id = ?", replace_report
+        ).fetchone()
+        if row is not None:
+            report_keys[replace_report] = row[0]
+            conn.execute(
+                "UPDATE reports SET last_seen = ? WHERE id = ?",
+                (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), row[0]),
+            )
+    if not report_keys:
+        return WriteResult()
+
+    metric_keys = _dimension_keys(conn, 'metrics', ('metric_title',), ((row.metric_title,) for row in rows))
+    category_keys = _dimension_keys(
+        conn, 'categories', ('category', 'sub_category'), ((row.category, row.sub_category) for row in rows)
+    )
+    version_keys = _dimension_keys(
+        conn, 'report_versions', ('report_key', 'definition_hash', 'report_name'),
+        ((report_keys[(row.source, row.report_id)], row.definition_hash, row.report_name) for row in rows),
+    )
+
+    # Encode and group by report; the last row for a key in the batch wins.
+    batches: Dict[int, Dict[tuple, MetricRow]] = {key: {} for key in report_keys.values()}
+    for row in rows:
+        fact_key = (row.data_datetime, metric_keys[(row.metric_title,)], category_keys[(row.category, row.sub_category)])
+        batches[report_keys[(row.source, row.report_id)]][fact_key] = row
+
+    replace_key = report_keys.get(replace_report) if replace_report else None
+    tables = [f"{alias}.kpi_facts" for alias in (shards or {}).values()] + [_MAIN_FACTS]
+    # Per facts table: fact ids are only unique within their own table.
+    inserts, updates, deletes = defaultdict(list), defaultdict(list), defaultdict(list)
+    closes = defaultdict(list)  # history: ids whose current value ends
+    opens = []          # history rows for new values
+    touched = set()     # (report_key, data_date)
+    unchanged = 0
+    for report_key, batch in batches.items():
+        replacing = report_key == replace_key
+        if not batch and not replacing:
+            continue
+        current, stale = _current_facts(
+            conn, report_key, None if replacing else [k[0] for k in batch], tables
+        )
+        for table, fact_id, data_datetime in stale:
+            touched.add((report_key, _data_date(data_datetime)))
+            deletes[table].append((fact_id,))
+        for fact_key, row in batch.items():
+            existing = current.pop(fact_key, None)
+            version_key = version_keys[(report_key, row.definition_hash, row.report_name)]
+            if existing is None:
+                touched.add((report_key, row.data_date))
+                inserts[_facts_table(shards, row.data_date)].append((
+                    report_key, version_key, fact_key[1], fact_key[2], row.data_datetime, row.data_date,
+                    row.scrape_timestamp, row.value, row.value_num, row.value_kind,
+                ))
+            elif existing[1] != row.value or existing[3] != version_key:
+                touched.add((report_key, row.data_date))
+                updates[existing[2]].append(
+                    (row.scrape_timestamp, row.value, row.value_num, row.value_kind, version_key, existing[0])
+                )
+                if existing[1] == row.value:
+                    continue  # relabelled only: the value history is unchanged
+                closes[existing[2]].append((existing[0],))
+            else:
+                unchanged += 1
+                continue
+            if history:
+                opens.append((
+                    report_key, row.data_datetime, fact_key[1], fact_key[2],
+                    row.scrape_timestamp, row.value, row.value_num, row.value_kind,
+                ))
+        if replacing:
+            for fact_key, (fact_id, _, table, _) in current.items():
+                touched.add((report_key, _data_date(fact_key[0])))
+                deletes[table].append((fact_id,))
+                closes[table].append((fact_id,))
+
+    if history:
+        closed_at = rows[0].scrape_timestamp if rows else datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        _write_history(conn, closed_at, closes, opens)
+    for table, ids in deletes.items():
+        conn.executemany(f"DELETE FROM {table} WHERE id = ?", ids)
+    for table, values in updates.items():
+        conn.executemany(_UPDATE_FACT_SQL.format(facts=table), values)
+    for table, values in inserts.items():
+        conn.executemany(_INSERT_FACT_SQL.format(facts=table), values)
+    _touch_days(conn, (day for _, day in touched))
+    _refresh_rollups(conn, touched, shards)
+    return WriteResult(*(sum(len(v) for v in kind.values()) for kind in (inserts, updates, deletes)), unchanged)
+
+
 def upsert_metrics(source_name: str, data: List[Dict[str, Any]],
                    current_date: str = None,
                    *,
                    replace_report: bool = False,
                    report_id: str = '',
                    definition_hash: str = '',
-                   report_name: str = ''):
+                   report_name: str = '') -> WriteResult:
     """
     Insert or update a batch of metrics in one transaction.
 
     Each dict in *data* should have:
         metric_title, category (opt), sub_category (opt), interval (opt),
         data_date (opt — date the metrics are FOR), value
+
+    With *replace_report* the stored rows for ``(source_name, report_id)``
+    become exactly *data*; only inserted, changed and vanished rows are
+    written.  Returns a ``WriteResult`` with the per-kind row counts.
     """
     if not data and not (replace_report and report_id):
-        return
+        return WriteResult()
 
     if current_date is None:
         current_date = datetime.now().strftime('%Y-%m-%d')
@@ -280,99 +1263,464 @@ def upsert_metrics(source_name: str, data: List[Dict[str, Any]],
         report_name=report_name,
     )
 
-    conn = _get_conn()
-    try:
-        conn.execute('BEGIN')
-        if replace_report and report_id:
-            conn.execute(
-                "DELETE FROM kpi_snapshots WHERE source = ? AND report_id = ?",
-                (source_name, report_id),
-            )
-        conn.executemany(_UPSERT_SQL, rows)
-        conn.commit()
-        logger.info(
-            f"Persisted {len(rows)} metrics for '{source_name}' on {current_date}"
-            + (f" (replaced report_id={report_id})" if replace_report and report_id else '')
-        )
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    from core.shards import attached_for_write, shards_for_write
+    history = bool(get_global_settings().get('value_history', False))
+    replace_key = (source_name, report_id) if replace_report and report_id else None
+    # Rows of months already rotated into shards are diffed and written there.
+    with attached_for_write(shards_for_write({row.data_date for row in rows}, replace_key)) as shards:
+        with transaction() as conn:
+            result = _write_metric_rows(conn, rows, replace_report=replace_key, history=history, shards=shards)
+    logger.info(
+        f"Persisted {len(rows)} metrics for '{source_name}' on {current_date}"
+        + (f" (replaced report_id={report_id})" if replace_report and report_id else '')
+        + f": {result.inserted} inserted, {result.updated} updated, {result.deleted} deleted, {result.unchanged} unchanged"
+    )
+    return result
 
 
 # ══════════════════════════════════════════════════════════════════════════
 #  READ
 # ══════════════════════════════════════════════════════════════════════════
 
-def query_all() -> pd.DataFrame:
-    """Return the entire table as a DataFrame (for CSV export)."""
-    conn = _get_conn()
-    try:
-        df = pd.read_sql_query(
+def query_all() -> 'pd.DataFrame':
+    """Return the entire table as a DataFrame (ad-hoc analysis; the export streams)."""
+    import pandas as pd
+    frames = [
+        pd.read_sql_query(
             "SELECT scrape_timestamp, data_datetime, source, report_id, report_name, metric_title, category, sub_category, value "
             "FROM kpi_snapshots ORDER BY data_datetime, source, report_name, metric_title, category",
             conn
         )
-        return df
-    finally:
-        conn.close()
+        for conn in window_connections()
+    ]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
 
 
-def query_by_date(start_date: str, end_date: str = None) -> pd.DataFrame:
-    """Return rows within a date range (matches on the date portion of data_datetime)."""
+def query_by_date(start_date: str, end_date: str = None) -> 'pd.DataFrame':
+    """Return rows within a date range (index range scan on data_date)."""
+    import pandas as pd
     if end_date is None:
         end_date = start_date
-    conn = _get_conn()
-    try:
-        df = pd.read_sql_query(
+    frames = [
+        pd.read_sql_query(
             "SELECT scrape_timestamp, data_datetime, source, report_id, report_name, metric_title, category, sub_category, value "
-            "FROM kpi_snapshots WHERE substr(data_datetime, 1, 10) BETWEEN ? AND ? "
+            "FROM kpi_snapshots WHERE data_date BETWEEN ? AND ? "
             "ORDER BY data_datetime, source, report_name, metric_title, category",
             conn, params=(start_date, end_date)
         )
-        return df
-    finally:
-        conn.close()
+        for conn in window_connections(start_date, end_date)
+    ]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+_ROLLUP_GRAINS = {'hour': 'kpi_rollup_hour', 'day': 'kpi_rollup_day'}
+# data_level: 'interval' (aggregated interval rows) or 'day' (date-only rows,
+# e.g. consolidated daily report values) — the two are never summed together.
+ROLLUP_COLUMNS = [
+    'bucket', 'data_level', 'source', 'report_id', 'report_name', 'metric_title', 'category', 'sub_category',
+    'value_kind', 'count', 'sum', 'min', 'max', 'avg',
+]
+
+
+def _rollup_select(grain: str) -> str:
+    if grain not in _ROLLUP_GRAINS:
+        raise ValueError(f"Unknown rollup grain '{grain}' (expected 'hour' or 'day')")
+    kind_case = ' '.join(f"WHEN {code} THEN '{name}'" for code, name in sorted(VALUE_KIND_NAMES.items()))
+    level = "CASE x.day_level WHEN 1 THEN 'day' ELSE 'interval' END" if grain == 'day' else "'interval'"
+    return (
+        f"SELECT x.bucket, {level}, r.source, r.report_id, r.report_name, m.metric_title, c.category, c.sub_category, "
+        f"CASE x.value_kind {kind_case} END, x.n, x.sum, x.min, x.max, x.sum / x.n "
+        f"FROM {_ROLLUP_GRAINS[grain]} x "
+        "JOIN reports    r ON r.id = x.report_key "
+        "JOIN metrics    m ON m.id = x.metric_key "
+        "JOIN categories c ON c.id = x.category_key "
+        "WHERE x.bucket >= ? AND x.bucket < ? "
+        "ORDER BY x.bucket, r.source, r.report_name, m.metric_title, c.category, 2"
+    )
+
+
+def _rollup_bounds(start_date: str, end_date: str) -> tuple:
+    # Hour buckets ('YYYY-MM-DD HH') sort after their day, so the upper bound is the next day.
+    return start_date, (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def query_rollup(start_date: str, end_date: str = None, grain: str = 'day') -> 'pd.DataFrame':
+    """Return hour or day aggregates (count/sum/min/max/avg of value_num) for a date range.
+
+    Reads ``kpi_rollup_hour`` / ``kpi_rollup_day`` only; interval rows are
+    never scanned.  Text values are not part of the aggregates.
+    """
+    import pandas as pd
+    if end_date is None:
+        end_date = start_date
+    with read_connection() as conn:
+        cur = conn.execute(_rollup_select(grain), _rollup_bounds(start_date, end_date))
+        return pd.DataFrame.from_records(cur.fetchall(), columns=ROLLUP_COLUMNS)
+
+
+VALUE_HISTORY_COLUMNS = [
+    'data_datetime', 'source', 'report_id', 'report_name', 'metric_title', 'category', 'sub_category',
+    'value', 'value_num', 'valid_from', 'valid_to',
+]
+
+_VALUE_HISTORY_SELECT = (
+    "SELECT h.data_datetime, r.source, r.report_id, r.report_name, m.metric_title, c.category, c.sub_category, "
+    "h.value, h.value_num, h.valid_from, h.valid_to "
+    "FROM kpi_value_history h "
+    "JOIN reports    r ON r.id = h.report_key "
+    "JOIN metrics    m ON m.id = h.metric_key "
+    "JOIN categories c ON c.id = h.category_key "
+    "WHERE h.data_datetime >= ? AND h.data_datetime < ?"
+)
+
+
+def query_value_history(start_date: str, end_date: str = None, *, source: str = '',
+                        report_id: str = '', metric_title: str = '') -> 'pd.DataFrame':
+    """Return every recorded value interval for data dates in a range.
+
+    One row per value a key held: ``valid_from`` is when it was first
+    scraped, ``valid_to`` when it was replaced or removed (NULL while it is
+    still current).  Requires the ``value_history`` setting; keys written
+    before it was enabled start at their last change.
+    """
+    import pandas as pd
+    if end_date is None:
+        end_date = start_date
+    sql = _VALUE_HISTORY_SELECT
+    params = list(_rollup_bounds(start_date, end_date))
+    for column, value in (('r.source', source), ('r.report_id', report_id), ('m.metric_title', metric_title)):
+        if value:
+            sql += f" AND {column} = ?"
+            params.append(value)
+    sql += " ORDER BY h.data_datetime, r.source, r.report_name, m.metric_title, c.category, h.valid_from"
+    with read_connection() as conn:
+        cur = conn.execute(sql, params)
+        return pd.DataFrame.from_records(cur.fetchall(), columns=VALUE_HISTORY_COLUMNS)
+
+
+def query_value_at(timestamp: str, start_date: str, end_date: str = None) -> 'pd.DataFrame':
+    """Reconstruct the stored values as they were at *timestamp* ('YYYY-MM-DD HH:MM:SS').
+
+    Returns the same columns as ``query_value_history``, one row per key
+    that had a value at that moment.
+    """
+    import pandas as pd
+    if end_date is None:
+        end_date = start_date
+    sql = (
+        _VALUE_HISTORY_SELECT
+        + " AND h.valid_from <= ? AND (h.valid_to IS NULL OR h.valid_to > ?)"
+        + " ORDER BY h.data_datetime, r.source, r.report_name, m.metric_title, c.category"
+    )
+    with read_connection() as conn:
+        cur = conn.execute(sql, _rollup_bounds(start_date, end_date) + (timestamp, timestamp))
+        return pd.DataFrame.from_records(cur.fetchall(), columns=VALUE_HISTORY_COLUMNS)
 
 
 def row_count() -> int:
     """Quick row count without loading data."""
-    conn = _get_conn()
-    try:
-        cur = conn.execute("SELECT COUNT(*) FROM kpi_snapshots")
-        return cur.fetchone()[0]
-    finally:
-        conn.close()
+    return sum(
+        conn.execute("SELECT COUNT(*) FROM kpi_facts").fetchone()[0]
+        for conn in window_connections()
+    )
 
 
 # ══════════════════════════════════════════════════════════════════════════
 #  MAINTENANCE
 # ══════════════════════════════════════════════════════════════════════════
 
+def _meta_get(conn: sqlite3.Connection, key: str, default: str = '') -> str:
+    row = conn.execute("SELECT value FROM db_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _meta_set(conn: sqlite3.Connection, key: str, value: Any):
+    conn.execute(
+        "INSERT INTO db_meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+        (key, str(value)),
+    )
+
+
+def _page_count(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA page_count").fetchone()[0]
+
+
+def _record_maintenance(operation: str, duration_s: float, *, rows_deleted: int = 0,
+                        pages_before: int = 0, pages_after: int = 0):
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO maintenance_log (timestamp, operation, rows_deleted, pages_before, pages_after, pages_reclaimed, duration_s) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'), operation, rows_deleted,
+                pages_before, pages_after, max(0, pages_before - pages_after), round(duration_s, 3),
+            ),
+        )
+
+
+def _vacuum_settings() -> Dict[str, int]:
+    cfg = get_global_settings().get('vacuum', {}) or {}
+    return {
+        'incremental_pages': int(cfg.get('incremental_pages', 1000)),
+        'max_incremental_passes': int(cfg.get('max_incremental_passes', 10)),
+        'full_vacuum_hour': int(cfg.get('full_vacuum_hour', 3)),
+    }
+
+
+def _incremental_vacuum(pages_per_pass: int, max_passes: int):
+    """Release free pages in bounded passes; other writers can run between passes."""
+    started = time.perf_counter()
+    with _connections.writer() as conn:
+        pages_before = _page_count(conn)
+    for _ in range(max(0, max_passes)):
+        with _connections.writer() as conn:
+            if not conn.execute("PRAGMA freelist_count").fetchone()[0]:
+                break
+            # The pragma frees one page per step and returns no rows, so
+            # execute() would stop after one page; executescript() steps to the end.
+            conn.executescript(f"PRAGMA incremental_vacuum({max(1, pages_per_pass)});")
+    with _connections.writer() as conn:
+        pages_after = _page_count(conn)
+    if pages_after < pages_before:
+        duration = time.perf_counter() - started
+        _record_maintenance('incremental_vacuum', duration, pages_before=pages_before, pages_after=pages_after)
+        logger.info(f"Incremental vacuum: reclaimed {pages_before - pages_after} pages in {duration:.2f}s")
+
+
+def _full_vacuum_if_due(hour: int) -> bool:
+    """Run one full VACUUM per day, only inside the configured hour (-1 disables)."""
+    now = datetime.now()
+    if hour < 0 or now.hour != hour:
+        return False
+    today = now.strftime('%Y-%m-%d')
+    with read_connection() as conn:
+        if _meta_get(conn, 'last_full_vacuum') == today:
+            return False
+
+    started = time.perf_counter()
+    with _connections.writer() as conn:
+        pages_before = _page_count(conn)
+        conn.execute("VACUUM")
+        pages_after = _page_count(conn)
+    duration = time.perf_counter() - started
+    with transaction() as conn:
+        _meta_set(conn, 'last_full_vacuum', today)
+    _record_maintenance('full_vacuum', duration, pages_before=pages_before, pages_after=pages_after)
+    logger.info(f"Full vacuum: {pages_before} -> {pages_after} pages in {duration:.2f}s")
+    return True
+
+
+_ARCHIVE_SCRAPE_LOG_SQL = """
+INSERT INTO scrape_log_daily (
+    day, source, report_identity, definition_hash, status, report_id, report_label,
+    events, rows_total, duration_total_s, duration_max_s
+)
+SELECT substr(timestamp, 1, 10),
+       source,
+       CASE WHEN COALESCE(report_id, '') <> '' THEN report_id ELSE report_label END AS report_identity,
+       COALESCE(definition_hash, ''),
+       status,
+       MAX(COALESCE(report_id, '')),
+       MAX(COALESCE(report_label, '')),
+       COUNT(*),
+       SUM(COALESCE(row_count, 0)),
+       SUM(COALESCE(duration_s, 0)),
+       MAX(COALESCE(duration_s, 0))
+FROM scrape_log
+WHERE id < ?
+GROUP BY 1, 2, 3, 4, 5
+ON CONFLICT (day, source, report_identity, definition_hash, status) DO UPDATE SET
+    events           = events + excluded.events,
+    rows_total       = rows_total + excluded.rows_total,
+    duration_total_s = duration_total_s + excluded.duration_total_s,
+    duration_max_s   = MAX(duration_max_s, excluded.duration_max_s)
+"""
+
+
+def prune_scrape_log(days_to_keep: int = None) -> int:
+    """Fold scrape_log events older than *days_to_keep* into ``scrape_log_daily``.
+
+    The archive keeps per-day counts, row totals and durations for each
+    report/definition/status, so historical-skip checks still see old
+    successes.  ``scrape_status_latest`` is unaffected.  Returns rows pruned.
+    """
+    if days_to_keep is None:
+        days_to_keep = get_global_settings().get('scrape_log_retention_days', 180)
+    if not days_to_keep or days_to_keep <= 0:
+        return 0
+    cutoff = (datetime.now() - timedelta(days=days_to_keep)).strftime('%Y-%m-%d')
+    _scrape_log_buffer.flush()
+
+    started = time.perf_counter()
+    with transaction() as conn:
+        # ids grow with time, so the first id on/after the cutoff bounds the
+        # old events; the scan stops there instead of reading the whole log.
+        row = conn.execute(
+            "SELECT id FROM scrape_log WHERE timestamp >= ? ORDER BY id LIMIT 1", (cutoff,)
+        ).fetchone()
+        boundary = row[0] if row else conn.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM scrape_log"
+        ).fetchone()[0]
+        conn.execute(_ARCHIVE_SCRAPE_LOG_SQL, (boundary,))
+        pruned = conn.execute("DELETE FROM scrape_log WHERE id < ?", (boundary,)).rowcount
+    if pruned:
+        _record_maintenance('scrape_log_retention', time.perf_counter() - started, rows_deleted=pruned)
+        logger.info(f"Scrape log retention: archived {pruned} events older than {cutoff}")
+    return pruned
+
+
 def cleanup_old_data(days_to_keep: int = None):
-    """Delete rows older than *days_to_keep* (from settings if not given)."""
+    """Delete rows older than *days_to_keep* (from settings if not given).
+
+    With ``"storage_layout": "monthly"`` closed months are first moved to
+    their shard file; expired shards are deleted whole (``core/shards.py``).
+    Also archives old scrape_log events (``scrape_log_retention_days``).
+
+    Freed pages are returned to the OS with bounded incremental vacuum passes;
+    a full VACUUM only runs once a day inside ``vacuum.full_vacuum_hour``.
+    """
     if days_to_keep is None:
         days_to_keep = get_global_settings().get('data_retention_days', 90)
 
     cutoff = (datetime.now() - timedelta(days=days_to_keep)).strftime('%Y-%m-%d')
-    conn = _get_conn()
+    started = time.perf_counter()
+    with transaction() as conn:
+        _touch_days(conn, (row[0] for row in conn.execute(
+            "SELECT DISTINCT data_date FROM kpi_facts WHERE data_date < ?", (cutoff,)
+        ).fetchall()))
+        deleted = conn.execute(
+            "DELETE FROM kpi_facts WHERE data_date < ?", (cutoff,)
+        ).rowcount
+        conn.execute("DELETE FROM kpi_rollup_hour WHERE bucket < ?", (cutoff,))
+        conn.execute("DELETE FROM kpi_rollup_day WHERE bucket < ?", (cutoff,))
+        conn.execute("DELETE FROM kpi_value_history WHERE data_datetime < ?", (cutoff,))
+    if deleted:
+        _record_maintenance('retention', time.perf_counter() - started, rows_deleted=deleted)
+        logger.info(f"Retention cleanup: deleted {deleted} rows older than {cutoff}")
+
+    from core.shards import rotate_shards, drop_expired_shards
+    if str(get_global_settings().get('storage_layout', 'single')).lower() == 'monthly':
+        started = time.perf_counter()
+        moved = rotate_shards()
+        if moved:
+            _record_maintenance('shard_rotation', time.perf_counter() - started, rows_deleted=moved)
+    drop_expired_shards(cutoff)
+    prune_scrape_log()
+
+    vacuum = _vacuum_settings()
+    if not _full_vacuum_if_due(vacuum['full_vacuum_hour']):
+        _incremental_vacuum(vacuum['incremental_pages'], vacuum['max_incremental_passes'])
+
+
+def get_maintenance_log(limit: int = 50) -> List[Dict[str, Any]]:
+    """Return recent retention/vacuum runs with their cost (newest first)."""
     try:
-        cur = conn.execute("DELETE FROM kpi_snapshots WHERE substr(data_datetime, 1, 10) < ?", (cutoff,))
-        deleted = cur.rowcount
-        conn.commit()
-        if deleted:
-            conn.execute("VACUUM")  # reclaim space
-            logger.info(f"Retention cleanup: deleted {deleted} rows older than {cutoff}")
-    finally:
-        conn.close()
+        with read_connection() as conn:
+            cur = conn.execute(
+                "SELECT id, timestamp, operation, rows_deleted, pages_before, pages_after, pages_reclaimed, duration_s "
+                "FROM maintenance_log ORDER BY id DESC LIMIT ?",
+                (limit,)
+            )
+            cols = [d[0] for d in cur.description]
+            return [dict(zip(cols, row)) for row in cur.fetchall()]
+    except Exception:
+        return []
+
+
+def clear_data():
+    """Delete every KPI row and scrape log entry (control panel "Clear data")."""
+    with transaction() as conn:
+        _touch_days(conn, (row[0] for row in conn.execute("SELECT DISTINCT data_date FROM kpi_facts").fetchall()))
+        conn.execute('DELETE FROM kpi_facts')
+        conn.execute('DELETE FROM kpi_rollup_hour')
+        conn.execute('DELETE FROM kpi_rollup_day')
+        conn.execute('DELETE FROM kpi_value_history')
+        conn.execute('DELETE FROM scrape_log')
+        conn.execute('DELETE FROM scrape_status_latest')
+        conn.execute('DELETE FROM scrape_log_daily')
+    from core.shards import remove_all_shards
+    remove_all_shards()
 
 
 # ══════════════════════════════════════════════════════════════════════════
 #  CSV EXPORT  (the "projection" that Power BI reads)
 # ══════════════════════════════════════════════════════════════════════════
 
-def export_csv(output_dir: str = None, shared_drive_path: str = None):
+EXPORT_COLUMNS = [
+    'scrape_timestamp', 'data_datetime', 'source', 'report_id', 'report_name',
+    'metric_title', 'category', 'sub_category', 'value',
+]
+_EXPORT_CACHE_DIR = '.export_cache'
+_EXPORT_STATE_FILE = 'state.json'
+
+
+def _day_versions(start: str, end: str) -> Dict[str, int]:
+    with read_connection() as conn:
+        return dict(conn.execute(
+            "SELECT data_date, version FROM kpi_day_versions WHERE data_date BETWEEN ? AND ?",
+            (start, end),
+        ).fetchall())
+
+
+def _window_days(start: str, end: str) -> List[str]:
+    first = datetime.strptime(start, '%Y-%m-%d')
+    count = (datetime.strptime(end, '%Y-%m-%d') - first).days + 1
+    return [(first + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(count)]
+
+
+def _load_export_state(cache_dir: str, name: str = _EXPORT_STATE_FILE) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(cache_dir, name), encoding='utf-8') as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_export_state(cache_dir: str, state: Dict[str, Any], name: str = _EXPORT_STATE_FILE):
+    path = os.path.join(cache_dir, name)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+_EXPORT_FETCH_ROWS = 5000
+
+_EXPORT_SELECT = (
+    f"SELECT {', '.join(EXPORT_COLUMNS)} FROM kpi_snapshots "
+    "WHERE data_date BETWEEN ? AND ? "
+    "ORDER BY data_datetime, source, report_name, metric_title, category"
+)
+
+
+def _write_rows_csv(f, start_date: str, end_date: str) -> int:
+    """Stream rows from a cursor into open text file *f* in fixed-size chunks.
+
+    Memory stays flat regardless of the window: at most _EXPORT_FETCH_ROWS
+    rows are held at a time.  Output matches pandas ``to_csv`` (minimal
+    quoting, platform line endings).  Returns the row count.
+    """
+    writer = csv.writer(f, lineterminator=os.linesep)
+    count = 0
+    for conn in window_connections(start_date, end_date):
+        cur = conn.execute(_EXPORT_SELECT, (start_date, end_date))
+        while True:
+            chunk = cur.fetchmany(_EXPORT_FETCH_ROWS)
+            if not chunk:
+                break
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def _write_day_fragment(day: str, path: str) -> int:
+    """Write one day's rows (no header) in export order; returns the row count."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        return _write_rows_csv(f, day, day)
+
+
+def export_csv(output_dir: str = None, shared_drive_path: str = None, force: bool = False) -> bool:
     """
     Export a rolling window of the database to CSV (atomic write).
 
@@ -380,105 +1728,305 @@ def export_csv(output_dir: str = None, shared_drive_path: str = None):
     (default 30).  The full history stays in SQLite; the CSV only
     carries recent data so Power BI refreshes stay fast.
 
+    Incremental: every write bumps a per-day version (``kpi_day_versions``).
+    Each day of the window is cached as a CSV fragment under
+    ``output/.export_cache``; only days whose version changed are re-queried,
+    and when no day changed and the window is the same, nothing is rewritten
+    (Power BI and the shared drive keep the file they have).
+
+    ``force`` rewrites the CSV and rebuilds every day fragment from the
+    database, ignoring the cache.
+
     Writes to:
-      1. output/kpi_snapshots.csv  (always)
-      2. shared_drive_path         (if configured in settings)
+      1. output/kpi_snapshots.csv  (always, when changed)
+      2. shared_drive_path         (if configured; queued for the background
+                                    publisher, see core/publisher.py)
+
+    Returns True if the CSV was rewritten.
     """
     csv_days = get_global_settings().get('csv_export_days', 30)
     start = (datetime.now() - timedelta(days=csv_days)).strftime('%Y-%m-%d')
     end   = datetime.now().strftime('%Y-%m-%d')
-    df = query_by_date(start, end)
-    logger.info(f"CSV export window: {start} → {end} ({csv_days} days, {len(df)} rows)")
 
-    # 1. Local CSV (atomic)
     if output_dir is None:
         output_dir = get_output_dir()
     local_csv = os.path.join(output_dir, CSV_FILENAME)
-    _atomic_write_csv(df, local_csv)
-    logger.info(f"Exported {len(df)} rows -> {local_csv}")
-
-    # 2. Shared drive CSV (if configured)
+    cache_dir = os.path.join(output_dir, _EXPORT_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
     if shared_drive_path is None:
         shared_drive_path = get_global_settings().get('shared_drive_csv', '')
 
+    state = _load_export_state(cache_dir)
+    cached = state.get('days', {}) if state.get('columns') == EXPORT_COLUMNS else {}
+    versions = _day_versions(start, end)
+    days = _window_days(start, end)
+    current = {day: versions.get(day) for day in days}
+
+    unchanged = (
+        not force
+        and os.path.exists(local_csv)
+        and state.get('window') == [start, end]
+        and all(day in cached and cached[day].get('version') == current[day] for day in days)
+    )
+    if unchanged:
+        logger.info(f"CSV export window {start} → {end} unchanged - skipping rewrite")
+        if shared_drive_path and state.get('shared_drive') != shared_drive_path:
+            state['shared_drive'] = _publish_to_shared_drive(local_csv, shared_drive_path)
+            _save_export_state(cache_dir, state)
+        return False
+
+    # Refresh only the day fragments whose version moved (every day with
+    # *force*, so a forced export also repairs a damaged cache).
+    fragments: Dict[str, Dict[str, Any]] = {}
+    rebuilt = 0
+    for day in days:
+        path = os.path.join(cache_dir, f"{day}.csv")
+        entry = cached.get(day)
+        if not force and entry and entry.get('version') == current[day] and os.path.exists(path):
+            fragments[day] = entry
+            continue
+        fragments[day] = {'version': current[day], 'rows': _write_day_fragment(day, path)}
+        rebuilt += 1
+
+    # Fragments that fell out of the window are no longer needed.
+    for name in os.listdir(cache_dir):
+        if name.endswith('.csv') and name[:-4] not in fragments:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+    total = sum(entry['rows'] for entry in fragments.values())
+    _atomic_concat_csv(local_csv, [os.path.join(cache_dir, f"{day}.csv") for day in days])
+    logger.info(
+        f"CSV export window: {start} → {end} ({csv_days} days, {total} rows, {rebuilt} day(s) rebuilt)"
+    )
+    logger.info(f"Exported {total} rows -> {local_csv}")
+
+    state = {'columns': EXPORT_COLUMNS, 'window': [start, end], 'days': fragments}
     if shared_drive_path:
-        try:
-            # Ensure parent dir exists (shared drive may have subfolders)
-            parent = os.path.dirname(shared_drive_path)
-            if parent and not os.path.exists(parent):
-                os.makedirs(parent, exist_ok=True)
-            _atomic_write_csv(df, shared_drive_path)
-            logger.info(f"Exported {len(df)} rows -> {shared_drive_path} (shared drive)")
-        except Exception as e:
-            logger.error(f"Failed to write to shared drive: {e}")
-            logger.error("Local CSV is still up-to-date - data is safe.")
+        state['shared_drive'] = _publish_to_shared_drive(local_csv, shared_drive_path)
+    _save_export_state(cache_dir, state)
+    return True
 
 
-def _atomic_write_csv(df: pd.DataFrame, path: str):
-    """Write to .tmp then rename — readers never see a half-written file."""
+def _publish_to_shared_drive(local_path: str, shared_drive_path: str) -> str:
+    """Queue *local_path* for the background publisher; the share is never touched here.
+
+    Returns the target path once queued, '' on failure.
+    """
+    from core.publisher import enqueue_copy
+    try:
+        enqueue_copy(local_path, shared_drive_path)
+        return shared_drive_path
+    except Exception as e:
+        logger.error(f"Failed to queue shared drive copy: {e}")
+        return ''
+
+
+def _atomic_concat_csv(path: str, fragments: List[str]):
+    """Header + day fragments to .tmp, then rename — readers never see a half-written file."""
     tmp = path + ".tmp"
-    df.to_csv(tmp, index=False)
+    with open(tmp, 'wb') as out:
+        out.write((','.join(EXPORT_COLUMNS) + os.linesep).encode('utf-8'))
+        for fragment in fragments:
+            if os.path.exists(fragment):
+                with open(fragment, 'rb') as f:
+                    shutil.copyfileobj(f, out)
     os.replace(tmp, path)
 
 
+def _rollup_filename(grain: str) -> str:
+    return f"kpi_rollup_{grain}.csv"
+
+
+def export_rollup(grain: str = 'day', output_dir: str = None, force: bool = False) -> bool:
+    """
+    Export the ``csv_export_days`` window of a rollup table to
+    ``output/kpi_rollup_<grain>.csv`` (one row per bucket/report/metric/category).
+
+    Skipped when no day in the window changed since the last rollup export
+    (same ``kpi_day_versions`` check as the CSV).  Returns True if rewritten.
+    """
+    settings = get_global_settings()
+    days_back = settings.get('csv_export_days', 30)
+    start = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+    end   = datetime.now().strftime('%Y-%m-%d')
+
+    if output_dir is None:
+        output_dir = get_output_dir()
+    path = os.path.join(output_dir, _rollup_filename(grain))
+    cache_dir = os.path.join(output_dir, _EXPORT_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    state_name = f"rollup_{grain}_state.json"
+
+    versions = _day_versions(start, end)
+    current = {day: versions.get(day) for day in _window_days(start, end)}
+    state = _load_export_state(cache_dir, state_name)
+    if (not force and os.path.exists(path) and state.get('columns') == ROLLUP_COLUMNS
+            and state.get('window') == [start, end] and state.get('days') == current):
+        logger.info(f"Rollup ({grain}) export window {start} → {end} unchanged - skipping rewrite")
+        return False
+
+    total = 0
+    tmp = path + '.tmp'
+    with open(tmp, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(ROLLUP_COLUMNS)
+        with read_connection() as conn:
+            cur = conn.execute(_rollup_select(grain), _rollup_bounds(start, end))
+            while True:
+                chunk = cur.fetchmany(_EXPORT_FETCH_ROWS)
+                if not chunk:
+                    break
+                writer.writerows(chunk)
+                total += len(chunk)
+    os.replace(tmp, path)
+    logger.info(f"Exported {total} {grain} rollup rows -> {path}")
+    _save_export_state(cache_dir, {'columns': ROLLUP_COLUMNS, 'window': [start, end], 'days': current}, state_name)
+    return True
+
+
+def export_projections(output_dir: str = None, force: bool = False) -> Dict[str, bool]:
+    """Run every exporter listed in ``export_formats`` (default ``["csv"]``).
+
+    Known formats: ``csv`` (single file), ``csv_partitioned`` (one file per
+    day + manifest), ``parquet``, and ``rollup_day`` / ``rollup_hour``
+    (aggregates from the rollup tables).
+
+    Returns ``{format: rewritten}``.  A failing format is logged and does
+    not stop the others.
+    """
+    formats = get_global_settings().get('export_formats') or ['csv']
+    results: Dict[str, bool] = {}
+    for fmt in dict.fromkeys(str(f).strip().lower() for f in formats):
+        try:
+            if fmt == 'csv':
+                results[fmt] = export_csv(output_dir, force=force)
+            elif fmt == 'parquet':
+                from core.parquet_export import export_parquet
+                results[fmt] = export_parquet(output_dir, force=force)
+            elif fmt == 'csv_partitioned':
+                from core.partitioned_export import export_csv_partitions
+                results[fmt] = export_csv_partitions(output_dir, force=force)
+            elif fmt in ('rollup_day', 'rollup_hour'):
+                results[fmt] = export_rollup(fmt.split('_', 1)[1], output_dir, force=force)
+            else:
+                logger.warning(f"Unknown export format '{fmt}' in export_formats - skipped")
+        except Exception as e:
+            logger.error(f"{fmt.upper()} export failed: {e}")
+    return results
+
+
 # ══════════════════════════════════════════════════════════════════════════
 #  MIGRATION — one-time import of existing CSV into SQLite
 # ══════════════════════════════════════════════════════════════════════════
 
-def migrate_csv_to_db(csv_path: str = None):
+_CSV_MIGRATION_KEY = 'csv_migration_completed'
+_CSV_MIGRATION_CHUNK = 5000
+_CSV_REQUIRED = ('scrape_timestamp', 'data_datetime', 'source', 'metric_title', 'value')
+
+
+def _csv_metric_row(record: Dict[str, Any]) -> MetricRow:
+    """Validate one CSV record and build its MetricRow (ValueError on rejection)."""
+    if None in record:
+        raise ValueError('too many fields')
+    if None in record.values():
+        raise ValueError('too few fields')
+    missing = [col for col in ('scrape_timestamp', 'source', 'metric_title') if not (record.get(col) or '').strip()]
+    if missing:
+        raise ValueError(f"empty {', '.join(missing)}")
+    return _metric_row(
+        record['scrape_timestamp'],
+        record.get('data_datetime') or '',
+        record['source'],
+        record.get('report_id') or '',
+        record.get('definition_hash') or '',
+        record.get('report_name') or '',
+        record['metric_title'],
+        record.get('category') or '',
+        record.get('sub_category') or '',
+        record.get('value') or '',
+    )
+
+
+def _write_rejects(path: str, fieldnames: List[str], rejects: List[tuple]):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['line', 'reason'] + fieldnames)
+        for line, reason, record in rejects:
+            writer.writerow([line, reason] + [record.get(col, '') for col in fieldnames])
+
+
+def migrate_csv_to_db(csv_path: str = None, force: bool = False):
     """
-    Import an existing kpi_snapshots.csv into the database.
-    Skips rows that already exist (dedup via UNIQUE index).
-    Safe to run multiple times.
+    Import an existing kpi_snapshots.csv into the database, once.
+
+    Completion is recorded in ``db_meta`` so later driver starts return
+    immediately (the CSV is re-exported every run and must not be re-read).
+    The file is streamed in chunks and written with ``executemany`` in a
+    single transaction.  Rows that cannot be imported are written to
+    ``<csv>.rejected.csv`` with the line number and reason.
     """
+    init_db()
+    if not force:
+        with read_connection() as conn:
+            if _meta_get(conn, _CSV_MIGRATION_KEY):
+                return 0
+
     if csv_path is None:
         csv_path = os.path.join(get_output_dir(), CSV_FILENAME)
 
+    def mark_done(note: str):
+        with transaction() as conn:
+            _meta_set(conn, _CSV_MIGRATION_KEY, f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {note}")
+
     if not os.path.exists(csv_path):
         logger.info("No existing CSV to migrate")
+        mark_done('no csv')
         return 0
 
-    df = pd.read_csv(csv_path)
-    if df.empty:
-        return 0
-
-    # Ensure expected columns
-    required = {'scrape_timestamp', 'data_datetime', 'source', 'metric_title', 'value'}
-    if not required.issubset(set(df.columns)):
-        logger.warning(f"CSV columns {list(df.columns)} don't match expected schema - skipping migration")
-        return 0
-
-    # Fill missing optional columns
-    for col in ('report_id', 'report_name', 'category', 'sub_category', 'definition_hash'):
-        if col not in df.columns:
-            df[col] = ''
-    df = df.fillna('')
-
-    init_db()
-    conn = _get_conn()
     imported = 0
-    try:
-        for _, row in df.iterrows():
-            try:
-                conn.execute(_UPSERT_SQL, (
-                    str(row['scrape_timestamp']),
-                    str(row['data_datetime']),
-                    str(row['source']),
-                    str(row.get('report_id', '')),
-                    str(row.get('definition_hash', '')),
-                    str(row.get('report_name', '')),
-                    str(row['metric_title']),
-                    str(row.get('category', '')),
-                    str(row.get('sub_category', '')),
-                    str(row.get('value', '')),
-                ))
-                imported += 1
-            except Exception:
-                pass  # skip bad rows silently
-        conn.commit()
-        logger.info(f"Migrated {imported} rows from CSV into SQLite")
-    finally:
-        conn.close()
+    rejects: List[tuple] = []
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        if not set(_CSV_REQUIRED).issubset(fieldnames):
+            logger.warning(f"CSV columns {fieldnames} don't match expected schema - skipping migration")
+            mark_done('schema mismatch')
+            return 0
+
+        with transaction() as conn:
+            chunk: List[MetricRow] = []
+            for record in reader:
+                try:
+                    chunk.append(_csv_metric_row(record))
+                except ValueError as e:
+                    rejects.append((reader.line_num, str(e), record))
+                    continue
+                if len(chunk) >= _CSV_MIGRATION_CHUNK:
+                    result = _write_metric_rows(conn, chunk)
+                    imported += result.inserted + result.updated
+                    chunk = []
+            if chunk:
+                result = _write_metric_rows(conn, chunk)
+                imported += result.inserted + result.updated
+            _meta_set(
+                conn, _CSV_MIGRATION_KEY,
+                f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} imported={imported} rejected={len(rejects)}",
+            )
+
+    logger.info(f"Migrated {imported} rows from CSV into SQLite")
+    if rejects:
+        reject_path = csv_path + '.rejected.csv'
+        try:
+            _write_rejects(reject_path, fieldnames, rejects)
+        except OSError as e:
+            reject_path = f"(not written: {e})"
+        logger.warning(
+            f"CSV migration rejected {len(rejects)} row(s) - see {reject_path}; first: "
+            + '; '.join(f"line {line}: {reason}" for line, reason, _ in rejects[:5])
+        )
 
     return imported
 
@@ -487,83 +2035,217 @@ def migrate_csv_to_db(csv_path: str = None):
 #  SCRAPE LOG — per-report scrape tracking for the control panel
 # ══════════════════════════════════════════════════════════════════════════
 
+_SCRAPE_LOG_INSERT = (
+    "INSERT INTO scrape_log (timestamp, source, report_id, definition_hash, report_label, status, row_count, duration_s, message) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SCRAPE_LOG_MAX_BUFFERED = 200
+
+
+class _ScrapeLogBuffer:
+    """Collects scrape_log events during a driver run and writes them in batches.
+
+    Outside a run every event is written immediately, as before.  During a
+    run events are held in memory and flushed in one transaction when a
+    worker finishes a report (it calls ``flush_scrape_log()`` after the
+    report's final event), when the driver moves to the next worker, when
+    the buffer fills, before any scrape_log read, at the end of the run, and
+    on interpreter exit so a crashing run still leaves its trail.  SIGTERM/SIGBREAK only raise
+    ``SystemExit``: the handler may interrupt an open transaction, which has
+    to unwind (roll back) before the exit-time flush writes anything.
+    """
+
+    def __init__(self):
+        self._events: List[tuple] = []
+        self._lock = threading.RLock()
+        self.active = False
+        self._hooks_installed = False
+
+    def start(self):
+        self.active = True
+        if not self._hooks_installed:
+            self._install_hooks()
+
+    def stop(self):
+        self.flush()
+        self.active = False
+
+    def add(self, event: tuple):
+        with self._lock:
+            self._events.append(event)
+            pending = len(self._events)
+        if not self.active or pending >= _SCRAPE_LOG_MAX_BUFFERED:
+            self.flush()
+
+    def flush(self) -> int:
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return 0
+        try:
+            with transaction() as conn:
+                conn.executemany(_SCRAPE_LOG_INSERT, events)
+        except Exception as e:
+            logger.debug(f"Failed to log scrape: {e}")
+            return 0
+        return len(events)
+
+    def _flush_at_exit(self):
+        # A transaction still open here belongs to a thread that outlived the
+        # run; joining or waiting on it could roll back or hang the exit.
+        if _connections.in_transaction():
+            logger.debug("Skipping scrape_log flush at exit: a write transaction is still open")
+            return
+        self.flush()
+
+    def _install_hooks(self):
+        self._hooks_installed = True
+        atexit.register(self._flush_at_exit)
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for name in ('SIGTERM', 'SIGBREAK'):
+            signum = getattr(signal, name, None)
+            if signum is None:
+                continue
+            try:
+                previous = signal.getsignal(signum)
+                signal.signal(signum, self._signal_handler(previous))
+            except (ValueError, OSError):
+                pass
+
+    @staticmethod
+    def _signal_handler(previous):
+        # No flush here: the signal can arrive while this thread holds the
+        # buffer lock or is inside transaction().  SystemExit unwinds those
+        # first and the atexit hook flushes afterwards.
+        def handler(signum, frame):
+            if callable(previous):
+                previous(signum, frame)
+            elif previous != signal.SIG_IGN:
+                raise SystemExit(128 + signum)
+        return handler
+
+
+_scrape_log_buffer = _ScrapeLogBuffer()
+
+
+def start_scrape_log_buffer():
+    """Buffer log_scrape() events until flushed (call at the start of a run)."""
+    _scrape_log_buffer.start()
+
+
+def flush_scrape_log() -> int:
+    """Write buffered scrape_log events in one transaction. Returns rows written."""
+    return _scrape_log_buffer.flush()
+
+
+def stop_scrape_log_buffer():
+    """Flush and return to write-through logging (call at the end of a run)."""
+    _scrape_log_buffer.stop()
+
+
 def log_scrape(source: str, report_label: str, status: str,
                row_count: int = 0, duration_s: float = 0, message: str = '',
                report_id: str = '', definition_hash: str = ''):
-    """Record a scrape attempt (success/error/no_data)."""
+    """Record a scrape attempt (success/error/no_data); buffered during a run."""
     ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    conn = _get_conn()
-    try:
-        conn.execute(
-            "INSERT INTO scrape_log (timestamp, source, report_id, definition_hash, report_label, status, row_count, duration_s, message) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (ts, source, report_id, definition_hash, report_label, status, row_count, round(duration_s, 2), message)
-        )
-        conn.commit()
-    except Exception as e:
-        logger.debug(f"Failed to log scrape: {e}")
-    finally:
-        conn.close()
+    _scrape_log_buffer.add(
+        (ts, source, report_id, definition_hash, report_label, status, row_count, round(duration_s, 2), message)
+    )
 
 
-def get_scrape_log(limit: int = 100) -> List[Dict[str, Any]]:
-    """Return recent scrape log entries (newest first)."""
-    conn = _get_conn()
+def get_scrape_log(limit: int = 100, *, source: str = '', report_id: str = '',
+                   report_label: str = '') -> List[Dict[str, Any]]:
+    """Return recent scrape log entries (newest first).
+
+    With *source* (and *report_id* and/or *report_label*) only that report's
+    events are returned, read through the per-report indexes.
+    """
+    _scrape_log_buffer.flush()
+    where, params = '', []
+    if source:
+        # Spelled as (source AND id) OR (source AND label) so each branch can
+        # use its own index (SQLite multi-index OR).
+        matches = []
+        for column, value in (('report_id', report_id), ('report_label', report_label)):
+            if value:
+                matches.append(f"(source = ? AND {column} = ?)")
+                params.extend((source, value))
+        if not matches:
+            matches.append("source = ?")
+            params.append(source)
+        where = "WHERE " + ' OR '.join(matches)
     try:
-        cur = conn.execute(
-            "SELECT id, timestamp, source, report_id, definition_hash, report_label, status, row_count, duration_s, message "
-            "FROM scrape_log ORDER BY id DESC LIMIT ?",
-            (limit,)
-        )
-        cols = [d[0] for d in cur.description]
-        return [dict(zip(cols, row)) for row in cur.fetchall()]
+        with read_connection() as conn:
+            cur = conn.execute(
+                "SELECT id, timestamp, source, report_id, definition_hash, report_label, status, row_count, duration_s, message "
+                f"FROM scrape_log {where} ORDER BY id DESC LIMIT ?",
+                (*params, limit)
+            )
+            cols = [d[0] for d in cur.description]
+            return [dict(zip(cols, row)) for row in cur.fetchall()]
     except Exception:
         return []
-    finally:
-        conn.close()
 
 
 def get_latest_scrape_status() -> List[Dict[str, Any]]:
-    """Get the most recent scrape result for each source + report_label."""
-    conn = _get_conn()
+    """Get the most recent scrape result for each source + report (O(reports))."""
+    _scrape_log_buffer.flush()
     try:
-        cur = conn.execute("""
-            SELECT s.* FROM scrape_log s
-            INNER JOIN (
-                SELECT source,
-                       CASE WHEN COALESCE(report_id, '') <> '' THEN report_id ELSE report_label END AS report_identity,
-                       MAX(id) as max_id
-                FROM scrape_log
-                GROUP BY source, report_identity
-            ) latest ON s.id = latest.max_id
-            ORDER BY s.timestamp DESC
-        """)
-        cols = [d[0] for d in cur.description]
-        return [dict(zip(cols, row)) for row in cur.fetchall()]
+        with read_connection() as conn:
+            cur = conn.execute(
+                "SELECT log_id AS id, timestamp, source, report_id, definition_hash, report_label, "
+                "status, row_count, duration_s, message "
+                "FROM scrape_status_latest ORDER BY timestamp DESC"
+            )
+            cols = [d[0] for d in cur.description]
+            return [dict(zip(cols, row)) for row in cur.fetchall()]
     except Exception:
         return []
-    finally:
-        conn.close()
+
+
+def last_successful_scrape(source: str, report_id: str, definition_hash: str) -> Optional[tuple]:
+    """Return ``(timestamp, duration_s)`` of the newest 'success' for a report, or None."""
+    _scrape_log_buffer.flush()
+    try:
+        with read_connection() as conn:
+            return conn.execute(
+                "SELECT timestamp, duration_s FROM scrape_log "
+                "WHERE source = ? AND report_id = ? AND definition_hash = ? AND status = 'success' "
+                "ORDER BY id DESC LIMIT 1",
+                (source, report_id, definition_hash)
+            ).fetchone()
+    except Exception:
+        return None
 
 
 def has_historical_data(source: str, report_id: str, definition_hash: str) -> bool:
     """
     Check if we already have a successful scrape logged for a historical report.
 
-    Returns True when scrape_log contains a 'success' entry with row_count > 0
-    for the given source + report_id + definition_hash.
+    Returns True when scrape_log (or its daily archive, for pruned events)
+    contains a 'success' entry for the given source + report_id + definition_hash.
+    Both lookups seek the (source, report_id, definition_hash, status) indexes.
     """
-    conn = _get_conn()
+    _scrape_log_buffer.flush()
+    key = (source, report_id, definition_hash)
     try:
-        cur = conn.execute(
-            "SELECT 1 FROM scrape_log "
-            "WHERE source = ? AND report_id = ? AND definition_hash = ? "
-            "AND status = 'success' AND row_count >= 0 "
-            "ORDER BY id DESC LIMIT 1",
-            (source, report_id, definition_hash)
-        )
-        return cur.fetchone() is not None
+        with read_connection() as conn:
+            cur = conn.execute(
+                "SELECT 1 FROM scrape_log "
+                "WHERE source = ? AND report_id = ? AND definition_hash = ? "
+                "AND status = 'success' AND row_count >= 0 "
+                "LIMIT 1",
+                key
+            )
+            if cur.fetchone() is not None:
+                return True
+            cur = conn.execute(
+                "SELECT 1 FROM scrape_log_daily "
+                "WHERE source = ? AND report_id = ? AND definition_hash = ? AND status = 'success' "
+                "LIMIT 1",
+                key
+            )
+            return cur.fetchone() is not None
     except Exception:
         return False
-    finally:
-        conn.close()
@@ -0,0 +1,242 @@
+"""
+SQLite Connection Manager
+=========================
+Process-wide connection handling for ``core.database``.
+
+  - One writer connection per process, serialized by a re-entrant lock.
+  - A small pool of thread-local reader connections (WAL lets them run
+    alongside the writer without blocking).
+  - Pragmas are applied once when a connection is opened, not per call.
+
+Usage:
+    with manager.transaction() as conn:   # BEGIN IMMEDIATE ... COMMIT
+        conn.execute(...)
+    with manager.reader() as conn:        # read-only, autocommit
+        conn.execute(...).fetchall()
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+logger = logging.getLogger('database')
+
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    'synchronous': 'NORMAL',
+    'busy_timeout_ms': 5000,
+    'cache_size_kb': 16384,
+    'mmap_size_mb': 64,
+    'temp_store': 'memory',
+    'reader_pool_size': 4,
+}
+
+_SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+_TEMP_STORE_MODES = {'DEFAULT', 'FILE', 'MEMORY'}
+
+
+def _pragma_statements(options: Dict[str, Any]) -> list[str]:
+    synchronous = str(options.get('synchronous', 'NORMAL')).upper()
+    if synchronous not in _SYNCHRONOUS_MODES:
+        synchronous = 'NORMAL'
+    temp_store = str(options.get('temp_store', 'memory')).upper()
+    if temp_store not in _TEMP_STORE_MODES:
+        temp_store = 'MEMORY'
+    return [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(options.get('busy_timeout_ms', 5000))}",
+        # Negative cache_size is interpreted by SQLite as KiB rather than pages.
+        f"PRAGMA cache_size=-{abs(int(options.get('cache_size_kb', 16384)))}",
+        f"PRAGMA mmap_size={max(0, int(options.get('mmap_size_mb', 64))) * 1024 * 1024}",
+        f"PRAGMA temp_store={temp_store}",
+    ]
+
+
+class ConnectionManager:
+    """Own the writer connection and reader pool for one database path."""
+
+    def __init__(self, path_fn: Callable[[], str], options_fn: Callable[[], Dict[str, Any]]):
+        self._path_fn = path_fn
+        self._options_fn = options_fn
+        self._lock = threading.RLock()
+        self._state_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._path = None
+        self._writer = None
+        self._writer_path = None
+        self._owner = None          # thread ident holding the writer
+        self._depth = 0             # nested transaction() depth
+        self._readers: Dict[int, sqlite3.Connection] = {}
+
+    # ── Connection lifecycle ──────────────────────────────────────────────
+
+    def _options(self) -> Dict[str, Any]:
+        options = dict(DEFAULT_PRAGMAS)
+        try:
+            options.update(self._options_fn() or {})
+        except Exception as e:
+            logger.debug(f"Using default SQLite pragmas: {e}")
+        return options
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        options = self._options()
+        conn = sqlite3.connect(
+            path,
+            timeout=max(1, int(options.get('busy_timeout_ms', 5000)) // 1000),
+            isolation_level=None,          # explicit BEGIN/COMMIT only
+            check_same_thread=False,       # guarded by our own locks
+        )
+        for statement in _pragma_statements(options):
+            conn.execute(statement)
+        return conn
+
+    def _check_process(self) -> str:
+        """Drop inherited handles after a fork and follow output_dir changes."""
+        path = self._path_fn()
+        with self._state_lock:
+            if os.getpid() != self._pid:
+                # Never close handles owned by the parent process.
+                self._pid = os.getpid()
+                self._writer = None
+                self._readers = {}
+            elif path != self._path:
+                self._close_readers_locked()
+            self._path = path
+        return path
+
+    def _close_readers_locked(self):
+        for conn in self._readers.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._readers = {}
+
+    def close_all(self):
+        """Close every pooled connection (tests, settings reload, shutdown)."""
+        with self._lock:
+            with self._state_lock:
+                self._close_readers_locked()
+                if self._writer is not None:
+                    try:
+                        self._writer.close()
+                    except Exception:
+                        pass
+                self._writer = None
+
+    def connect(self) -> sqlite3.Connection:
+        """A new, unpooled connection with the standard pragmas (the caller closes it).
+
+        For readers that change connection state (ATTACH, TEMP views).
+        """
+        return self._open(self._check_process())
+
+    # ── Writer ────────────────────────────────────────────────────────────
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Exclusive use of the writer connection without opening a transaction.
+
+        Needed for statements that cannot run inside a transaction (VACUUM).
+        """
+        self._lock.acquire()
+        try:
+            path = self._check_process()
+            if self._writer is not None and self._writer_path != path:
+                self._writer.close()
+                self._writer = None
+            if self._writer is None:
+                self._writer = self._open(path)
+                self._writer_path = path
+            previous_owner = self._owner
+            self._owner = threading.get_ident()
+            try:
+                yield self._writer
+            finally:
+                self._owner = previous_owner
+        finally:
+            self._lock.release()
+
+    @contextmanager
+    def transaction(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        """Run the block in one write transaction; nested calls join the outer one."""
+        with self.writer() as conn:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield conn
+                finally:
+                    self._depth -= 1
+                return
+
+            conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            self._depth = 1
+            try:
+                yield conn
+            except BaseException:
+                self._depth = 0
+                self._rollback(conn)
+                raise
+            self._depth = 0
+            try:
+                conn.execute('COMMIT')
+            except Exception:
+                self._rollback(conn)
+                raise
+
+    @staticmethod
+    def _rollback(conn: sqlite3.Connection):
+        """Roll back if SQLite has not already done so, keeping the original error."""
+        if not conn.in_transaction:
+            return
+        try:
+            conn.execute('ROLLBACK')
+        except Exception as e:
+            logger.warning(f"ROLLBACK failed: {e}")
+
+    def in_transaction(self) -> bool:
+        """True while any thread has a ``transaction()`` open on the writer."""
+        return self._depth > 0
+
+    # ── Readers ───────────────────────────────────────────────────────────
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """A read connection for the calling thread.
+
+        Inside a transaction on the same thread the writer is returned, so
+        reads see the transaction's own uncommitted rows.
+        """
+        if self._owner == threading.get_ident() and self._writer is not None:
+            yield self._writer
+            return
+
+        path = self._check_process()
+        ident = threading.get_ident()
+        transient = None
+        with self._state_lock:
+            conn = self._readers.get(ident)
+            if conn is None:
+                self._prune_dead_readers()
+                if len(self._readers) < max(1, int(self._options().get('reader_pool_size', 4))):
+                    conn = self._open(path)
+                    self._readers[ident] = conn
+        if conn is None:
+            # Pool is full — fall back to a short-lived connection.
+            conn = transient = self._open(path)
+        try:
+            yield conn
+        finally:
+            if transient is not None:
+                transient.close()
+
+    def _prune_dead_readers(self):
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._readers if i not in alive]:
+            try:
+                self._readers.pop(ident).close()
+            except Exception:
+                pass
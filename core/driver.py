@@ -5,9 +5,9 @@ Main entry point for the Modular Snapshot Scraper.
 
 This script:
 1. Scans the /workers folder for Python modules
-2. Imports each worker and executes its scrape() function
+2. Runs each worker in its own process, up to ``max_parallel_workers`` at once
 3. Handles worker failures individually (one crash doesn't stop others)
-4. Aggregates results into the central CSV
+4. Persists each worker's results as soon as it finishes, then exports
 
 Designed to be run every 5 minutes via Windows Task Scheduler.
 """
@@ -16,6 +16,11 @@ import os
 import sys
 import importlib.util
 import logging
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import Dict, Any, List, Tuple
 import traceback
@@ -26,8 +31,15 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from core.common_utils import process_worker_result, process_worker_result_long, process_worker_report_batches
-from core.config import get_global_settings, get_worker_settings, get_log_dir, PROJECT_ROOT as CFG_ROOT
-from core.database import init_db, export_csv, cleanup_old_data, migrate_csv_to_db
+from core.config import (
+    get_global_settings, get_worker_settings, get_log_dir, get_run_deadline_seconds,
+    reload as config_reload, PROJECT_ROOT as CFG_ROOT,
+)
+from core.database import (
+    init_db, export_projections, cleanup_old_data, migrate_csv_to_db,
+    start_scrape_log_buffer, flush_scrape_log, stop_scrape_log_buffer,
+)
+from core.publisher import start_background as start_background_publisher
 
 
 class _ConsoleSafeStream:
@@ -74,6 +86,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger('driver')
 
+
+def roll_log_file():
+    """Point the dated driver_YYYYMMDD.log handler at today's file (long-lived processes)."""
+    target = os.path.join(get_log_dir(), f"driver_{datetime.now().strftime('%Y%m%d')}.log")
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if (isinstance(handler, logging.FileHandler)
+                and os.path.basename(handler.baseFilename).startswith('driver_')
+                and handler.baseFilename != os.path.abspath(target)):
+            replacement = logging.FileHandler(target, encoding='utf-8')
+            replacement.setFormatter(handler.formatter)
+            replacement.setLevel(handler.level)
+            root.addHandler(replacement)
+            root.removeHandler(handler)
+            handler.close()
+
 # Configuration
 WORKERS_DIR = os.path.join(CFG_ROOT, 'workers')
 
@@ -185,10 +213,189 @@ def execute_worker(module) -> Tuple[str, Dict[str, Any], bool]:
         return (getattr(module, '__name__', 'unknown'), {}, False)
 
 
+def run_worker(worker_path: str, deadline: float = None) -> Dict[str, Any]:
+    """
+    Load one worker, honour its ``enabled`` setting and execute it.
+
+    *deadline* is the run deadline (``time.time()``); the worker's reports
+    stop at it, and a worker reached after it is not started.
+
+    Returns:
+        Outcome dict: ``{'status': 'load_failed'}``, ``{'status': 'disabled'}``,
+        ``{'status': 'timeout'}`` or
+        ``{'status': 'ran', 'source': ..., 'data': ..., 'success': ...}``
+    """
+    if deadline is not None and time.time() >= deadline:
+        return {'status': 'timeout'}
+    module = load_worker_module(worker_path)
+    if module is None:
+        return {'status': 'load_failed'}
+
+    # Check if worker is enabled in settings
+    worker_cls = getattr(module, 'Worker', None)
+    if worker_cls and hasattr(worker_cls, 'SOURCE_NAME'):
+        ws = get_worker_settings(worker_cls.SOURCE_NAME)
+        if ws and ws.get('enabled') is False:
+            logger.info(f"  Worker '{worker_cls.SOURCE_NAME}' is disabled in settings. Skipping.")
+            return {'status': 'disabled'}
+
+    from core.base_worker import set_run_deadline
+    set_run_deadline(deadline)
+    source_name, data, success = execute_worker(module)
+    return {'status': 'ran', 'source': source_name, 'data': data, 'success': success}
+
+
+def _run_worker_process(worker_path: str, deadline: float = None) -> Dict[str, Any]:
+    """Entry point inside a worker's child process (scrape_log rows batched there)."""
+    config_reload()  # a kept-warm process must still see saved settings
+    roll_log_file()  # ... and log to the current day's file
+    start_scrape_log_buffer()
+    try:
+        return run_worker(worker_path, deadline)
+    finally:
+        stop_scrape_log_buffer()
+
+
+def _init_worker_process(ignore_interrupt: bool):
+    # Ctrl+C reaches every process on the console.  When the parent handles
+    # it (the daemon finishes the running cycle), the worker keeps going.
+    if ignore_interrupt:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _new_worker_pool(context) -> ProcessPoolExecutor:
+    handles_interrupt = signal.getsignal(signal.SIGINT) is not signal.default_int_handler
+    return ProcessPoolExecutor(max_workers=1, mp_context=context,
+                               initializer=_init_worker_process, initargs=(handles_interrupt,))
+
+
+def terminate_worker_processes():
+    """Kill running worker processes at once (second Ctrl+C in the daemon)."""
+    for child in multiprocessing.active_children():
+        child.terminate()
+
+
+# Daemon mode: one long-lived process per worker, reused across cycles.
+_resident_pools: Dict[str, ProcessPoolExecutor] = {}
+_keep_processes = False
+
+
+def keep_worker_processes(enabled: bool = True):
+    """Reuse each worker's process across runs (``--daemon``); False shuts them down."""
+    global _keep_processes
+    _keep_processes = enabled
+    if not enabled:
+        for pool in _resident_pools.values():
+            pool.shutdown(wait=True, cancel_futures=True)
+        _resident_pools.clear()
+
+
+def run_worker_isolated(worker_path: str, deadline: float = None) -> Dict[str, Any]:
+    """
+    Run one worker in a spawned process.
+
+    A browser or interpreter crash kills only that process; it is reported
+    as ``{'status': 'crashed'}`` and the other workers carry on.  Each call
+    gets a fresh process unless ``keep_worker_processes()`` is on.
+    """
+    logger.info(f"--- Starting: {os.path.basename(worker_path)} ---")
+    context = multiprocessing.get_context('spawn')
+    if not _keep_processes:
+        with _new_worker_pool(context) as pool:
+            return _submit_worker(pool, worker_path, deadline)
+
+    pool = _resident_pools.get(worker_path)
+    if pool is None:
+        pool = _resident_pools[worker_path] = _new_worker_pool(context)
+    outcome = _submit_worker(pool, worker_path, deadline)
+    if outcome.get('status') == 'crashed':
+        _resident_pools.pop(worker_path, None)
+        pool.shutdown(wait=False)
+    return outcome
+
+
+def _submit_worker(pool: ProcessPoolExecutor, worker_path: str, deadline: float = None) -> Dict[str, Any]:
+    try:
+        return pool.submit(_run_worker_process, worker_path, deadline).result()
+    except BrokenProcessPool as e:
+        return {'status': 'crashed', 'error': f"worker process died: {e}"}
+
+
+def _record_outcome(worker_name: str, outcome: Dict[str, Any], summary: Dict[str, Any], write_results: list):
+    """Persist a finished worker's data and add it to the summary."""
+    status = outcome.get('status')
+    if status == 'disabled':
+        summary['results'][worker_name] = {'status': 'disabled'}
+        return
+    if status == 'timeout':
+        logger.warning(f"Worker {worker_name} not started - run deadline reached")
+        summary['workers_failed'] += 1
+        summary['results'][worker_name] = {'status': 'timeout'}
+        return
+    if status in ('load_failed', 'crashed', 'error'):
+        if status == 'crashed':
+            logger.error(f"Worker {worker_name} crashed: {outcome.get('error')}")
+        summary['workers_failed'] += 1
+        summary['results'][worker_name] = {k: v for k, v in outcome.items() if k in ('status', 'error')}
+        return
+
+    source_name, data = outcome.get('source'), outcome.get('data')
+    if not (outcome.get('success') and data):
+        summary['workers_failed'] += 1
+        summary['results'][worker_name] = {'status': 'no_data'}
+        return
+
+    try:
+        # Process and save results
+        if isinstance(data, dict) and 'report_batches' in data:
+            batches = data.get('report_batches', []) or []
+            statuses = [str(batch.get('status', '') or '').strip().lower() for batch in batches]
+            if any(status in ('success', 'no_data') for status in statuses):
+                save_success = process_worker_report_batches(
+                    source_name, batches, write_results=write_results
+                )
+            elif statuses:
+                save_success = all(status == 'skipped' for status in statuses)
+            else:
+                save_success = bool(data.get('worker_success', False))
+        # Detect format: list = long format, dict = wide format
+        elif isinstance(data, list):
+            # Long format: List of {metric_title, category, value}
+            save_success = process_worker_result_long(
+                source_name, data, write_results=write_results
+            )
+        else:
+            # Wide format: Dict of {column_name: value}
+            save_success = process_worker_result(source_name, data)
+    except Exception as e:
+        logger.error(f"Saving results of {worker_name} failed: {e}")
+        logger.error(traceback.format_exc())
+        summary['workers_failed'] += 1
+        summary['results'][worker_name] = {'status': 'error', 'error': str(e)}
+        return
+
+    if save_success:
+        summary['workers_succeeded'] += 1
+        summary['results'][worker_name] = {
+            'status': 'success',
+            'source': source_name,
+            'data': data
+        }
+    else:
+        summary['workers_failed'] += 1
+        summary['results'][worker_name] = {'status': 'save_failed'}
+
+
 def run_all_workers() -> Dict[str, Any]:
     """
     Main orchestration function.
     Discovers, loads, and executes all workers.
+
+    Workers run concurrently, each in its own process, up to
+    ``max_parallel_workers`` (settings.json, default 2) at a time.  Results
+    are persisted by this process as each worker finishes.  With
+    ``max_parallel_workers: 0`` workers run one after another inside the
+    driver process (debugging).
     
     Returns:
         Summary dict with results
@@ -212,8 +419,10 @@ def run_all_workers() -> Dict[str, Any]:
         'workers_found': 0,
         'workers_succeeded': 0,
         'workers_failed': 0,
+        'rows_changed': 0,
         'results': {}
     }
+    write_results = []  # database WriteResult per persisted batch
     
     # Discover workers
     worker_paths = discover_workers()
@@ -224,82 +433,65 @@ def run_all_workers() -> Dict[str, Any]:
         logger.info("Add worker modules to the /workers folder to start scraping")
         return summary
     
-    # Execute each worker independently
-    for worker_path in worker_paths:
-        worker_name = os.path.basename(worker_path)
-        module_stem = os.path.splitext(worker_name)[0]  # e.g. "cuic_worker" → "cuic_worker"
-        logger.info(f"\n--- Processing: {worker_name} ---")
-        
-        try:
-            # Load module
-            module = load_worker_module(worker_path)
-            if module is None:
-                summary['workers_failed'] += 1
-                summary['results'][worker_name] = {'status': 'load_failed'}
-                continue
-            
-            # Check if worker is enabled in settings
-            source_name = getattr(module, 'Worker', None)
-            if source_name and hasattr(source_name, 'SOURCE_NAME'):
-                ws = get_worker_settings(source_name.SOURCE_NAME)
-                if ws and ws.get('enabled') is False:
-                    logger.info(f"  Worker '{source_name.SOURCE_NAME}' is disabled in settings. Skipping.")
-                    summary['results'][worker_name] = {'status': 'disabled'}
-                    continue
-            
-            # Execute worker
-            source_name, data, success = execute_worker(module)
-            
-            if success and data:
-                # Process and save results
-                if isinstance(data, dict) and 'report_batches' in data:
-                    batches = data.get('report_batches', []) or []
-                    statuses = [str(batch.get('status', '') or '').strip().lower() for batch in batches]
-                    if any(status in ('success', 'no_data') for status in statuses):
-                        save_success = process_worker_report_batches(source_name, batches)
-                    elif statuses:
-                        save_success = all(status == 'skipped' for status in statuses)
-                    else:
-                        save_success = bool(data.get('worker_success', False))
-                # Detect format: list = long format, dict = wide format
-                elif isinstance(data, list):
-                    # Long format: List of {metric_title, category, value}
-                    save_success = process_worker_result_long(source_name, data)
-                else:
-                    # Wide format: Dict of {column_name: value}
-                    save_success = process_worker_result(source_name, data)
-                
-                if save_success:
-                    summary['workers_succeeded'] += 1
-                    summary['results'][worker_name] = {
-                        'status': 'success',
-                        'source': source_name,
-                        'data': data
-                    }
-                else:
-                    summary['workers_failed'] += 1
-                    summary['results'][worker_name] = {'status': 'save_failed'}
-            else:
-                summary['workers_failed'] += 1
-                summary['results'][worker_name] = {'status': 'no_data'}
-                
-        except Exception as e:
-            # Catch-all to ensure one worker can't crash the entire process
-            logger.error(f"Unexpected error with {worker_name}: {e}")
-            logger.error(traceback.format_exc())
-            summary['workers_failed'] += 1
-            summary['results'][worker_name] = {
-                'status': 'error',
-                'error': str(e)
-            }
+    # Batch scrape_log rows for the whole run (flushed per worker + at exit)
+    start_scrape_log_buffer()
+
+    # Reports still running at the deadline are stopped and logged 'timeout'
+    # so the run ends before the next scheduled one.
+    deadline_s = get_run_deadline_seconds()
+    deadline = start_time.timestamp() + deadline_s if deadline_s else None
+    if deadline:
+        logger.info(f"Run deadline: {datetime.fromtimestamp(deadline).strftime('%H:%M:%S')} ({deadline_s}s)")
+
+    try:
+        max_parallel = max(0, int(get_global_settings().get('max_parallel_workers', 2)))
+    except (TypeError, ValueError):
+        max_parallel = 2
+
+    if max_parallel:
+        logger.info(f"Running {len(worker_paths)} worker(s), up to {max_parallel} in parallel")
+        with ThreadPoolExecutor(max_workers=min(max_parallel, len(worker_paths)),
+                                thread_name_prefix='worker') as pool:
+            futures = {}
+            for worker_path in worker_paths:
+                futures[pool.submit(run_worker_isolated, worker_path, deadline)] = os.path.basename(worker_path)
+            for future in as_completed(futures):
+                worker_name = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    logger.error(f"Unexpected error with {worker_name}: {e}")
+                    outcome = {'status': 'error', 'error': str(e)}
+                logger.info(f"--- Finished: {worker_name} ({outcome.get('status')}) ---")
+                _record_outcome(worker_name, outcome, summary, write_results)
+                flush_scrape_log()
+    else:
+        # Execute each worker independently, in this process
+        for worker_path in worker_paths:
+            worker_name = os.path.basename(worker_path)
+            logger.info(f"\n--- Processing: {worker_name} ---")
+            try:
+                outcome = run_worker(worker_path, deadline)
+            except Exception as e:
+                # Catch-all to ensure one worker can't crash the entire process
+                logger.error(f"Unexpected error with {worker_name}: {e}")
+                logger.error(traceback.format_exc())
+                outcome = {'status': 'error', 'error': str(e)}
+            try:
+                _record_outcome(worker_name, outcome, summary, write_results)
+            finally:
+                flush_scrape_log()
     
     # ── Post-run: export CSV + retention cleanup ──────────────────────
+    summary['rows_changed'] = sum(result.changed for result in write_results)
     if summary['workers_succeeded'] > 0:
-        try:
-            export_csv()  # writes local CSV + shared drive if configured
-            logger.info("CSV export complete")
-        except Exception as e:
-            logger.error(f"CSV export failed: {e}")
+        # CSV (+ Parquet if enabled in export_formats); each rewrites only
+        # when a day in the window changed, and logs its own failures.
+        rewritten = [fmt for fmt, done in export_projections().items() if done]
+        if rewritten:
+            logger.info(f"Export complete: {', '.join(rewritten)}")
+        # Shared-drive copies run in a detached process; never wait on the share.
+        start_background_publisher()
 
         try:
             cleanup_old_data()
@@ -307,6 +499,8 @@ def run_all_workers() -> Dict[str, Any]:
         except Exception as e:
             logger.error(f"Retention cleanup failed: {e}")
 
+    stop_scrape_log_buffer()
+
     # Log summary
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
@@ -325,7 +519,17 @@ def run_all_workers() -> Dict[str, Any]:
 
 
 def main():
-    """Entry point for the driver."""
+    """Entry point for the driver (``--daemon`` keeps running on an interval)."""
+    if '--daemon' in sys.argv[1:]:
+        from core.scheduler import run_daemon
+        try:
+            run_daemon()
+        except Exception as e:
+            logger.critical(f"Daemon crashed: {e}")
+            logger.critical(traceback.format_exc())
+            sys.exit(2)
+        sys.exit(0)
+
     try:
         summary = run_all_workers()
         
@@ -0,0 +1,178 @@
+"""
+Parquet Export
+==============
+Typed, columnar sibling of the CSV projection (``core.database.export_csv``).
+
+Writes ``output/kpi_snapshots.parquet`` (and optionally a shared-drive copy)
+for the same ``csv_export_days`` window:
+
+    scrape_timestamp, data_datetime   timestamp[s]
+    data_date                          date32
+    source, report_id, report_name,
+    metric_title, category,
+    sub_category, value_kind           dictionary<string>
+    value                              string  (display text, as in the CSV)
+    value_num                          float64 (parsed at ingest; NULL for text)
+
+Compressed with zstd and dictionary-encoded, so the repeated report and
+metric strings are stored once per row group (``_ROW_GROUP_ROWS`` rows).  Enabled by adding
+``"parquet"`` to ``export_formats`` in settings.json.
+
+pyarrow is optional: it is imported only when this exporter runs.
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from core.config import get_global_settings, get_output_dir
+from core.database import (
+    window_connections, _day_versions, _window_days, _load_export_state,
+    _save_export_state, _publish_to_shared_drive, _EXPORT_CACHE_DIR, _EXPORT_FETCH_ROWS,
+)
+
+logger = logging.getLogger('database')
+
+PARQUET_FILENAME = "kpi_snapshots.parquet"
+_PARQUET_STATE_FILE = 'parquet_state.json'
+# Rows per row group.  Fetches stay at _EXPORT_FETCH_ROWS; they are buffered
+# so readers get few large groups (one dictionary page per column per group)
+# rather than one small group per fetch.
+_ROW_GROUP_ROWS = 100_000
+_DICTIONARY_COLUMNS = (
+    'source', 'report_id', 'report_name', 'metric_title', 'category', 'sub_category', 'value_kind',
+)
+
+# Date-only data_datetime values are widened to midnight so one format parses all rows.
+_PARQUET_SELECT = """
+SELECT scrape_timestamp,
+       CASE WHEN length(data_datetime) = 10 THEN data_datetime || ' 00:00:00' ELSE data_datetime END,
+       data_date, source, report_id, report_name, metric_title, category, sub_category,
+       value, value_num, value_kind
+FROM kpi_snapshots
+WHERE data_date BETWEEN ? AND ?
+ORDER BY data_datetime, source, report_name, metric_title, category
+"""
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError(
+            "Parquet export needs the optional 'pyarrow' package (pip install pyarrow)"
+        ) from e
+    return pyarrow, pyarrow.compute, pyarrow.parquet
+
+
+def _schema(pa):
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('scrape_timestamp', pa.timestamp('s')),
+        ('data_datetime', pa.timestamp('s')),
+        ('data_date', pa.date32()),
+        ('source', dictionary),
+        ('report_id', dictionary),
+        ('report_name', dictionary),
+        ('metric_title', dictionary),
+        ('category', dictionary),
+        ('sub_category', dictionary),
+        ('value', pa.string()),
+        ('value_num', pa.float64()),
+        ('value_kind', dictionary),
+    ])
+
+
+def _record_batch(pa, pc, schema, rows):
+    columns = list(zip(*rows))
+    arrays = []
+    for index, field in enumerate(schema):
+        raw = pa.array(columns[index], type=pa.string()) if field.name != 'value_num' else None
+        if field.name in ('scrape_timestamp', 'data_datetime'):
+            arrays.append(pc.strptime(raw, format='%Y-%m-%d %H:%M:%S', unit='s', error_is_null=True))
+        elif field.name == 'data_date':
+            arrays.append(pc.cast(pc.strptime(raw, format='%Y-%m-%d', unit='s', error_is_null=True), pa.date32()))
+        elif field.name == 'value_num':
+            arrays.append(pa.array(columns[index], type=pa.float64()))
+        elif field.name in _DICTIONARY_COLUMNS:
+            arrays.append(raw.dictionary_encode())
+        else:
+            arrays.append(raw)
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_parquet(path: str, start_date: str, end_date: str) -> int:
+    """Stream the window into *path* (atomic temp-file swap). Returns rows written."""
+    pa, pc, pq = _import_pyarrow()
+    schema = _schema(pa)
+    tmp = path + ".tmp"
+    count = 0
+    pending: list = []
+    with pq.ParquetWriter(tmp, schema, compression='zstd', use_dictionary=True) as writer:
+        for conn in window_connections(start_date, end_date):
+            cur = conn.execute(_PARQUET_SELECT, (start_date, end_date))
+            while True:
+                chunk = cur.fetchmany(_EXPORT_FETCH_ROWS)
+                if not chunk:
+                    break
+                pending.extend(chunk)
+                count += len(chunk)
+                if len(pending) >= _ROW_GROUP_ROWS:
+                    writer.write_batch(_record_batch(pa, pc, schema, pending), row_group_size=len(pending))
+                    pending = []
+        if pending:
+            writer.write_batch(_record_batch(pa, pc, schema, pending), row_group_size=len(pending))
+    os.replace(tmp, path)
+    return count
+
+
+def export_parquet(output_dir: str = None, shared_drive_path: str = None, force: bool = False) -> bool:
+    """
+    Export the ``csv_export_days`` window to Parquet.
+
+    Skipped when no day in the window changed since the last Parquet export
+    (same ``kpi_day_versions`` check as the CSV).  A Parquet file cannot be
+    patched in place, so any change rewrites the whole file.
+
+    Writes to:
+      1. output/kpi_snapshots.parquet
+      2. shared_drive_path / ``shared_drive_parquet`` setting (if configured;
+         queued for the background publisher)
+
+    Returns True if the file was rewritten.
+    """
+    settings = get_global_settings()
+    days_back = settings.get('csv_export_days', 30)
+    start = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+    end   = datetime.now().strftime('%Y-%m-%d')
+
+    if output_dir is None:
+        output_dir = get_output_dir()
+    local_path = os.path.join(output_dir, PARQUET_FILENAME)
+    cache_dir = os.path.join(output_dir, _EXPORT_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    if shared_drive_path is None:
+        shared_drive_path = settings.get('shared_drive_parquet', '')
+
+    versions = _day_versions(start, end)
+    current: Dict[str, Any] = {day: versions.get(day) for day in _window_days(start, end)}
+    state = _load_export_state(cache_dir, _PARQUET_STATE_FILE)
+    if (not force and os.path.exists(local_path)
+            and state.get('window') == [start, end] and state.get('days') == current):
+        logger.info(f"Parquet export window {start} → {end} unchanged - skipping rewrite")
+        if shared_drive_path and state.get('shared_drive') != shared_drive_path:
+            state['shared_drive'] = _publish_to_shared_drive(local_path, shared_drive_path)
+            _save_export_state(cache_dir, state, _PARQUET_STATE_FILE)
+        return False
+
+    total = write_parquet(local_path, start, end)
+    logger.info(f"Exported {total} rows -> {local_path}")
+
+    state = {'window': [start, end], 'days': current}
+    if shared_drive_path:
+        state['shared_drive'] = _publish_to_shared_drive(local_path, shared_drive_path)
+    _save_export_state(cache_dir, state, _PARQUET_STATE_FILE)
+    return True
@@ -0,0 +1,171 @@
+"""
+Day-Partitioned CSV Export
+==========================
+Alternative to the single ``kpi_snapshots.csv``: one file per data day.
+
+    output/kpi/2026-10-15.csv
+    output/kpi/2026-10-16.csv
+    output/kpi/manifest.json     {day: {file, rows, sha256, version, updated_at}}
+
+Only days whose ``kpi_day_versions`` entry moved since the last export are
+rewritten; days that fall out of the ``csv_export_days`` window are deleted.
+Every partition carries the header, so a Power BI *Folder* source can
+combine them and refresh only changed files.  An optional shared-drive
+folder (``shared_drive_partition_dir``) is kept in sync through the
+background publisher (``core/publisher.py``), which only copies files whose
+content changed.
+
+Enabled by adding ``"csv_partitioned"`` to ``export_formats`` in settings.json.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from core.config import get_global_settings, get_output_dir
+from core.database import EXPORT_COLUMNS, _day_versions, _window_days, _write_rows_csv
+
+logger = logging.getLogger('database')
+
+PARTITION_DIRNAME = "kpi"
+MANIFEST_FILENAME = "manifest.json"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_manifest(directory: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILENAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(directory: str, manifest: Dict[str, Any]):
+    path = os.path.join(directory, MANIFEST_FILENAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def _write_partition(day: str, path: str) -> int:
+    """Header + one day's rows, written to .tmp and renamed. Returns the row count."""
+    tmp = path + '.tmp'
+    with open(tmp, 'w', newline='', encoding='utf-8') as f:
+        f.write(','.join(EXPORT_COLUMNS) + os.linesep)
+        rows = _write_rows_csv(f, day, day)
+    os.replace(tmp, path)
+    return rows
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _queue_shared_sync(local_dir: str, shared_dir: str, partitions: Dict[str, Any], removed: List[str]):
+    """Queue partition copies/removals, then the manifest, for the background publisher.
+
+    Unchanged partitions are queued too; the publisher skips them by hash
+    without touching the share, so a missing remote file is still restored.
+    """
+    from core.publisher import enqueue_copy, enqueue_delete
+    try:
+        for entry in partitions.values():
+            enqueue_copy(os.path.join(local_dir, entry['file']), os.path.join(shared_dir, entry['file']))
+        for day in removed:
+            enqueue_delete(os.path.join(shared_dir, f"{day}.csv"))
+        enqueue_copy(os.path.join(local_dir, MANIFEST_FILENAME), os.path.join(shared_dir, MANIFEST_FILENAME))
+    except Exception as e:
+        logger.error(f"Failed to queue partition sync to shared drive: {e}")
+
+
+def export_csv_partitions(output_dir: str = None, shared_dir: str = None, force: bool = False) -> bool:
+    """
+    Write one CSV per data day in the export window plus ``manifest.json``.
+
+    Returns True if any partition was written or deleted.
+    """
+    settings = get_global_settings()
+    days_back = settings.get('csv_export_days', 30)
+    start = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+    end   = datetime.now().strftime('%Y-%m-%d')
+
+    if output_dir is None:
+        output_dir = get_output_dir()
+    local_dir = os.path.join(output_dir, PARTITION_DIRNAME)
+    os.makedirs(local_dir, exist_ok=True)
+    if shared_dir is None:
+        shared_dir = settings.get('shared_drive_partition_dir', '')
+
+    manifest = _load_manifest(local_dir)
+    previous = manifest.get('partitions', {}) if manifest.get('columns') == EXPORT_COLUMNS else {}
+    versions = _day_versions(start, end)
+    window = set(_window_days(start, end))
+
+    partitions: Dict[str, Dict[str, Any]] = {}
+    changed: List[str] = []
+    for day in sorted(window):
+        version = versions.get(day)
+        path = os.path.join(local_dir, f"{day}.csv")
+        entry = previous.get(day)
+        if not force and entry and entry.get('version') == version and os.path.exists(path):
+            partitions[day] = entry
+            continue
+        if version is None and not entry:
+            continue  # never had data
+        rows = _write_partition(day, path)
+        if not rows:
+            _remove(path)
+            if entry:
+                changed.append(day)
+            continue
+        partitions[day] = {
+            'file': f"{day}.csv",
+            'rows': rows,
+            'sha256': _file_sha256(path),
+            'version': version,
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        changed.append(day)
+
+    # Days outside the window are deleted, never re-filtered.
+    for name in os.listdir(local_dir):
+        if name.endswith('.csv') and name[:-4] not in partitions:
+            _remove(os.path.join(local_dir, name))
+            if name[:-4] in previous:
+                changed.append(name[:-4])
+
+    if not changed and previous and not force:
+        logger.info(f"Partitioned export window {start} → {end} unchanged")
+        from core.publisher import is_published
+        if shared_dir and not is_published(os.path.join(shared_dir, MANIFEST_FILENAME)):
+            _queue_shared_sync(local_dir, shared_dir, partitions, [])
+        return False
+
+    manifest = {
+        'columns': EXPORT_COLUMNS,
+        'window': [start, end],
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'partitions': partitions,
+    }
+    _save_manifest(local_dir, manifest)
+    logger.info(
+        f"Partitioned export: {len(changed)} day(s) rewritten/removed, "
+        f"{len(partitions)} partition(s), {sum(p['rows'] for p in partitions.values())} rows -> {local_dir}"
+    )
+    if shared_dir:
+        _queue_shared_sync(local_dir, shared_dir, partitions, [day for day in changed if day not in partitions])
+    return True
@@ -0,0 +1,336 @@
+"""
+Shared-Drive Publisher
+======================
+Copies finished local exports to the shared drive in the background.
+
+The driver never touches the share itself: exporters call ``enqueue_copy``
+/ ``enqueue_delete`` and the driver calls ``start_background()`` once the
+local export is done.  That spawns a detached ``python -m core.publisher``
+process which drains the queue:
+
+  - Persistent queue: ``publish_queue`` in the SQLite database, so failed
+    copies survive across runs.  One row per target (re-enqueueing a target
+    replaces its pending entry and moves it to the back of the queue).
+  - Skip-if-identical: ``published_files`` remembers the SHA-256 of what was
+    last copied to each target; an unchanged source is not re-sent.
+  - Retry with backoff: 30s, 60s, 120s ... capped at 1 hour.
+  - Atomic on the share: copy to ``<target>.tmp`` then ``os.replace``.
+  - Immutable sources: ``enqueue_copy`` stages a private copy under
+    ``output/.publish/<name>.<version>`` and the publisher reads only that,
+    so a slow copy never holds the live export open (on Windows an open
+    handle makes the exporter's next ``os.replace`` fail).  The staged file
+    is deleted once published or superseded.
+  - Single instance: a heartbeat lease in ``db_meta`` keeps a second
+    publisher from starting while one is running.
+
+Usage:
+    python -m core.publisher          # drain the queue once (what the driver spawns)
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import logging
+import subprocess
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core.config import get_log_dir, get_output_dir
+from core.database import init_db, transaction, read_connection, _meta_get, _meta_set
+
+logger = logging.getLogger('publisher')
+
+_LEASE_KEY = 'publisher_lease'
+_LEASE_SECONDS = 600
+_BACKOFF_BASE_S = 30
+_BACKOFF_MAX_S = 3600
+_TIME_FMT = '%Y-%m-%d %H:%M:%S'
+STAGING_DIRNAME = ".publish"
+
+
+def _now() -> str:
+    return datetime.now().strftime(_TIME_FMT)
+
+
+# ── Staging ──────────────────────────────────────────────────────────────
+
+def staging_dir() -> str:
+    return os.path.join(get_output_dir(), STAGING_DIRNAME)
+
+
+def _stage(source_path: str) -> str:
+    """Copy *source_path* to a new, never-rewritten file in the staging dir."""
+    os.makedirs(staging_dir(), exist_ok=True)
+    staged = os.path.join(staging_dir(), f"{os.path.basename(source_path)}.{time.time_ns()}")
+    # copy2 keeps the mtime, so the size/mtime fast path still recognises unchanged content.
+    shutil.copy2(source_path, staged)
+    return staged
+
+
+def _discard_staged(path: str):
+    if not path or os.path.dirname(os.path.abspath(path)) != os.path.abspath(staging_dir()):
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove staged file {path}: {e}")
+
+
+def _prune_staging(min_age_s: int = _LEASE_SECONDS):
+    """Remove staged files no queue item refers to (left by a crash between stage and enqueue)."""
+    try:
+        names = os.listdir(staging_dir())
+    except FileNotFoundError:
+        return
+    with read_connection() as conn:
+        queued = {row[0] for row in conn.execute("SELECT source_path FROM publish_queue")}
+    cutoff = time.time() - min_age_s
+    for name in names:
+        path = os.path.join(staging_dir(), name)
+        try:
+            if path not in queued and os.stat(path).st_ctime < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+# ── Queue ────────────────────────────────────────────────────────────────
+
+def _enqueue(op: str, source_path: str, target_path: str):
+    now = _now()
+    with transaction() as conn:
+        superseded = [row[0] for row in conn.execute(
+            "SELECT source_path FROM publish_queue WHERE target_path = ?", (target_path,)
+        )]
+        conn.execute("DELETE FROM publish_queue WHERE target_path = ?", (target_path,))
+        conn.execute(
+            "INSERT INTO publish_queue (op, source_path, target_path, enqueued_at, next_attempt_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (op, source_path, target_path, now, now),
+        )
+    for path in superseded:
+        _discard_staged(path)
+
+
+def enqueue_copy(source_path: str, target_path: str):
+    """Queue a snapshot of *source_path* to be published to *target_path* (latest content wins).
+
+    The snapshot is taken now, so the caller may rewrite *source_path* at once.
+    """
+    staged = _stage(os.path.abspath(source_path))
+    try:
+        _enqueue('copy', staged, target_path)
+    except Exception:
+        _discard_staged(staged)
+        raise
+
+
+def enqueue_delete(target_path: str):
+    """Queue removal of *target_path* from the share."""
+    _enqueue('delete', '', target_path)
+
+
+def is_published(target_path: str) -> bool:
+    """True once *target_path* has been published at least once."""
+    return _published(target_path) is not None
+
+
+def pending() -> List[Dict[str, Any]]:
+    """Queued items in publish order (for the control panel / diagnostics)."""
+    with read_connection() as conn:
+        cur = conn.execute(
+            "SELECT id, op, source_path, target_path, enqueued_at, attempts, next_attempt_at, last_error "
+            "FROM publish_queue ORDER BY id"
+        )
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+# ── Publishing ───────────────────────────────────────────────────────────
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _published(target_path: str) -> Optional[tuple]:
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT sha256, size, mtime_ns FROM published_files WHERE target_path = ?", (target_path,)
+        ).fetchone()
+
+
+def _publish_copy(source_path: str, target_path: str) -> bool:
+    """Copy unless the target already holds this content. Returns True if copied."""
+    stat = os.stat(source_path)
+    previous = _published(target_path)
+    if previous and previous[1:] == (stat.st_size, stat.st_mtime_ns) and os.path.exists(target_path):
+        return False
+    sha = _sha256(source_path)
+    if previous and previous[0] == sha and os.path.exists(target_path):
+        copied = False
+    else:
+        parent = os.path.dirname(target_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        shutil.copyfile(source_path, target_path + '.tmp')
+        os.replace(target_path + '.tmp', target_path)
+        copied = True
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO published_files (target_path, source_path, sha256, size, mtime_ns, published_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (target_path) DO UPDATE SET source_path = excluded.source_path, "
+            "sha256 = excluded.sha256, size = excluded.size, mtime_ns = excluded.mtime_ns, "
+            "published_at = excluded.published_at",
+            (target_path, source_path, sha, stat.st_size, stat.st_mtime_ns, _now()),
+        )
+    return copied
+
+
+def _publish_delete(target_path: str):
+    try:
+        os.remove(target_path)
+    except FileNotFoundError:
+        pass
+    with transaction() as conn:
+        conn.execute("DELETE FROM published_files WHERE target_path = ?", (target_path,))
+
+
+def _finish(item_id: int, source_path: str = ''):
+    # Re-enqueueing replaces the row (new id), so a newer request survives.
+    with transaction() as conn:
+        conn.execute("DELETE FROM publish_queue WHERE id = ?", (item_id,))
+    _discard_staged(source_path)
+
+
+def _retry_later(item_id: int, attempts: int, error: Exception):
+    delay = min(_BACKOFF_BASE_S * (2 ** attempts), _BACKOFF_MAX_S)
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE publish_queue SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+            ((datetime.now() + timedelta(seconds=delay)).strftime(_TIME_FMT), str(error)[:500], item_id),
+        )
+
+
+def _acquire_lease(renew: bool = False) -> bool:
+    now = datetime.now()
+    me = str(os.getpid())
+    with transaction() as conn:
+        holder, _, expires = _meta_get(conn, _LEASE_KEY).partition('|')
+        if holder and holder != me and expires > now.strftime(_TIME_FMT):
+            return False
+        if renew and holder != me:
+            return False
+        _meta_set(conn, _LEASE_KEY, f"{me}|{(now + timedelta(seconds=_LEASE_SECONDS)).strftime(_TIME_FMT)}")
+    return True
+
+
+def _release_lease():
+    with transaction() as conn:
+        if _meta_get(conn, _LEASE_KEY).partition('|')[0] == str(os.getpid()):
+            conn.execute("DELETE FROM db_meta WHERE key = ?", (_LEASE_KEY,))
+
+
+def drain_queue() -> Dict[str, int]:
+    """Publish every due item once, in queue order. Returns outcome counts."""
+    counts = {'copied': 0, 'skipped': 0, 'deleted': 0, 'failed': 0}
+    if not _acquire_lease():
+        logger.info("Another publisher is running - exiting")
+        return counts
+    try:
+        with read_connection() as conn:
+            items = conn.execute(
+                "SELECT id, op, source_path, target_path, attempts FROM publish_queue "
+                "WHERE next_attempt_at <= ? ORDER BY id",
+                (_now(),),
+            ).fetchall()
+        for item_id, op, source_path, target_path, attempts in items:
+            _acquire_lease(renew=True)
+            try:
+                if op == 'delete':
+                    _publish_delete(target_path)
+                    counts['deleted'] += 1
+                elif _publish_copy(source_path, target_path):
+                    counts['copied'] += 1
+                    logger.info(f"Published {source_path} -> {target_path}")
+                else:
+                    counts['skipped'] += 1
+                _finish(item_id, source_path)
+            except Exception as e:
+                counts['failed'] += 1
+                logger.error(f"Publish {op} -> {target_path} failed (attempt {attempts + 1}): {e}")
+                _retry_later(item_id, attempts, e)
+        _prune_staging()
+    finally:
+        _release_lease()
+    return counts
+
+
+def start_background() -> bool:
+    """Spawn a detached publisher if anything is queued. Returns True if spawned.
+
+    The driver calls this after the local export and returns immediately;
+    a slow or unreachable share never blocks a run.
+    """
+    try:
+        with read_connection() as conn:
+            if not conn.execute("SELECT 1 FROM publish_queue LIMIT 1").fetchone():
+                return False
+    except Exception:
+        return False
+
+    kwargs: Dict[str, Any] = {
+        'cwd': PROJECT_ROOT,
+        'stdin': subprocess.DEVNULL,
+        'stdout': subprocess.DEVNULL,
+        'stderr': subprocess.DEVNULL,
+        'close_fds': True,
+    }
+    if os.name == 'nt':
+        kwargs['creationflags'] = (
+            subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW
+        )
+    else:
+        kwargs['start_new_session'] = True
+    try:
+        subprocess.Popen([sys.executable, '-m', 'core.publisher'], **kwargs)
+    except OSError as e:
+        logger.error(f"Could not start background publisher: {e}")
+        return False
+    logger.info("Shared-drive publisher started in the background")
+    return True
+
+
+def main():
+    log_dir = get_log_dir()
+    os.makedirs(log_dir, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.FileHandler(
+            os.path.join(log_dir, f"publisher_{datetime.now().strftime('%Y%m%d')}.log"), encoding='utf-8'
+        )],
+        force=True,
+    )
+    init_db()
+    counts = drain_queue()
+    logger.info(
+        f"Publisher finished: {counts['copied']} copied, {counts['skipped']} identical, "
+        f"{counts['deleted']} deleted, {counts['failed']} failed"
+    )
+
+
+if __name__ == '__main__':
+    main()
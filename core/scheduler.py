@@ -0,0 +1,145 @@
+"""
+Resident Scheduler
+==================
+``python run.py --daemon`` keeps one driver process alive and runs a cycle
+(``run_all_workers()``) every ``daemon.interval_minutes`` instead of paying
+a cold start per Task Scheduler launch.
+
+Kept warm between cycles:
+  - Python, pandas and the config / settings cache
+  - SQLite connections and the schema check (``init_db`` returns at once)
+  - With ``daemon.keep_worker_processes`` (default on): each worker's spawned
+    process, so its imports (Playwright, pandas) are loaded once.  Browser
+    sessions are still opened and closed by each worker's ``run()``.
+
+Hot reload: ``settings.json`` and ``credentials.json`` are stat'ed before
+every cycle; a change reloads the config (the interval too).
+
+Overlap policy: cycles never overlap.  Ticks are aligned to the start
+time; when a cycle overruns, the ticks it missed are skipped (logged) and
+the next cycle starts at the next tick — a slow cycle cannot queue up work.
+
+Stop with Ctrl+C or SIGTERM; a running cycle is finished first (worker
+processes ignore the console's Ctrl+C while the daemon handles it).  A
+second Ctrl+C stops at once and kills the running worker processes.
+"""
+
+import os
+import signal
+import logging
+import threading
+import time
+from typing import Optional, Tuple
+
+from core import config
+from core.database import close_connections
+
+logger = logging.getLogger('scheduler')
+
+DEFAULT_INTERVAL_MINUTES = 5
+
+
+def _config_mtimes() -> Tuple[Optional[int], ...]:
+    mtimes = []
+    for path in (config.SETTINGS_PATH, config.CREDENTIALS_PATH):
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def _daemon_settings() -> dict:
+    return config.get_global_settings().get('daemon', {}) or {}
+
+
+def _interval_seconds() -> float:
+    try:
+        minutes = float(_daemon_settings().get('interval_minutes', DEFAULT_INTERVAL_MINUTES))
+    except (TypeError, ValueError):
+        minutes = DEFAULT_INTERVAL_MINUTES
+    return max(0.5, minutes) * 60
+
+
+class _StopFlag:
+    """Set by Ctrl+C / SIGTERM; sleeping between cycles wakes up at once."""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def install(self):
+        for name in ('SIGINT', 'SIGTERM', 'SIGBREAK'):
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                try:
+                    signal.signal(signum, self._handle)
+                except (ValueError, OSError):
+                    pass
+
+    def _handle(self, signum, frame):
+        if signum == signal.SIGINT and self.event.is_set():
+            # Second Ctrl+C: stop now.  The workers ignore SIGINT, and the
+            # executors wait for them on the way out, so kill them first.
+            from core import driver
+            driver.terminate_worker_processes()
+            raise KeyboardInterrupt
+        if not self.event.is_set():
+            logger.info("Stop requested - finishing the running cycle"
+                        + (" (Ctrl+C again to stop now)" if signum == signal.SIGINT else ""))
+        self.event.set()
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to *seconds*. Returns True if a stop was requested."""
+        return self.event.wait(max(0.0, seconds))
+
+
+def run_daemon():
+    """Run cycles on a fixed interval until stopped."""
+    from core import driver
+
+    stop = _StopFlag()
+    stop.install()
+    keep_processes = bool(_daemon_settings().get('keep_worker_processes', True))
+    driver.keep_worker_processes(keep_processes)
+
+    mtimes = _config_mtimes()
+    interval = _interval_seconds()
+    next_tick = time.monotonic()
+    logger.info(
+        f"Daemon started: every {interval / 60:g} min"
+        + (", worker processes kept warm" if keep_processes else "")
+    )
+    try:
+        while not stop.event.is_set():
+            current = _config_mtimes()
+            if current != mtimes:
+                previous_output = config.get_output_dir()
+                config.reload()
+                mtimes = current
+                if config.get_output_dir() != previous_output:
+                    close_connections()
+                if _interval_seconds() != interval:
+                    interval = _interval_seconds()
+                    next_tick = time.monotonic()
+                logger.info(f"settings.json changed - configuration reloaded (every {interval / 60:g} min)")
+            driver.roll_log_file()
+
+            try:
+                driver.run_all_workers()
+            except Exception as e:
+                logger.error(f"Cycle failed: {e}", exc_info=True)
+
+            # Next tick strictly in the future; ticks the cycle overran are dropped.
+            now = time.monotonic()
+            next_tick += interval
+            if next_tick <= now:
+                missed = int((now - next_tick) // interval) + 1
+                next_tick += missed * interval
+                logger.warning(f"Cycle overran the interval - skipped {missed} tick(s)")
+            if stop.wait(next_tick - time.monotonic()):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        driver.keep_worker_processes(False)
+        logger.info("Daemon stopped")
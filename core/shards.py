@@ -0,0 +1,343 @@
+"""
+Monthly Shard Databases
+=======================
+Optional storage layout that keeps the KPI rows of closed months out of
+``kpi_data.db``:
+
+    output/kpi_data.db                   dimensions, logs, rollups, hot months
+    output/shards/kpi_facts_2026-07.db   one file per closed month (kpi_facts only)
+
+  - Writes: upserts go to the main database, which keeps the current month
+    plus ``shard_hot_months - 1`` previous ones.  A write that reaches an
+    already-rotated month (late re-scrape, or a replace of a report with
+    rows in shards) ATTACHes those shards on the writer
+    (``attached_for_write``); the diff, inserts, updates, deletes and
+    rollups then use the shard rows, so a month is never stored twice.
+  - Rotation (``"storage_layout": "monthly"``, run from ``cleanup_old_data``):
+    each month older than the hot window is moved into its shard file in
+    one transaction, which also bumps the moved days' export versions and
+    recomputes their rollups.
+  - Reads: ``window_reader(start, end)`` ATTACHes only the shards that
+    overlap the window and shadows ``kpi_facts`` / ``kpi_snapshots`` with
+    TEMP ``UNION ALL`` views, so the export SQL runs unchanged.  Without
+    shards in the window it is the normal pooled reader.  SQLite attaches
+    at most ``MAX_ATTACHED`` (10) databases per connection, so readers of
+    wider windows (full exports, ``row_count``) iterate ``window_readers()``,
+    one connection per run of up to 10 shards, and combine the results.
+  - Retention: a shard whose whole month is older than
+    ``data_retention_days`` is deleted as a file — no row deletes, no VACUUM.
+  - Backups: a closed shard is a self-contained file (rollback journal, not
+    WAL), so copying it is the backup.  Restore it next to the main database;
+    dimension keys live there.
+"""
+
+import os
+import re
+import sqlite3
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+from core.config import get_global_settings
+import core.database as db
+
+logger = logging.getLogger('database')
+
+SHARD_DIRNAME = "shards"
+_SHARD_PATTERN = re.compile(r'^kpi_facts_(\d{4}-\d{2})\.db$')
+
+# SQLite's default SQLITE_MAX_ATTACHED: databases one connection can ATTACH
+# besides main.
+MAX_ATTACHED = 10
+
+_FACT_COLUMNS = (
+    'id, report_key, version_key, metric_key, category_key, data_datetime, data_date, '
+    'scrape_timestamp, value, value_num, value_kind'
+)
+
+_CREATE_SHARD = """
+CREATE TABLE IF NOT EXISTS kpi_facts (
+    id               INTEGER PRIMARY KEY,
+    report_key       INTEGER NOT NULL,
+    version_key      INTEGER NOT NULL,
+    metric_key       INTEGER NOT NULL,
+    category_key     INTEGER NOT NULL,
+    data_datetime    TEXT    NOT NULL DEFAULT '',
+    data_date        TEXT    NOT NULL DEFAULT '',
+    scrape_timestamp TEXT    NOT NULL,
+    value            TEXT    NOT NULL DEFAULT '',
+    value_num        REAL,
+    value_kind       INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_facts_dedup
+    ON kpi_facts (report_key, data_datetime, metric_key, category_key);
+CREATE INDEX IF NOT EXISTS idx_facts_data_date ON kpi_facts (data_date);
+"""
+
+
+def shard_dir() -> str:
+    return os.path.join(os.path.dirname(db._db_path()), SHARD_DIRNAME)
+
+
+def shard_path(month: str) -> str:
+    """File for *month* ('YYYY-MM')."""
+    return os.path.join(shard_dir(), f"kpi_facts_{month}.db")
+
+
+def list_shards() -> Dict[str, str]:
+    """Return ``{month: path}`` for every shard file, oldest first."""
+    try:
+        names = os.listdir(shard_dir())
+    except FileNotFoundError:
+        return {}
+    shards = {}
+    for name in sorted(names):
+        match = _SHARD_PATTERN.match(name)
+        if match:
+            shards[match.group(1)] = os.path.join(shard_dir(), name)
+    return shards
+
+
+def _alias(month: str) -> str:
+    return f"shard_{month.replace('-', '_')}"
+
+
+def _next_month(month: str) -> str:
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def _hot_boundary(hot_months: int) -> str:
+    """First day of the oldest month kept in the main database."""
+    now = datetime.now()
+    index = now.year * 12 + now.month - 1 - (max(1, hot_months) - 1)
+    return f"{index // 12:04d}-{index % 12 + 1:02d}-01"
+
+
+def _create_shard(month: str) -> str:
+    path = shard_path(month)
+    os.makedirs(shard_dir(), exist_ok=True)
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(_CREATE_SHARD)
+    finally:
+        conn.close()
+    return path
+
+
+# ── Rotation / retention ──────────────────────────────────────────────────
+
+def rotate_shards(hot_months: int = None) -> int:
+    """Move every month older than the hot window into its shard. Returns rows moved.
+
+    Rows are copied by their natural key (INSERT OR REPLACE), so a key that
+    is also in the shard already is merged, the main-database copy winning.
+    """
+    if hot_months is None:
+        hot_months = int(get_global_settings().get('shard_hot_months', 2) or 2)
+    boundary = _hot_boundary(hot_months)
+    with db.read_connection() as conn:
+        months = [row[0] for row in conn.execute(
+            "SELECT DISTINCT substr(data_date, 1, 7) FROM kpi_facts WHERE data_date < ?", (boundary,)
+        ).fetchall() if re.match(r'^\d{4}-\d{2}$', row[0] or '')]
+
+    total = 0
+    for month in months:
+        path = _create_shard(month)
+        bounds = (f"{month}-01", f"{_next_month(month)}-01")
+        columns = _FACT_COLUMNS.replace('id, ', '', 1)
+        with attached_for_write({month: path}) as shards:
+            with db.transaction() as conn:
+                report_days = conn.execute(
+                    "SELECT DISTINCT report_key, data_date FROM main.kpi_facts WHERE data_date >= ? AND data_date < ?",
+                    bounds,
+                ).fetchall()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {shards[month]}.kpi_facts ({columns}) "
+                    f"SELECT {columns} FROM main.kpi_facts WHERE data_date >= ? AND data_date < ?",
+                    bounds,
+                )
+                moved = conn.execute(
+                    "DELETE FROM main.kpi_facts WHERE data_date >= ? AND data_date < ?", bounds
+                ).rowcount
+                # A key stored in both files (a pre-existing late write) just
+                # collapsed to one row: exports and rollups of those days change.
+                db._touch_days(conn, (day for _, day in report_days))
+                db._refresh_rollups(conn, report_days, shards)
+        total += moved
+        logger.info(f"Moved {moved} rows for {month} -> {path}")
+    return total
+
+
+def drop_expired_shards(cutoff: str) -> List[str]:
+    """Delete shard files whose whole month is older than *cutoff*. Returns the months dropped."""
+    dropped = []
+    for month, path in list_shards().items():
+        if f"{_next_month(month)}-01" > cutoff:
+            continue
+        conn = sqlite3.connect(path)
+        try:
+            dates = [row[0] for row in conn.execute("SELECT DISTINCT data_date FROM kpi_facts")]
+        finally:
+            conn.close()
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not delete expired shard {path}: {e}")
+            continue
+        with db.transaction() as conn:
+            db._touch_days(conn, dates)
+        dropped.append(month)
+        logger.info(f"Retention: dropped shard {month} ({len(dates)} days)")
+    return dropped
+
+
+def remove_all_shards() -> int:
+    """Delete every shard file (``clear_data``). Returns the number removed."""
+    removed = 0
+    for path in list_shards().values():
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            logger.warning(f"Could not delete shard {path}: {e}")
+    return removed
+
+
+def shards_for_write(dates, replace_report: tuple = None) -> Dict[str, str]:
+    """Shards a metric write must see: ``{month: path}``.
+
+    The rotated months among *dates* ('YYYY-MM-DD'), plus, for a replace of
+    ``(source, report_id)``, every shard that still holds rows of that report.
+    """
+    shards = list_shards()
+    if not shards:
+        return {}
+    months = {str(date)[:7] for date in dates}
+    wanted = {month: path for month, path in shards.items() if month in months}
+    if replace_report:
+        with db.read_connection() as conn:
+            row = conn.execute(
+                "SELECT id FROM reports WHERE source = ? AND report_id = ?", replace_report
+            ).fetchone()
+        for month, path in shards.items():
+            if row is not None and month not in wanted and _shard_has_report(path, row[0]):
+                wanted[month] = path
+    return wanted
+
+
+def _shard_has_report(path: str, report_key: int) -> bool:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT 1 FROM kpi_facts WHERE report_key = ? LIMIT 1", (report_key,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+@contextmanager
+def attached_for_write(shards: Dict[str, str]) -> Iterator[Dict[str, str]]:
+    """ATTACH *shards* ({month: path}) on the writer connection; yield ``{month: alias}``.
+
+    Holds the writer for the whole block, so open ``db.transaction()`` inside
+    it.  ATTACH is not allowed inside a transaction, and SQLite attaches at
+    most 10 databases by default.
+    """
+    if not shards:
+        yield {}
+        return
+    with db._connections.writer() as conn:
+        if db._connections.in_transaction():
+            raise RuntimeError("Monthly shards must be attached before the write transaction starts")
+        aliases: Dict[str, str] = {}
+        try:
+            for month, path in shards.items():
+                alias = _alias(month)
+                conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+                aliases[month] = alias
+            yield aliases
+        finally:
+            for alias in aliases.values():
+                conn.execute(f"DETACH DATABASE {alias}")
+
+
+# ── Reads ─────────────────────────────────────────────────────────────────
+
+def _window_shards(start_date: str = None, end_date: str = None) -> Dict[str, str]:
+    first = (start_date or '')[:7]
+    last = (end_date or '9999-12')[:7]
+    return {month: path for month, path in list_shards().items() if first <= month <= last}
+
+
+def _batches(shards: Dict[str, str]) -> List[Dict[str, str]]:
+    """Split ``{month: path}`` into runs of at most MAX_ATTACHED shards, oldest first."""
+    months = list(shards)
+    return [
+        {month: shards[month] for month in months[i:i + MAX_ATTACHED]}
+        for i in range(0, len(months), MAX_ATTACHED)
+    ] or [{}]
+
+
+@contextmanager
+def _shard_reader(shards: Dict[str, str], with_main: bool = True) -> Iterator[sqlite3.Connection]:
+    """Unpooled connection whose ``kpi_facts`` / ``kpi_snapshots`` are the union of *shards* (and main)."""
+    conn = db._connections.connect()
+    try:
+        selects = [f"SELECT {_FACT_COLUMNS} FROM main.kpi_facts"] if with_main else []
+        for month, path in shards.items():
+            alias = _alias(month)
+            conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+            selects.append(f"SELECT {_FACT_COLUMNS} FROM {alias}.kpi_facts")
+        conn.execute(f"CREATE TEMP VIEW kpi_facts AS {' UNION ALL '.join(selects)}")
+        view_sql = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'view' AND name = 'kpi_snapshots'"
+        ).fetchone()[0]
+        conn.execute(
+            re.sub(r'^\s*CREATE VIEW', 'CREATE TEMP VIEW', view_sql, count=1)
+            .replace('FROM kpi_facts f', 'FROM temp.kpi_facts f')
+        )
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def window_reader(start_date: str = None, end_date: str = None) -> Iterator[sqlite3.Connection]:
+    """Read connection whose ``kpi_facts`` / ``kpi_snapshots`` include the shards in the window.
+
+    Dates are 'YYYY-MM-DD'; omit both for every shard.  One connection can
+    attach at most MAX_ATTACHED shards; wider windows go through
+    ``window_readers()``.
+    """
+    shards = _window_shards(start_date, end_date)
+    if not shards:
+        with db.read_connection() as conn:
+            yield conn
+        return
+    if len(shards) > MAX_ATTACHED:
+        raise RuntimeError(
+            f"{len(shards)} monthly shards in {start_date or '...'} -> {end_date or '...'}; "
+            f"a single reader attaches at most {MAX_ATTACHED} (use window_readers)"
+        )
+    with _shard_reader(shards) as conn:
+        yield conn
+
+
+def window_readers(start_date: str = None, end_date: str = None) -> Iterator[sqlite3.Connection]:
+    """Yield read connections that together cover the window, oldest months first.
+
+    Each sees at most MAX_ATTACHED shards; the main database (the newest,
+    hot months) is part of the last one, so running the same ordered query
+    on each connection in turn returns the rows in month order.  A window
+    with up to MAX_ATTACHED shards is a single connection, as
+    ``window_reader()``.
+    """
+    shards = _window_shards(start_date, end_date)
+    if not shards:
+        with db.read_connection() as conn:
+            yield conn
+        return
+    batches = _batches(shards)
+    for index, batch in enumerate(batches):
+        with _shard_reader(batch, with_main=index == len(batches) - 1) as conn:
+            yield conn
@@ -0,0 +1,73 @@
+"""
+Value Kinds
+===========
+Classification and numeric parsing of scraped KPI cell text.
+
+Workers deliver values as display strings ("85.3%", "00:04:12", "1,234").
+The database parses them once at ingest into ``value_num`` + ``value_kind``
+so rollups and comparisons never have to re-parse strings.
+
+    numeric   "1,234"     -> 1234.0
+    percent   "85.3%"     -> 85.3     (percentage points, not a fraction)
+    duration  "00:04:12"  -> 252.0    (seconds)
+    text      anything else -> None
+"""
+
+import re
+from typing import Any, Optional, Tuple
+
+DURATION_RE = re.compile(r'^-?\d{1,3}:\d{2}:\d{2}$')
+NUMERIC_RE = re.compile(r'^-?\d+(?:\.\d+)?$')
+
+# Integer codes stored in kpi_facts.value_kind
+VALUE_KIND_TEXT = 0
+VALUE_KIND_NUMERIC = 1
+VALUE_KIND_PERCENT = 2
+VALUE_KIND_DURATION = 3
+
+VALUE_KIND_CODES = {
+    'text': VALUE_KIND_TEXT,
+    'numeric': VALUE_KIND_NUMERIC,
+    'percent': VALUE_KIND_PERCENT,
+    'duration': VALUE_KIND_DURATION,
+}
+VALUE_KIND_NAMES = {code: name for name, code in VALUE_KIND_CODES.items()}
+
+
+def classify_value_kind(value: Any) -> str:
+    """Return 'empty', 'percent', 'duration', 'numeric' or 'text'."""
+    text = str(value).strip() if value is not None else ''
+    if not text:
+        return 'empty'
+    if text.endswith('%') and NUMERIC_RE.match(text[:-1].strip()):
+        return 'percent'
+    if DURATION_RE.match(text):
+        return 'duration'
+    if NUMERIC_RE.match(text.replace(',', '')):
+        return 'numeric'
+    return 'text'
+
+
+def _duration_seconds(text: str) -> float:
+    negative = text.startswith('-')
+    hours, minutes, seconds = (int(part) for part in text.lstrip('-').split(':'))
+    total = float(hours * 3600 + minutes * 60 + seconds)
+    return -total if negative else total
+
+
+def parse_value(value: Any) -> Tuple[Optional[float], int]:
+    """Return ``(value_num, value_kind_code)`` for a raw KPI value."""
+    if isinstance(value, bool):
+        return None, VALUE_KIND_TEXT
+    if isinstance(value, (int, float)):
+        return float(value), VALUE_KIND_NUMERIC
+
+    text = str(value).strip() if value is not None else ''
+    kind = classify_value_kind(text)
+    if kind == 'percent':
+        return float(text[:-1].strip()), VALUE_KIND_PERCENT
+    if kind == 'duration':
+        return _duration_seconds(text), VALUE_KIND_DURATION
+    if kind == 'numeric':
+        return float(text.replace(',', '')), VALUE_KIND_NUMERIC
+    return None, VALUE_KIND_TEXT
@@ -2,7 +2,8 @@
 Data Aggregator — Entry Point
 ==============================
 Run this script to execute all enabled workers.
-Usage:  python run.py
+Usage:  python run.py              one run (Task Scheduler)
+        python run.py --daemon     stay resident, run every daemon.interval_minutes
 """
 import os
 import sys
@@ -0,0 +1,13 @@
+@echo off
+REM ============================================================
+REM Run Data Aggregator resident (one Task Scheduler "At log on"
+REM task instead of a 5-minute trigger; interval in settings.json)
+REM ============================================================
+set "SCRIPT_DIR=%~dp0"
+set "PROJECT_DIR=%SCRIPT_DIR%.."
+set "PYTHON_EXE=%PROJECT_DIR%\python_installer\python_bin\python.exe"
+set "ENTRY=%PROJECT_DIR%\run.py"
+
+if exist "%PYTHON_EXE%" (
+    "%PYTHON_EXE%" "%ENTRY%" --daemon
+)
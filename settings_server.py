@@ -278,16 +278,10 @@ class SettingsHandler(BaseHTTPRequestHandler):
         """Delete all rows from the database tables and remove the CSV file."""
         try:
             import os
-            from core.database import _get_conn, CSV_FILENAME
+            from core.database import clear_data, CSV_FILENAME
             from core.config import get_output_dir
 
-            conn = _get_conn()
-            try:
-                conn.execute('DELETE FROM kpi_snapshots')
-                conn.execute('DELETE FROM scrape_log')
-                conn.commit()
-            finally:
-                conn.close()
+            clear_data()
 
             csv_path = os.path.join(get_output_dir(), CSV_FILENAME)
             if os.path.exists(csv_path):
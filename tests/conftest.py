@@ -0,0 +1,26 @@
+"""
+Shared fixtures: every test gets its own output directory, so the SQLite
+database, CSV exports and caches live under pytest's tmp_path.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.config as config
+import core.database as db
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    """Point ``global.output_dir`` at *tmp_path* and open a fresh database there."""
+    settings = config._default_settings()
+    settings['global'] = dict(settings.get('global', {}), output_dir=str(tmp_path))
+    monkeypatch.setattr(config, '_settings_cache', settings)
+    db._connections.close_all()
+    db.init_db()
+    yield str(tmp_path)
+    db._connections.close_all()
@@ -0,0 +1,46 @@
+"""One-time CSV import (``migrate_csv_to_db``) and its rejection report."""
+
+import csv
+import os
+
+import core.database as db
+
+HEADER = 'scrape_timestamp,data_datetime,source,report_id,metric_title,category,value'
+
+
+def _write_csv(path: str, lines: list):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write('\n'.join([HEADER] + lines) + '\n')
+
+
+def test_bad_rows_go_to_the_rejection_report(output_dir):
+    path = os.path.join(output_dir, 'legacy.csv')
+    _write_csv(path, [
+        '2026-10-01 08:00:00,2026-10-01 07:00:00,cuic,r1,Calls,A,10',
+        '2026-10-01 08:00:00,2026-10-01 07:00:00,cuic,r1,Calls,B,10,extra',
+        '2026-10-01 08:00:00,2026-10-01 07:00:00,,r1,Calls,C,10',
+        '2026-10-01 08:00:00,2026-10-01 07:00:00,cuic',
+        '2026-10-01 08:00:00,2026-10-01 08:00:00,cuic,r1,Calls,A,12',
+    ])
+
+    assert db.migrate_csv_to_db(path, force=True) == 2
+
+    with db.read_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM kpi_facts").fetchone()[0] == 2
+    with open(path + '.rejected.csv', newline='', encoding='utf-8') as f:
+        rejects = list(csv.DictReader(f))
+    assert [(r['line'], r['reason']) for r in rejects] == [
+        ('3', 'too many fields'),
+        ('4', 'empty source'),
+        ('5', 'too few fields'),
+    ]
+    assert rejects[1]['category'] == 'C'
+
+
+def test_import_runs_once(output_dir):
+    path = os.path.join(output_dir, 'legacy.csv')
+    _write_csv(path, ['2026-10-01 08:00:00,2026-10-01 07:00:00,cuic,r1,Calls,A,10'])
+
+    assert db.migrate_csv_to_db(path) == 1
+    assert db.migrate_csv_to_db(path) == 0
+    assert not os.path.exists(path + '.rejected.csv')
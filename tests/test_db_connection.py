@@ -0,0 +1,32 @@
+"""``core.db_connection.ConnectionManager`` transactions."""
+
+import sqlite3
+
+import pytest
+
+import core.database as db
+
+
+def test_error_after_sqlite_rolled_back_is_not_masked(output_dir):
+    class Boom(Exception):
+        pass
+
+    with pytest.raises(Boom):
+        with db._connections.transaction() as conn:
+            conn.execute("ROLLBACK")   # as SQLite does itself after SQLITE_FULL
+            raise Boom()
+
+    with db._connections.transaction() as conn:
+        assert conn.in_transaction
+
+
+def test_failed_body_is_rolled_back(output_dir):
+    with pytest.raises(sqlite3.OperationalError):
+        with db._connections.transaction() as conn:
+            conn.execute("CREATE TABLE t_rollback (x INTEGER)")
+            conn.execute("SELECT * FROM no_such_table")
+
+    with db.read_connection() as conn:
+        assert conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 't_rollback'"
+        ).fetchone()[0] == 0
@@ -0,0 +1,43 @@
+"""Incremental CSV export (``core.database.export_csv``)."""
+
+import os
+from datetime import datetime
+
+import core.database as db
+
+
+def _today() -> str:
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def _seed():
+    db.upsert_metrics('src', [
+        {'metric_title': 'Calls', 'category': 'Queue A', 'value': '12', 'data_datetime': f"{_today()} 09:00:00"},
+        {'metric_title': 'Calls', 'category': 'Queue B', 'value': '7', 'data_datetime': f"{_today()} 10:00:00"},
+    ], replace_report=True, report_id='r1')
+
+
+def _read(path: str) -> str:
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_unchanged_window_skips_rewrite(output_dir):
+    _seed()
+    assert db.export_csv(output_dir, shared_drive_path='') is True
+    assert db.export_csv(output_dir, shared_drive_path='') is False
+
+
+def test_force_rebuilds_tampered_fragment(output_dir):
+    _seed()
+    db.export_csv(output_dir, shared_drive_path='')
+    csv_path = os.path.join(output_dir, db.CSV_FILENAME)
+    expected = _read(csv_path)
+
+    fragment = os.path.join(output_dir, db._EXPORT_CACHE_DIR, f"{_today()}.csv")
+    with open(fragment, 'w', encoding='utf-8') as f:
+        f.write("tampered\n")
+
+    assert db.export_csv(output_dir, shared_drive_path='', force=True) is True
+    assert _read(fragment) != "tampered\n"
+    assert _read(csv_path) == expected
@@ -0,0 +1,81 @@
+"""Schema migrations of databases created before versioning (``init_db``)."""
+
+import os
+import sqlite3
+
+import core.config as config
+import core.database as db
+
+
+def _legacy_db(tmp_path, monkeypatch, rows) -> str:
+    """A pre-migration ``kpi_snapshots`` table holding *rows*; returns the output dir."""
+    out = tmp_path / 'legacy'
+    out.mkdir()
+    monkeypatch.setitem(config._settings_cache['global'], 'output_dir', str(out))
+    db.close_connections()
+    conn = sqlite3.connect(os.path.join(str(out), db.DB_FILENAME))
+    conn.execute(db._CREATE_TABLE)
+    conn.execute(db._CREATE_SCRAPE_LOG)
+    conn.executemany(
+        "INSERT INTO kpi_snapshots (scrape_timestamp, data_datetime, source, report_id, definition_hash, "
+        "report_name, metric_title, category, value) VALUES (?, ?, 'cuic', 'r1', ?, ?, 'Calls', 'A', ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+    return str(out)
+
+
+def test_history_keeps_the_label_each_row_was_written_under(output_dir, tmp_path, monkeypatch):
+    _legacy_db(tmp_path, monkeypatch, [
+        ('2026-09-01 08:00:00', '2026-09-01 07:00:00', 'h1', 'Old label', '10'),
+        ('2026-10-01 08:00:00', '2026-10-01 07:00:00', 'h2', 'New label', '12'),
+    ])
+    db.init_db()
+
+    with db.read_connection() as conn:
+        rows = conn.execute(
+            "SELECT data_datetime, report_id, definition_hash, report_name FROM kpi_snapshots ORDER BY data_datetime"
+        ).fetchall()
+        latest = conn.execute("SELECT definition_hash, report_name FROM reports WHERE report_id = 'r1'").fetchone()
+    assert rows == [
+        ('2026-09-01 07:00:00', 'r1', 'h1', 'Old label'),
+        ('2026-10-01 07:00:00', 'r1', 'h2', 'New label'),
+    ]
+    assert latest == ('h2', 'New label')
+
+
+def test_relabelled_rescrape_updates_only_the_rows_it_writes(output_dir):
+    rows = [
+        {'metric_title': 'Calls', 'category': 'A', 'value': '10', 'data_datetime': '2026-10-01 07:00:00'},
+        {'metric_title': 'Calls', 'category': 'A', 'value': '11', 'data_datetime': '2026-10-02 07:00:00'},
+    ]
+    db.upsert_metrics('cuic', rows, report_id='r1', definition_hash='h1', report_name='Old label')
+
+    result = db.upsert_metrics('cuic', rows[1:], report_id='r1', definition_hash='h2', report_name='New label')
+
+    assert result == db.WriteResult(updated=1)
+    with db.read_connection() as conn:
+        assert conn.execute(
+            "SELECT definition_hash, report_name FROM kpi_snapshots ORDER BY data_datetime"
+        ).fetchall() == [('h1', 'Old label'), ('h2', 'New label')]
+
+
+def test_init_assigns_configured_ids_to_blank_rows(output_dir, monkeypatch):
+    report = {'label': 'Daily', 'report_id': 'r-daily', 'folder': 'F', 'name': 'N'}
+    monkeypatch.setitem(config._settings_cache, 'workers', {'cuic': {'reports': [report]}})
+    rows = [{'metric_title': 'Calls', 'category': 'A', 'value': '10', 'data_datetime': '2026-10-01 07:00:00'}]
+    db.upsert_metrics('cuic', rows, report_name='Daily')
+    db.upsert_metrics('cuic', [dict(rows[0], category='B')], report_name='Other')
+    db.log_scrape('cuic', 'Daily', 'success', row_count=1)
+
+    db._initialized_paths.clear()
+    db.init_db()
+
+    definition_hash = config.get_report_definition_hash('cuic', report)
+    with db.read_connection() as conn:
+        assert conn.execute(
+            "SELECT report_id, definition_hash, report_name FROM kpi_snapshots ORDER BY report_name"
+        ).fetchall() == [('r-daily', definition_hash, 'Daily'), ('', '', 'Other')]
+        assert conn.execute("SELECT report_id FROM scrape_log").fetchall() == [('r-daily',)]
+    assert [(s['report_id'], s['report_label']) for s in db.get_latest_scrape_status()] == [('r-daily', 'Daily')]
@@ -0,0 +1,66 @@
+"""Day-partitioned CSV export (``core.partitioned_export``)."""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+import core.database as db
+from core.partitioned_export import MANIFEST_FILENAME, PARTITION_DIRNAME, _file_sha256, export_csv_partitions
+
+TODAY = datetime.now().strftime('%Y-%m-%d')
+YESTERDAY = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def _row(day: str, hour: int, value) -> dict:
+    return {'metric_title': 'Calls', 'category': 'A', 'value': str(value), 'data_datetime': f"{day} {hour:02d}:00:00"}
+
+
+def _manifest(output_dir: str) -> dict:
+    with open(os.path.join(output_dir, PARTITION_DIRNAME, MANIFEST_FILENAME), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_manifest_lists_each_day(output_dir):
+    db.upsert_metrics('cuic', [_row(YESTERDAY, 9, 1), _row(TODAY, 9, 2), _row(TODAY, 10, 3)],
+                      replace_report=True, report_id='r1')
+
+    assert export_csv_partitions(output_dir, shared_dir='') is True
+
+    manifest = _manifest(output_dir)
+    assert manifest['columns'] == db.EXPORT_COLUMNS
+    assert manifest['window'][1] == TODAY
+    partitions = manifest['partitions']
+    assert sorted(partitions) == [YESTERDAY, TODAY]
+    assert {day: entry['rows'] for day, entry in partitions.items()} == {YESTERDAY: 1, TODAY: 2}
+    for day, entry in partitions.items():
+        path = os.path.join(output_dir, PARTITION_DIRNAME, entry['file'])
+        assert entry['file'] == f"{day}.csv"
+        assert entry['sha256'] == _file_sha256(path)
+        with open(path, encoding='utf-8') as f:
+            assert f.readline().strip() == ','.join(db.EXPORT_COLUMNS)
+
+
+def test_only_changed_days_are_rewritten(output_dir):
+    db.upsert_metrics('cuic', [_row(YESTERDAY, 9, 1), _row(TODAY, 9, 2)], replace_report=True, report_id='r1')
+    export_csv_partitions(output_dir, shared_dir='')
+    before = _manifest(output_dir)['partitions']
+    assert export_csv_partitions(output_dir, shared_dir='') is False
+
+    db.upsert_metrics('cuic', [_row(TODAY, 9, 5)], report_id='r1')
+    assert export_csv_partitions(output_dir, shared_dir='') is True
+
+    after = _manifest(output_dir)['partitions']
+    assert after[YESTERDAY] == before[YESTERDAY]
+    assert after[TODAY]['version'] != before[TODAY]['version']
+    assert after[TODAY]['sha256'] != before[TODAY]['sha256']
+
+
+def test_emptied_day_is_removed(output_dir):
+    db.upsert_metrics('cuic', [_row(YESTERDAY, 9, 1), _row(TODAY, 9, 2)], replace_report=True, report_id='r1')
+    export_csv_partitions(output_dir, shared_dir='')
+
+    db.upsert_metrics('cuic', [_row(TODAY, 9, 2)], replace_report=True, report_id='r1')
+    assert export_csv_partitions(output_dir, shared_dir='') is True
+
+    assert sorted(_manifest(output_dir)['partitions']) == [TODAY]
+    assert not os.path.exists(os.path.join(output_dir, PARTITION_DIRNAME, f"{YESTERDAY}.csv"))
@@ -0,0 +1,40 @@
+"""Background shared-drive publisher (``core.publisher``)."""
+
+import os
+
+import core.publisher as publisher
+
+
+def _write(path: str, text: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _read(path: str) -> str:
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_publishes_the_staged_snapshot(output_dir):
+    source = os.path.join(output_dir, 'export.csv')
+    target = os.path.join(output_dir, 'share', 'export.csv')
+    _write(source, "v1\n")
+    publisher.enqueue_copy(source, target)
+    _write(source, "v2\n")  # the exporter rewrites its file before the publisher runs
+
+    assert publisher.drain_queue()['copied'] == 1
+    assert _read(target) == "v1\n"
+    assert os.listdir(publisher.staging_dir()) == []
+
+
+def test_reenqueue_discards_the_superseded_snapshot(output_dir):
+    source = os.path.join(output_dir, 'export.csv')
+    target = os.path.join(output_dir, 'share', 'export.csv')
+    _write(source, "v1\n")
+    publisher.enqueue_copy(source, target)
+    _write(source, "v2\n")
+    publisher.enqueue_copy(source, target)
+
+    assert len(os.listdir(publisher.staging_dir())) == 1
+    publisher.drain_queue()
+    assert _read(target) == "v2\n"
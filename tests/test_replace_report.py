@@ -0,0 +1,46 @@
+"""Diff-based ``upsert_metrics(replace_report=True)`` writes."""
+
+import core.database as db
+
+DAY = '2026-10-01'
+
+
+def _row(hour: int, value) -> dict:
+    return {'metric_title': 'Calls', 'category': 'A', 'value': str(value), 'data_datetime': f"{DAY} {hour:02d}:00:00"}
+
+
+def _facts() -> dict:
+    with db.read_connection() as conn:
+        return {
+            data_datetime: (fact_id, value, scraped_at)
+            for fact_id, data_datetime, value, scraped_at in conn.execute(
+                "SELECT id, data_datetime, value, scrape_timestamp FROM kpi_facts"
+            )
+        }
+
+
+def test_replace_writes_only_the_delta(output_dir):
+    first = db.upsert_metrics('cuic', [_row(h, 10) for h in range(4)], replace_report=True, report_id='r1')
+    assert first == db.WriteResult(inserted=4)
+
+    with db.transaction() as conn:
+        conn.execute("UPDATE kpi_facts SET scrape_timestamp = '2000-01-01 00:00:00'")
+    before = _facts()
+
+    # hour 0 unchanged, hour 1 changed, hours 2-3 dropped, hour 4 new
+    result = db.upsert_metrics('cuic', [_row(0, 10), _row(1, 11), _row(4, 10)], replace_report=True, report_id='r1')
+
+    assert result == db.WriteResult(inserted=1, updated=1, deleted=2, unchanged=1)
+    assert result.changed == 4
+    after = _facts()
+    assert sorted(after) == [f"{DAY} 00:00:00", f"{DAY} 01:00:00", f"{DAY} 04:00:00"]
+    assert after[f"{DAY} 00:00:00"] == before[f"{DAY} 00:00:00"]
+    assert after[f"{DAY} 01:00:00"][0] == before[f"{DAY} 01:00:00"][0]
+    assert after[f"{DAY} 01:00:00"][1:] != before[f"{DAY} 01:00:00"][1:]
+
+
+def test_identical_replace_changes_nothing(output_dir):
+    rows = [_row(h, 10) for h in range(3)]
+    db.upsert_metrics('cuic', rows, replace_report=True, report_id='r1')
+
+    assert db.upsert_metrics('cuic', rows, replace_report=True, report_id='r1') == db.WriteResult(unchanged=3)
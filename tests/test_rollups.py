@@ -0,0 +1,40 @@
+"""Hour/day rollups of numeric values (``kpi_rollup_hour`` / ``kpi_rollup_day``)."""
+
+from datetime import datetime
+
+import core.database as db
+
+
+def _rollup(grain: str) -> list:
+    today = datetime.now().strftime('%Y-%m-%d')
+    with db.read_connection() as conn:
+        cur = conn.execute(db._rollup_select(grain), db._rollup_bounds(today, today))
+        return [dict(zip(db.ROLLUP_COLUMNS, row)) for row in cur.fetchall()]
+
+
+def test_date_only_rows_are_kept_apart_from_intervals(output_dir):
+    today = datetime.now().strftime('%Y-%m-%d')
+    db.upsert_metrics('cuic', [
+        {'metric_title': 'Calls', 'category': 'Queue A', 'value': '30', 'data_datetime': today},
+        {'metric_title': 'Calls', 'category': 'Queue A', 'value': '10', 'data_datetime': f"{today} 00:00:00"},
+        {'metric_title': 'Calls', 'category': 'Queue A', 'value': '10', 'data_datetime': f"{today} 00:30:00"},
+        {'metric_title': 'Calls', 'category': 'Queue A', 'value': '10', 'data_datetime': f"{today} 01:00:00"},
+    ], replace_report=True, report_id='r1')
+
+    hours = {row['bucket']: (row['count'], row['sum']) for row in _rollup('hour')}
+    assert hours == {f"{today} 00": (2, 20.0), f"{today} 01": (1, 10.0)}
+
+    days = {row['data_level']: (row['count'], row['sum']) for row in _rollup('day')}
+    assert days == {'interval': (3, 30.0), 'day': (1, 30.0)}
+
+
+def test_rollups_follow_deleted_rows(output_dir):
+    today = datetime.now().strftime('%Y-%m-%d')
+    rows = [
+        {'metric_title': 'Calls', 'category': 'Queue A', 'value': '30', 'data_datetime': today},
+        {'metric_title': 'Calls', 'category': 'Queue A', 'value': '10', 'data_datetime': f"{today} 01:00:00"},
+    ]
+    db.upsert_metrics('cuic', rows, replace_report=True, report_id='r1')
+    db.upsert_metrics('cuic', rows[1:], replace_report=True, report_id='r1')
+
+    assert [(row['data_level'], row['sum']) for row in _rollup('day')] == [('interval', 10.0)]
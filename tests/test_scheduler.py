@@ -0,0 +1,30 @@
+"""Daemon stop handling (``_StopFlag``)."""
+
+import signal
+import types
+
+import pytest
+
+import core
+from core.scheduler import _StopFlag
+
+
+def test_first_interrupt_only_requests_a_stop():
+    stop = _StopFlag()
+    stop._handle(signal.SIGINT, None)
+    assert stop.event.is_set()
+
+
+def test_second_interrupt_kills_the_workers_and_stops_now(monkeypatch):
+    killed = []
+    driver = types.SimpleNamespace(terminate_worker_processes=lambda: killed.append(True))
+    monkeypatch.setattr(core, 'driver', driver, raising=False)
+
+    stop = _StopFlag()
+    stop._handle(signal.SIGINT, None)
+    stop._handle(signal.SIGTERM, None)
+    assert not killed
+
+    with pytest.raises(KeyboardInterrupt):
+        stop._handle(signal.SIGINT, None)
+    assert killed == [True]
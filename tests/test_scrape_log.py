@@ -0,0 +1,97 @@
+"""scrape_log reads and the per-run event buffer (``_ScrapeLogBuffer``)."""
+
+import core.database as db
+
+
+def test_last_success_sees_a_buffered_event(output_dir):
+    db.start_scrape_log_buffer()
+    try:
+        db.log_scrape('cuic', 'Daily', 'success', row_count=5, duration_s=1.5,
+                      report_id='r1', definition_hash='h1')
+        assert db._scrape_log_buffer._events
+
+        last = db.last_successful_scrape('cuic', 'r1', 'h1')
+        assert last is not None and last[1] == 1.5
+        assert db.has_historical_data('cuic', 'r1', 'h1')
+        assert not db._scrape_log_buffer._events
+    finally:
+        db.stop_scrape_log_buffer()
+
+
+def _logged_rows() -> int:
+    with db.read_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM scrape_log").fetchone()[0]
+
+
+def _run_buffer(monkeypatch) -> db._ScrapeLogBuffer:
+    buffer = db._ScrapeLogBuffer()
+    buffer._hooks_installed = True      # no atexit/signal hooks from tests
+    buffer.start()
+    monkeypatch.setattr(db, '_scrape_log_buffer', buffer)
+    return buffer
+
+
+def test_buffer_flushes_when_full(output_dir, monkeypatch):
+    monkeypatch.setattr(db, '_SCRAPE_LOG_MAX_BUFFERED', 3)
+    buffer = _run_buffer(monkeypatch)
+
+    db.log_scrape('cuic', 'Daily', 'success')
+    db.log_scrape('cuic', 'Daily', 'success')
+    assert _logged_rows() == 0
+    db.log_scrape('cuic', 'Daily', 'success')
+    assert _logged_rows() == 3 and not buffer._events
+
+
+def test_buffer_flushes_at_exit(output_dir, monkeypatch):
+    buffer = _run_buffer(monkeypatch)
+    db.log_scrape('cuic', 'Daily', 'error', message='boom')
+    assert _logged_rows() == 0
+
+    buffer._flush_at_exit()
+    assert _logged_rows() == 1
+
+
+def test_buffer_flushes_before_reads(output_dir, monkeypatch):
+    _run_buffer(monkeypatch)
+    db.log_scrape('cuic', 'Daily', 'no_data', report_id='r1')
+
+    assert [row['status'] for row in db.get_scrape_log(source='cuic', report_id='r1')] == ['no_data']
+    db.log_scrape('cuic', 'Daily', 'success', report_id='r1')
+    assert [row['status'] for row in db.get_latest_scrape_status()] == ['success']
+
+
+def test_writes_through_outside_a_run(output_dir, monkeypatch):
+    buffer = _run_buffer(monkeypatch)
+    buffer.stop()
+
+    db.log_scrape('cuic', 'Daily', 'success')
+    assert _logged_rows() == 1
+
+
+def test_worker_writes_each_report_before_the_next(output_dir, monkeypatch):
+    import workers.cuic as cuic
+
+    _run_buffer(monkeypatch)
+    logged_before = []
+
+    def scrape_data(worker, label, report_config=None):
+        logged_before.append(_logged_rows())
+        if label == 'Broken':
+            raise RuntimeError('grid vanished')
+        return [{'metric_title': 'Calls', 'value': '1'}]
+
+    monkeypatch.setattr(cuic.auth, 'login', lambda worker: True)
+    monkeypatch.setattr(cuic.navigation, 'close_report_page', lambda worker: None)
+    monkeypatch.setattr(cuic.navigation, 'navigate_to_reports_root', lambda worker: None)
+    monkeypatch.setattr(cuic.navigation, 'get_reports_frame', lambda worker: object())
+    monkeypatch.setattr(cuic.navigation, 'open_report', lambda worker, frame, folder, name: True)
+    monkeypatch.setattr(cuic.wizard, 'run_filter_wizard', lambda worker, filters: True)
+    monkeypatch.setattr(cuic.scraper, 'scrape_data', scrape_data)
+
+    worker = cuic.Worker()
+    worker._screenshot_errors = False   # no page to capture; keeps logs/ out of the tree
+    worker.reports = [{'label': label, 'report_id': label.lower()} for label in ('Daily', 'Broken', 'Weekly')]
+    worker.scrape()
+
+    assert logged_before == [0, 1, 2]
+    assert _logged_rows() == 3
@@ -0,0 +1,100 @@
+"""Monthly shard layout (``core.shards``): writes into already-rotated months."""
+
+import io
+from datetime import datetime, timedelta
+
+import core.database as db
+import core.shards as shards
+
+OLD_DAY = (datetime.now() - timedelta(days=120)).strftime('%Y-%m-%d')
+NEW_DAY = datetime.now().strftime('%Y-%m-%d')
+
+
+def _row(day: str, hour: int, value) -> dict:
+    return {'metric_title': 'Calls', 'category': 'A', 'value': str(value), 'data_datetime': f"{day} {hour:02d}:00:00"}
+
+
+def _seed_and_rotate():
+    rows = [_row(day, hour, 10) for day in (OLD_DAY, NEW_DAY) for hour in range(3)]
+    db.upsert_metrics('cuic', rows, replace_report=True, report_id='r1')
+    assert shards.rotate_shards(hot_months=2) == 3
+    assert list(shards.list_shards()) == [OLD_DAY[:7]]
+
+
+def _facts(day: str) -> list:
+    with db.window_connection(day, day) as conn:
+        return conn.execute(
+            "SELECT data_datetime, value FROM kpi_snapshots WHERE data_date = ? ORDER BY data_datetime", (day,)
+        ).fetchall()
+
+
+def _day_rollup(day: str) -> tuple:
+    with db.read_connection() as conn:
+        return conn.execute(
+            "SELECT n, sum FROM kpi_rollup_day WHERE bucket = ? AND day_level = 0", (day,)
+        ).fetchone()
+
+
+def test_late_write_updates_the_shard_row(output_dir):
+    _seed_and_rotate()
+    result = db.upsert_metrics('cuic', [_row(OLD_DAY, 0, 99), _row(OLD_DAY, 5, 1)], report_id='r1')
+
+    assert (result.inserted, result.updated) == (1, 1)
+    assert [value for _, value in _facts(OLD_DAY)] == ['99', '10', '10', '1']
+    assert _day_rollup(OLD_DAY) == (4, 120.0)
+    with db.read_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM kpi_facts WHERE data_date = ?", (OLD_DAY,)).fetchone()[0] == 0
+
+
+def test_replace_deletes_rows_missing_from_the_batch_in_shards(output_dir):
+    _seed_and_rotate()
+    result = db.upsert_metrics(
+        'cuic', [_row(OLD_DAY, 0, 10)] + [_row(NEW_DAY, hour, 10) for hour in range(3)],
+        replace_report=True, report_id='r1',
+    )
+
+    assert (result.inserted, result.updated, result.deleted) == (0, 0, 2)
+    assert _facts(OLD_DAY) == [(f"{OLD_DAY} 00:00:00", '10')]
+    assert _day_rollup(OLD_DAY) == (1, 10.0)
+
+
+def test_rotation_merges_duplicates_and_touches_the_day(output_dir):
+    _seed_and_rotate()
+    # A copy of a rotated key left in main (written before writes were shard-aware).
+    with db.transaction() as conn:
+        conn.execute(
+            "INSERT INTO kpi_facts (report_key, version_key, metric_key, category_key, data_datetime, data_date, "
+            "scrape_timestamp, value, value_num, value_kind) "
+            "SELECT report_key, version_key, metric_key, category_key, ?, ?, scrape_timestamp, '20', 20, 1 "
+            "FROM kpi_facts WHERE data_date = ? LIMIT 1",
+            (f"{OLD_DAY} 00:00:00", OLD_DAY, NEW_DAY),
+        )
+    assert len(_facts(OLD_DAY)) == 4
+    version = db._day_versions(OLD_DAY, OLD_DAY)[OLD_DAY]
+
+    shards.rotate_shards(hot_months=2)
+
+    assert [value for _, value in _facts(OLD_DAY)] == ['20', '10', '10']
+    assert db._day_versions(OLD_DAY, OLD_DAY)[OLD_DAY] > version
+    assert _day_rollup(OLD_DAY) == (3, 40.0)
+
+
+def _month_start(months_ago: int) -> str:
+    now = datetime.now()
+    index = now.year * 12 + now.month - 1 - months_ago
+    return f"{index // 12:04d}-{index % 12 + 1:02d}-01"
+
+
+def test_reads_span_more_shards_than_sqlite_attaches(output_dir):
+    days = [_month_start(ago) for ago in range(shards.MAX_ATTACHED + 4, 1, -1)] + [NEW_DAY]
+    db.upsert_metrics('cuic', [_row(day, 9, 1) for day in days], replace_report=True, report_id='r1')
+    shards.rotate_shards(hot_months=2)
+    assert len(shards.list_shards()) == shards.MAX_ATTACHED + 3
+
+    assert db.row_count() == len(days)
+    assert [str(d)[:10] for d in db.query_all()['data_datetime']] == days
+    assert db.query_by_date(days[0], NEW_DAY)['data_datetime'].str[:10].tolist() == days
+
+    out = io.StringIO()
+    assert db._write_rows_csv(out, days[0], NEW_DAY) == len(days)
+    assert [line.split(',')[1][:10] for line in out.getvalue().splitlines()] == days
@@ -0,0 +1,65 @@
+"""Change-only value history (``value_history``) and ``query_value_at``."""
+
+from datetime import datetime
+
+import pytest
+
+import core.config as config
+import core.database as db
+
+pytest.importorskip('pandas')
+
+DAY = '2026-10-01'
+KEY_TIME = f"{DAY} 09:00:00"
+
+
+class _Clock(datetime):
+    at = datetime(2026, 10, 1, 10, 0, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.at
+
+
+@pytest.fixture
+def history(output_dir, monkeypatch):
+    monkeypatch.setitem(config._settings_cache['global'], 'value_history', True)
+    monkeypatch.setattr(db, 'datetime', _Clock)
+
+
+def _write_at(when: str, value=None):
+    _Clock.at = datetime.strptime(when, '%Y-%m-%d %H:%M:%S')
+    rows = [] if value is None else [
+        {'metric_title': 'Calls', 'category': 'A', 'value': str(value), 'data_datetime': KEY_TIME}
+    ]
+    db.upsert_metrics('cuic', rows, replace_report=True, report_id='r1')
+
+
+def _value_at(when: str) -> list:
+    return db.query_value_at(when, DAY)['value'].tolist()
+
+
+def test_value_at_interval_boundaries(history):
+    _write_at('2026-10-01 10:00:00', 10)
+    _write_at('2026-10-01 11:00:00', 10)   # unchanged: no new interval
+    _write_at('2026-10-01 12:00:00', 12)
+    _write_at('2026-10-01 13:00:00')       # removed from the report
+
+    intervals = db.query_value_history(DAY)[['value', 'valid_from', 'valid_to']].values.tolist()
+    assert intervals == [
+        ['10', '2026-10-01 10:00:00', '2026-10-01 12:00:00'],
+        ['12', '2026-10-01 12:00:00', '2026-10-01 13:00:00'],
+    ]
+
+    assert _value_at('2026-10-01 09:59:59') == []
+    assert _value_at('2026-10-01 10:00:00') == ['10']          # valid_from is inclusive
+    assert _value_at('2026-10-01 11:59:59') == ['10']
+    assert _value_at('2026-10-01 12:00:00') == ['12']          # valid_to is exclusive
+    assert _value_at('2026-10-01 13:00:00') == []
+
+
+def test_current_value_is_open_ended(history):
+    _write_at('2026-10-01 10:00:00', 10)
+
+    assert _value_at('2099-01-01 00:00:00') == ['10']
+    assert db.query_value_history(DAY)['valid_to'].isna().all()
@@ -307,6 +307,8 @@ function renderCuicReports() {
           <option value="historical" ${r.data_type==='historical'?'selected':''}>📦 Historical (scrape once)</option>
         </select>
       </div>
+      ${r.data_type === 'historical' ? '' : `<div class="inline-row"><label>Refresh Every</label><input data-report-field="refresh_interval" value="${attr(String(r.refresh_interval || ''))}" onchange="cuicReports[${i}].refresh_interval=this.value.trim();markDirty()" placeholder="Every run — or minutes / 15m / 2h / 1d"></div>`}
+      <div class="inline-row"><label>Time Budget</label><input data-report-field="time_budget" value="${attr(String(r.time_budget || ''))}" onchange="cuicReports[${i}].time_budget=this.value.trim();markDirty()" placeholder="Global default — or minutes / 90s / 5m"></div>
       <div class="inline-row"><label>Row Mode</label>
         <div class="row-mode-seg">
           <button type="button" class="${(r.row_mode||'consolidated_only')==='consolidated_only'?'active':''}" onclick="cuicReports[${i}].row_mode='consolidated_only';renderCuicReports();markDirty()">📊 Consolidated only</button>
@@ -2,6 +2,10 @@
 //  settings-io.js — Build, populate, save, export, import
 // ══════════════════════════════════════════════════════════════════════════
 
+// Global keys without a form control (e.g. "sqlite" tuning) are carried over
+// from the last loaded settings so auto-save never strips them.
+let loadedGlobalSettings = {};
+
 // ── syncReportInputs: flush DOM values into state arrays ─────────────────
 function syncReportInputs() {
   document.querySelectorAll('#cuic-reports-list .report-card').forEach((card, i) => {
@@ -34,6 +38,7 @@ function buildSettings() {
   const cloneJson = value => JSON.parse(JSON.stringify(value === undefined ? null : value));
   return {
     global: {
+      ...cloneJson(loadedGlobalSettings),
       headless:             document.getElementById('g-headless').checked,
       use_system_chrome:    document.getElementById('g-system-chrome').checked,
       screenshot_steps:     document.getElementById('g-screenshot-steps').checked,
@@ -55,6 +60,8 @@ function buildSettings() {
             report_id: r.report_id || '',
             label: r.label, folder: r.folder, name: r.name,
             enabled: r.enabled !== false, data_type: r.data_type || 'ongoing',
+            refresh_interval: r.refresh_interval || 0,
+            ...(r.time_budget ? { time_budget: r.time_budget } : {}),
             row_mode: r.row_mode || 'consolidated_only',
             columns: r.columns !== undefined ? r.columns : null,
             ...(r._columns_meta ? { _columns_meta: cloneJson(r._columns_meta) } : {}),
@@ -73,6 +80,8 @@ function buildSettings() {
           report_id: r.report_id || '',
           label: r.label, url: r.url, enabled: r.enabled !== false,
           data_type: r.data_type || 'ongoing',
+          refresh_interval: r.refresh_interval || 0,
+          ...(r.time_budget ? { time_budget: r.time_budget } : {}),
           properties: r.properties || {}
         })),
         page_load_timeout_ms:    parseInt(document.getElementById('smax-t-load').value)    || 120000,
@@ -95,6 +104,7 @@ function buildCredentials() {
 // ── populateSettings ─────────────────────────────────────────────────────
 function populateSettings(s) {
   const g = s.global || {};
+  loadedGlobalSettings = JSON.parse(JSON.stringify(g));
   setBool('g-headless',         g.headless,            true);
   setBool('g-system-chrome',    g.use_system_chrome,   true);
   setBool('g-screenshot-steps', g.screenshot_steps,    false);
@@ -113,6 +123,8 @@ function populateSettings(s) {
       report_id: r.report_id || '',
       label: r.label||'', folder: r.folder||'', name: r.name||'',
       enabled: r.enabled !== false, data_type: r.data_type || 'ongoing',
+      refresh_interval: r.refresh_interval || 0,
+      time_budget: r.time_budget || '',
       row_mode: r.row_mode || 'consolidated_only',
       columns: r.columns !== undefined ? r.columns : null,
       filters: r.filters || {}
@@ -133,7 +145,9 @@ function populateSettings(s) {
   smaxReports = (smax.reports || []).map(r => ({
     report_id: r.report_id || '',
     label: r.label||'', url: r.url||'', enabled: r.enabled !== false,
-    data_type: r.data_type || 'ongoing', properties: r.properties || {}
+    data_type: r.data_type || 'ongoing', refresh_interval: r.refresh_interval || 0,
+    time_budget: r.time_budget || '',
+    properties: r.properties || {}
   }));
   renderSmaxReports();
   setVal('smax-t-load',    smax.page_load_timeout_ms    || 120000);
@@ -105,6 +105,8 @@ function renderSmaxReports() {
           <option value="historical" ${r.data_type==='historical'?'selected':''}>📦 Historical (scrape once)</option>
         </select>
       </div>
+      ${r.data_type === 'historical' ? '' : `<div class="inline-row"><label>Refresh Every</label><input data-report-field="refresh_interval" value="${attr(String(r.refresh_interval || ''))}" onchange="smaxReports[${i}].refresh_interval=this.value.trim();markDirty()" placeholder="Every run — or minutes / 15m / 2h / 1d"></div>`}
+      <div class="inline-row"><label>Time Budget</label><input data-report-field="time_budget" value="${attr(String(r.time_budget || ''))}" onchange="smaxReports[${i}].time_budget=this.value.trim();markDirty()" placeholder="Global default — or minutes / 90s / 5m"></div>
       <div style="margin-top:10px;display:flex;align-items:center;gap:8px;">
         <button class="btn-discover" id="smax-discover-btn-${i}" onclick="discoverSmaxProperties(${i})">
           \u25B6 Re-validate Link
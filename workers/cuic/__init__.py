@@ -23,9 +23,9 @@ from typing import Dict, Any, List
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.base_worker import BaseWorker
+from core.base_worker import BaseWorker, ReportTimeout
 from core.config import get_worker_settings, get_worker_credentials, get_report_definition_hash
-from core.database import log_scrape, has_historical_data
+from core.database import log_scrape, flush_scrape_log, has_historical_data
 
 # Import our sub-modules
 from . import auth, navigation, wizard, scraper
@@ -101,6 +101,10 @@ class Worker(BaseWorker):
             self.logger.info("No enabled CUIC reports configured")
             return {'report_batches': [], 'worker_success': True}
 
+        fresh = self.fresh_run_result(enabled)
+        if fresh is not None:
+            return fresh
+
         self.logger.info(f"Starting CUIC scraper -> {self.url} ({len(enabled)} report(s))")
         try:
             self.setup_browser(ignore_https_errors=True, use_system_chrome=self.use_system_chrome)
@@ -112,6 +116,7 @@ class Worker(BaseWorker):
             self.screenshot("error", is_step=False)
             return {'report_batches': [], 'worker_success': False}
         finally:
+            self.clear_report_budget()
             logout_ok = auth.logout(self)
             
             if logout_ok:
@@ -119,17 +124,19 @@ class Worker(BaseWorker):
                 if self.page and not self.page.is_closed():
                     self.page.wait_for_timeout(1500)
             else:
-                # Logout failed — keep browser open for manual intervention
+                # Logout failed — keep browser open for manual intervention,
+                # but never past the run deadline.
+                keep_open_ms = self.budget_timeout(60000)
                 self.logger.error("")
                 self.logger.error("="*60)
-                self.logger.error("!!! KEEPING BROWSER OPEN FOR 60 SECONDS !!!")
+                self.logger.error(f"!!! KEEPING BROWSER OPEN FOR {keep_open_ms // 1000} SECONDS !!!")
                 self.logger.error("Please manually logout:")
                 self.logger.error("1. Click the user menu (top right)")
                 self.logger.error("2. Click 'Sign Out'")
                 self.logger.error("Or visit: https://148.151.32.77:8444/cuicui/Logout.jsp")
                 self.logger.error("="*60)
                 if self.page and not self.page.is_closed():
-                    self.page.wait_for_timeout(60000)  # 60 seconds
+                    self.page.wait_for_timeout(keep_open_ms)
             
             self.teardown_browser()
 
@@ -165,6 +172,7 @@ class Worker(BaseWorker):
                         'cuic', label, 'skipped', 0, 0, 'Historical data already exists',
                         report_id=report_id, definition_hash=definition_hash,
                     )
+                    flush_scrape_log()
                     report_batches.append({
                         'report_id': report_id,
                         'definition_hash': definition_hash,
@@ -174,6 +182,40 @@ class Worker(BaseWorker):
                     })
                     continue
 
+            fresh_reason = self.fresh_skip_reason(report, report_id, definition_hash)
+            if fresh_reason:
+                self.logger.info(f"Report '{label}': {fresh_reason} - skipping")
+                log_scrape(
+                    'cuic', label, 'skipped', 0, 0, fresh_reason,
+                    report_id=report_id, definition_hash=definition_hash,
+                )
+                flush_scrape_log()
+                report_batches.append({
+                    'report_id': report_id,
+                    'definition_hash': definition_hash,
+                    'report_name': label,
+                    'status': 'skipped',
+                    'rows': [],
+                })
+                continue
+
+            if self.run_deadline_passed():
+                self.logger.warning(f"Report '{label}': run deadline reached - not started")
+                log_scrape(
+                    'cuic', label, 'timeout', 0, 0, 'Run deadline reached',
+                    report_id=report_id, definition_hash=definition_hash,
+                )
+                flush_scrape_log()
+                report_batches.append({
+                    'report_id': report_id,
+                    'definition_hash': definition_hash,
+                    'report_name': label,
+                    'status': 'timeout',
+                    'rows': [],
+                })
+                continue
+
+            self.start_report_budget(report)
             try:
                 if i > 0:
                     self.logger.info("Closing previous report and navigating back...")
@@ -183,12 +225,14 @@ class Worker(BaseWorker):
                 self.logger.info("Getting reports iframe...")
                 frame = navigation.get_reports_frame(self)
                 if not frame:
+                    self.check_budget('reports iframe')
                     self.logger.error(f"Reports iframe not found for '{label}'")
                     self.screenshot(f"r{i+1}_no_iframe", is_step=False)
                     log_scrape(
                         'cuic', label, 'error', 0, time.time() - t0,
                         'Reports iframe not found', report_id=report_id, definition_hash=definition_hash,
                     )
+                    flush_scrape_log()
                     report_batches.append({
                         'report_id': report_id,
                         'definition_hash': definition_hash,
@@ -200,12 +244,14 @@ class Worker(BaseWorker):
 
                 self.logger.info(f"Opening report '{name}' in folder '{folder}'...")
                 if not navigation.open_report(self, frame, folder, name):
+                    self.check_budget('open report')
                     self.logger.error(f"Could not open {folder}/{name}")
                     self.screenshot(f"r{i+1}_open_failed", is_step=False)
                     log_scrape(
                         'cuic', label, 'error', 0, time.time() - t0,
                         f'Could not open {folder}/{name}', report_id=report_id, definition_hash=definition_hash,
                     )
+                    flush_scrape_log()
                     report_batches.append({
                         'report_id': report_id,
                         'definition_hash': definition_hash,
@@ -218,11 +264,13 @@ class Worker(BaseWorker):
                 self.logger.info("Running filter wizard...")
                 filters = report.get('filters', {})
                 if not wizard.run_filter_wizard(self, filters):
+                    self.check_budget('filter wizard')
                     self.logger.error(f"Filter wizard failed for '{label}'")
                     log_scrape(
                         'cuic', label, 'error', 0, time.time() - t0,
                         'Filter wizard failed', report_id=report_id, definition_hash=definition_hash,
                     )
+                    flush_scrape_log()
                     report_batches.append({
                         'report_id': report_id,
                         'definition_hash': definition_hash,
@@ -242,6 +290,7 @@ class Worker(BaseWorker):
                         'cuic', label, 'success', len(data), elapsed, '',
                         report_id=report_id, definition_hash=definition_hash,
                     )
+                    flush_scrape_log()
                     report_batches.append({
                         'report_id': report_id,
                         'definition_hash': definition_hash,
@@ -252,12 +301,14 @@ class Worker(BaseWorker):
                     self.logger.info(
                         f"[OK] Report '{label}': {len(data)} records in {elapsed:.1f}s")
                 else:
+                    self.check_budget('scrape')
                     self.logger.warning(f"Report '{label}': no data returned after {elapsed:.1f}s")
                     self.screenshot(f"r{i+1}_no_data", is_step=False)
                     log_scrape(
                         'cuic', label, 'no_data', 0, elapsed, 'No data found',
                         report_id=report_id, definition_hash=definition_hash,
                     )
+                    flush_scrape_log()
                     report_batches.append({
                         'report_id': report_id,
                         'definition_hash': definition_hash,
@@ -266,12 +317,30 @@ class Worker(BaseWorker):
                         'rows': [],
                     })
 
+            except ReportTimeout as e:
+                elapsed = time.time() - t0
+                self.logger.warning(f"Report '{label}': {e} after {elapsed:.1f}s - moving on")
+                self.screenshot(f"r{i+1}_timeout", is_step=False)
+                log_scrape(
+                    'cuic', label, 'timeout', 0, elapsed, str(e),
+                    report_id=report_id, definition_hash=definition_hash,
+                )
+                flush_scrape_log()
+                report_batches.append({
+                    'report_id': report_id,
+                    'definition_hash': definition_hash,
+                    'report_name': label,
+                    'status': 'timeout',
+                    'rows': [],
+                })
+
             except Exception as e:
                 elapsed = time.time() - t0
                 log_scrape(
                     'cuic', label, 'error', 0, elapsed, str(e),
                     report_id=report_id, definition_hash=definition_hash,
                 )
+                flush_scrape_log()
                 report_batches.append({
                     'report_id': report_id,
                     'definition_hash': definition_hash,
@@ -283,6 +352,7 @@ class Worker(BaseWorker):
                 self.logger.error(f"  {traceback.format_exc()}")
                 self.screenshot(f"r{i+1}_exception", is_step=False)
 
+        self.clear_report_budget()
         navigation.close_report_page(self)
         total_rows = sum(len(batch.get('rows', [])) for batch in report_batches)
         self.logger.info(f"Scrape complete: {total_rows} total records from {len(enabled)} report(s)")
@@ -5,10 +5,15 @@ Navigation helpers for CUIC reports, including:
 - Frame access 
 - Folder navigation
 - Report selection in ng-grid
+
+Waits and Playwright timeouts here go through the worker's time budget
+(``budget_wait`` / ``budget_timeout``); ``ReportTimeout`` is re-raised past
+the broad ``except Exception`` handlers so the worker can mark the report.
 """
 
 import re
 import time
+from core.base_worker import ReportTimeout
 from . import selectors
 
 
@@ -44,7 +49,7 @@ def _wait_for_reports_grid(worker, timeout_ms: int):
                     return frame
             except Exception:
                 pass
-        worker.page.wait_for_timeout(500)
+        worker.budget_wait(500, 'reports grid')
 
     return None
 
@@ -76,7 +81,7 @@ def navigate_to_reports_root(worker):
 
         # Attempt 2: navigate directly to the reports route when the pane mounts blank.
         worker.logger.info("Reports grid not ready after tab click - navigating directly to #/reports")
-        worker.page.goto(_reports_url(worker), wait_until='domcontentloaded', timeout=worker.timeout_nav)
+        worker.page.goto(_reports_url(worker), wait_until='domcontentloaded', timeout=worker.budget_timeout(worker.timeout_nav))
         frame = _wait_for_reports_grid(worker, worker.timeout_nav)
         if frame:
             worker.logger.info("Reports grid visible after direct #/reports navigation")
@@ -86,9 +91,9 @@ def navigate_to_reports_root(worker):
         # (session cookie persists — no re-login needed)
         worker.logger.info("Reports grid still unavailable - reloading #/reports")
         worker.page.goto(_reports_url(worker), wait_until='domcontentloaded',
-                         timeout=worker.timeout_nav)
+                         timeout=worker.budget_timeout(worker.timeout_nav))
         worker.page.wait_for_selector(selectors.REPORTS_TAB_CSS,
-                                      timeout=worker.timeout_nav)
+                                      timeout=worker.budget_timeout(worker.timeout_nav))
 
         frame = _wait_for_reports_grid(worker, worker.timeout_nav)
         if frame:
@@ -96,13 +101,15 @@ def navigate_to_reports_root(worker):
             return
 
         worker.logger.info("Reports grid still blank - reloading Main.jsp and reopening Reports")
-        worker.page.goto(worker.url, wait_until='domcontentloaded', timeout=worker.timeout_nav)
-        worker.page.wait_for_selector(selectors.REPORTS_TAB_CSS, timeout=worker.timeout_nav)
+        worker.page.goto(worker.url, wait_until='domcontentloaded', timeout=worker.budget_timeout(worker.timeout_nav))
+        worker.page.wait_for_selector(selectors.REPORTS_TAB_CSS, timeout=worker.budget_timeout(worker.timeout_nav))
         worker.page.click(selectors.REPORTS_TAB_CSS)
         frame = _wait_for_reports_grid(worker, worker.timeout_nav)
         if frame:
             worker.logger.info("Reports grid visible after Main.jsp reload")
             return
+    except ReportTimeout:
+        raise
     except Exception as e:
         worker.logger.warning(f"Navigate to reports root: {e}")
 
@@ -117,7 +124,7 @@ def get_reports_frame(worker):
         try:
             worker.page.wait_for_selector(
                 f'iframe[name="{selectors.REPORTS_IFRAME_NAME}"]',
-                timeout=worker.timeout_nav,
+                timeout=worker.budget_timeout(worker.timeout_nav),
             )
         except Exception:
             pass  # may already be present; proceed to content checks
@@ -128,12 +135,12 @@ def get_reports_frame(worker):
             return frame
 
         worker.logger.warning("Reports grid not visible after tab click - navigating directly to #/reports")
-        worker.page.goto(_reports_url(worker), wait_until='domcontentloaded', timeout=worker.timeout_nav)
+        worker.page.goto(_reports_url(worker), wait_until='domcontentloaded', timeout=worker.budget_timeout(worker.timeout_nav))
 
         try:
             worker.page.wait_for_selector(
                 f'iframe[name="{selectors.REPORTS_IFRAME_NAME}"]',
-                timeout=worker.timeout_nav,
+                timeout=worker.budget_timeout(worker.timeout_nav),
             )
         except Exception:
             pass
@@ -144,15 +151,15 @@ def get_reports_frame(worker):
             return frame
 
         worker.logger.warning("Reports grid still unavailable - reloading #/reports once")
-        worker.page.goto(_reports_url(worker), wait_until='domcontentloaded', timeout=worker.timeout_nav)
+        worker.page.goto(_reports_url(worker), wait_until='domcontentloaded', timeout=worker.budget_timeout(worker.timeout_nav))
         frame = _wait_for_reports_grid(worker, worker.timeout_nav)
         if frame:
             worker.logger.info("Reports iframe ready after #/reports reload")
             return frame
 
         worker.logger.warning("Reports grid still blank - reloading Main.jsp before one final retry")
-        worker.page.goto(worker.url, wait_until='domcontentloaded', timeout=worker.timeout_nav)
-        worker.page.wait_for_selector(selectors.REPORTS_TAB_CSS, timeout=worker.timeout_nav)
+        worker.page.goto(worker.url, wait_until='domcontentloaded', timeout=worker.budget_timeout(worker.timeout_nav))
+        worker.page.wait_for_selector(selectors.REPORTS_TAB_CSS, timeout=worker.budget_timeout(worker.timeout_nav))
         worker.page.click(selectors.REPORTS_TAB_CSS)
         frame = _wait_for_reports_grid(worker, worker.timeout_nav)
         if frame:
@@ -162,6 +169,8 @@ def get_reports_frame(worker):
         worker.logger.error("Reports iframe not found or grid never became visible")
         worker.screenshot("iframe_missing", is_step=False)
         return None
+    except ReportTimeout:
+        raise
     except Exception as e:
         worker.logger.error(f"Reports iframe error: {e}")
         worker.screenshot("iframe_error", is_step=False)
@@ -194,9 +203,9 @@ def open_report(worker, frame, folder_path: str, report_name: str) -> bool:
             try:
                 frame_check = _reacquire_frame(worker, frame)
                 if frame_check:
-                    frame_check.wait_for_selector(selectors.GRID_CONTAINER, timeout=worker.timeout_nav)
+                    frame_check.wait_for_selector(selectors.GRID_CONTAINER, timeout=worker.budget_timeout(worker.timeout_nav))
             except Exception:
-                worker.page.wait_for_timeout(worker.timeout_short)
+                worker.budget_wait(worker.timeout_short, 'open folder')
 
             # Re-acquire frame if it detached
             frame = _reacquire_frame(worker, frame)
@@ -205,9 +214,9 @@ def open_report(worker, frame, folder_path: str, report_name: str) -> bool:
 
             # Wait for grid to refresh with new folder contents
             try:
-                frame.wait_for_selector(selectors.GRID_CONTAINER, timeout=worker.timeout_nav)
+                frame.wait_for_selector(selectors.GRID_CONTAINER, timeout=worker.budget_timeout(worker.timeout_nav))
             except Exception:
-                worker.page.wait_for_timeout(worker.timeout_short)
+                worker.budget_wait(worker.timeout_short, 'open folder')
 
         # Click the report itself
         if not _click_grid_item(worker, frame, report_name, is_folder=False):
@@ -218,9 +227,11 @@ def open_report(worker, frame, folder_path: str, report_name: str) -> bool:
                 return False
         worker.logger.info(f"Clicked report '{report_name}'")
         # Wait for the report to open (new tab/content load)
-        worker.page.wait_for_timeout(worker.timeout_medium)  # Report opens in popup; no element to wait for
+        worker.budget_wait(worker.timeout_medium, 'open report')  # Report opens in popup; no element to wait for
         worker.screenshot("02_report_clicked")
         return True
+    except ReportTimeout:
+        raise
     except Exception as e:
         worker.logger.error(f"Open report failed: {e}")
         worker.screenshot("open_report_error", is_step=False)
@@ -250,10 +261,12 @@ def _scroll_and_click_folder(worker, frame, name: str, max_scrolls: int = 20) ->
                 const vp = document.querySelector(s);
                 if (vp) vp.scrollTop += vp.clientHeight;
             }''', selectors.GRID_VIEWPORT)
-            worker.page.wait_for_timeout(400)  # ng-grid virtual scroll render buffer
+            worker.budget_wait(400, 'grid scroll')  # ng-grid virtual scroll render buffer
             if _click_grid_item(worker, frame, name, is_folder=True):
                 return True
         return False
+    except ReportTimeout:
+        raise
     except Exception:
         return False
 
@@ -333,10 +346,12 @@ def _scroll_and_click(worker, frame, name: str, max_scrolls: int = 20) -> bool:
                 const vp = document.querySelector(s);
                 if (vp) vp.scrollTop += vp.clientHeight;
             }''', selectors.GRID_VIEWPORT)
-            worker.page.wait_for_timeout(400)  # ng-grid virtual scroll render buffer
+            worker.budget_wait(400, 'grid scroll')  # ng-grid virtual scroll render buffer
             if _click_grid_item(worker, frame, name, is_folder=False):
                 return True
         return False
+    except ReportTimeout:
+        raise
     except Exception:
         return False
 
@@ -8,14 +8,12 @@ Supports multiple fallback strategies:
 3. Plain HTML tables (last resort)
 """
 
-import re
 from typing import Dict, Any, List
 from datetime import datetime
+from core.value_kinds import classify_value_kind
 from . import javascript
 
 
-_DURATION_RE = re.compile(r'^-?\d{1,3}:\d{2}:\d{2}$')
-_NUMERIC_RE = re.compile(r'^-?\d+(?:\.\d+)?$')
 _DIMENSION_HEADERS = frozenset({
     'agent', 'full name', 'agent skill target id', 'skill group id',
     'skill group name', 'media', 'media id', 'interval', 'date',
@@ -106,14 +104,7 @@ def _classify_value_kind(value: Any) -> str:
         return 'empty'
     if _parse_dt(text):
         return 'datetime'
-    if text.endswith('%') and _NUMERIC_RE.match(text[:-1].strip()):
-        return 'percent'
-    if _DURATION_RE.match(text):
-        return 'duration'
-    normalized = text.replace(',', '')
-    if _NUMERIC_RE.match(normalized):
-        return 'numeric'
-    return 'text'
+    return classify_value_kind(text)
 
 
 def _detect_datetime_field(fields: List[str], hdrs: List[str], report_config: dict, cols_meta: dict) -> str:
@@ -365,7 +356,7 @@ def scrape_data(worker, report_label: str = '', report_config: dict = None) -> L
         try:
             target.wait_for_selector(
                 '.ag-root, .ag-body-viewport, [class*="ag-theme"], table',
-                timeout=worker.timeout_long)
+                timeout=worker.budget_timeout(worker.timeout_long))
         except Exception:
             worker.logger.info(f"  No grid/table detected within {worker.timeout_long}ms, continuing anyway")
         worker.logger.info(f"  Scraper: {len(all_pages)} page(s), "
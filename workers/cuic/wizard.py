@@ -8,6 +8,7 @@ Supports both CUIC-specific (SPAB, multi-step) and generic HTML wizards.
 from copy import deepcopy
 import re
 from typing import Dict, Any, List
+from core.base_worker import ReportTimeout
 from . import javascript
 import time
 
@@ -884,7 +885,7 @@ def _click_run_with_retries(worker, attempts: int = 3, wait_ms: int | None = Non
             return True
         if attempt != attempts:
             worker.logger.info(f"  Wizard: Run not ready yet (attempt {attempt}/{attempts})")
-            worker.page.wait_for_timeout(delay)
+            worker.budget_wait(delay, 'wizard Run')
     return False
 
 
@@ -898,7 +899,7 @@ def run_filter_wizard(worker, filters: dict = None, require_run: bool = False, *
       Flat generic:          {"field_id": val}  (applied to every step)
     """
     try:
-        worker.page.wait_for_timeout(worker.timeout_medium)  # Wizard initialization settle time
+        worker.budget_wait(worker.timeout_medium, 'wizard init')  # Wizard initialization settle time
         filters = filters or {}
 
         # Separate metadata from actual filter values
@@ -918,6 +919,7 @@ def run_filter_wizard(worker, filters: dict = None, require_run: bool = False, *
 
         while step < max_steps:
             step += 1
+            worker.check_budget(f'wizard step {step}')
 
             # Read current step's field structure
             step_info = read_wizard_step_fields(worker)
@@ -964,7 +966,7 @@ def run_filter_wizard(worker, filters: dict = None, require_run: bool = False, *
                     if clean:
                         apply_filters_to_step(worker, step_info, clean, discovery_mode=discovery_mode)
 
-                worker.page.wait_for_timeout(worker.timeout_short if prefer_run else 800)
+                worker.budget_wait(worker.timeout_short if prefer_run else 800, f'wizard step {step}')
 
             if discovery_mode and prefer_run:
                 if _click_run_with_retries(worker, attempts=3, wait_ms=worker.timeout_short):
@@ -978,7 +980,7 @@ def run_filter_wizard(worker, filters: dict = None, require_run: bool = False, *
             # Try Next first (middle steps), then Run (last step)
             if click_wizard_button(worker, 'Next'):
                 worker.logger.info(f"  Wizard: clicked Next at step {step}")
-                worker.page.wait_for_timeout(worker.timeout_short)
+                worker.budget_wait(worker.timeout_short, f'wizard step {step}')
             elif click_wizard_button(worker, 'Run'):
                 worker.logger.info(f"  Wizard: clicked Run at step {step}")
                 run_clicked = True
@@ -991,10 +993,12 @@ def run_filter_wizard(worker, filters: dict = None, require_run: bool = False, *
             worker.logger.error('Filter wizard did not reach the Run button')
             return False
 
-        worker.page.wait_for_timeout(worker.timeout_long)  # Report generation wait after wizard completes
+        worker.budget_wait(worker.timeout_long, 'report generation')  # Report generation wait after wizard completes
         worker.logger.info("Filter wizard done")
         worker.screenshot("03_report_running")
         return True
+    except ReportTimeout:
+        raise
     except Exception as e:
         worker.logger.error(f"Filter wizard failed: {e}")
         worker.screenshot("filter_error", is_step=False)
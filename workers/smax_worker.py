@@ -38,10 +38,9 @@ import time
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from playwright.sync_api import sync_playwright
-from core.base_worker import BaseWorker
+from core.base_worker import BaseWorker, ReportTimeout
 from core.config import get_worker_settings, get_worker_credentials, get_global_settings, get_report_definition_hash
-from core.database import has_historical_data, log_scrape
+from core.database import has_historical_data, log_scrape, flush_scrape_log
 from typing import Dict, Any, List, Tuple
 
 
@@ -403,6 +402,10 @@ class Worker(BaseWorker):
             log_scrape('smax', '_worker', 'no_data', 0, 0, 'No enabled reports configured')
             return {'report_batches': [], 'worker_success': True}
 
+        fresh = self.fresh_run_result(enabled)
+        if fresh is not None:
+            return fresh
+
         result = {'report_batches': [], 'worker_success': False}
         try:
             # ── Step 1: Start browser with persistent profile ──────────
@@ -449,6 +452,8 @@ class Worker(BaseWorker):
         """
         report_batches = []
         tabs = []  # List of (page, report_cfg, label, report_id, definition_hash) tuples
+        opened_at = []  # time.time() each tab's report budget started, parallel to tabs
+        timed_out = {}  # tab index -> ReportTimeout message (budget spent in phase 1-2)
 
         enabled = [r for r in self.reports if r.get('enabled', True)]
         start_time = time.time()
@@ -467,6 +472,7 @@ class Worker(BaseWorker):
                     'smax', label, 'error', 0, 0, 'No report URL configured',
                     report_id=report_id, definition_hash=definition_hash,
                 )
+                flush_scrape_log()
                 report_batches.append({
                     'report_id': report_id,
                     'definition_hash': definition_hash,
@@ -484,6 +490,7 @@ class Worker(BaseWorker):
                         'smax', label, 'skipped', 0, 0, 'Historical data already exists',
                         report_id=report_id, definition_hash=definition_hash,
                     )
+                    flush_scrape_log()
                     report_batches.append({
                         'report_id': report_id,
                         'definition_hash': definition_hash,
@@ -493,25 +500,82 @@ class Worker(BaseWorker):
                     })
                     continue
 
+            fresh_reason = self.fresh_skip_reason(report, report_id, definition_hash)
+            if fresh_reason:
+                self.logger.info(f"  Report {i+1} '{label}': {fresh_reason} - skipping")
+                log_scrape(
+                    'smax', label, 'skipped', 0, 0, fresh_reason,
+                    report_id=report_id, definition_hash=definition_hash,
+                )
+                flush_scrape_log()
+                report_batches.append({
+                    'report_id': report_id,
+                    'definition_hash': definition_hash,
+                    'report_name': label,
+                    'status': 'skipped',
+                    'rows': [],
+                })
+                continue
+
+            if self.run_deadline_passed():
+                self.logger.warning(f"  Report {i+1} '{label}': run deadline reached - not opened")
+                log_scrape(
+                    'smax', label, 'timeout', 0, 0, 'Run deadline reached',
+                    report_id=report_id, definition_hash=definition_hash,
+                )
+                flush_scrape_log()
+                report_batches.append({
+                    'report_id': report_id,
+                    'definition_hash': definition_hash,
+                    'report_name': label,
+                    'status': 'timeout',
+                    'rows': [],
+                })
+                continue
+
+            # The report's budget covers opening its tab, the table view
+            # switch and the scrape; later phases resume it from here.
+            started = time.time()
+            self.start_report_budget(report, started)
             try:
                 if i == 0:
                     tab = self.page
                 else:
                     # Wait BEFORE creating the new page so the blank tab is
                     # never visible for the full stagger delay.
-                    self.page.wait_for_timeout(self.TAB_STAGGER_DELAY)
+                    self.budget_wait(self.TAB_STAGGER_DELAY, 'tab stagger')
                     tab = self.context.new_page()
 
-                tab.goto(url, wait_until='commit', timeout=self.PAGE_LOAD_TIMEOUT)
+                try:
+                    tab.goto(url, wait_until='commit', timeout=self.budget_timeout(self.PAGE_LOAD_TIMEOUT))
+                except Exception:
+                    self.check_budget('tab open')  # a goto cut short by the budget is a timeout
+                    raise
                 tabs.append((tab, report, label, report_id, definition_hash))
+                opened_at.append(started)
                 self.logger.info(f"  Tab {i+1}: navigation started -> {label}")
 
+            except ReportTimeout as e:
+                self.logger.warning(f"  Tab {i+1}: {e} - not opened")
+                log_scrape(
+                    'smax', label, 'timeout', 0, time.time() - started, str(e),
+                    report_id=report_id, definition_hash=definition_hash,
+                )
+                flush_scrape_log()
+                report_batches.append({
+                    'report_id': report_id,
+                    'definition_hash': definition_hash,
+                    'report_name': label,
+                    'status': 'timeout',
+                    'rows': [],
+                })
             except Exception as e:
                 self.logger.error(f"  Tab {i+1}: failed to open {url}: {e}")
                 log_scrape(
                     'smax', label, 'error', 0, 0, f'Tab open failed: {e}',
                     report_id=report_id, definition_hash=definition_hash,
                 )
+                flush_scrape_log()
                 report_batches.append({
                     'report_id': report_id,
                     'definition_hash': definition_hash,
@@ -520,6 +584,7 @@ class Worker(BaseWorker):
                     'rows': [],
                 })
 
+        self.clear_report_budget()
         self.logger.info(f"All {len(tabs)} tabs opened in {time.time() - start_time:.1f}s")
         
         # ---- PHASE 2: Switch each tab to table view and wait for grid ----
@@ -528,9 +593,13 @@ class Worker(BaseWorker):
         failed_tabs = []
 
         for i, (tab, report, label, report_id, definition_hash) in enumerate(tabs):
+            self.start_report_budget(report, opened_at[i])
             try:
                 self._switch_to_table_view(tab)
                 self.logger.info(f"  Tab {i+1}: grid ready")
+            except ReportTimeout as e:
+                self.logger.warning(f"  Tab {i+1}: {e} - not retried")
+                timed_out[i] = str(e)
             except Exception as e:
                 self.logger.warning(f"  Tab {i+1}: not ready, queued for retry ({e})")
                 failed_tabs.append(i)
@@ -539,6 +608,9 @@ class Worker(BaseWorker):
         for attempt in range(1, self.MAX_RETRIES + 1):
             if not failed_tabs:
                 break
+            if self.run_deadline_passed():
+                self.logger.warning(f"Run deadline reached - not retrying {len(failed_tabs)} tab(s)")
+                break
 
             self.logger.info(f"Retrying {len(failed_tabs)} failed tab(s) (attempt {attempt}/{self.MAX_RETRIES})...")
             still_failed = []
@@ -546,47 +618,74 @@ class Worker(BaseWorker):
             for idx in failed_tabs:
                 tab, report, label, report_id, definition_hash = tabs[idx]
                 url = report.get('url', '')
+                self.start_report_budget(report, opened_at[idx])
                 try:
+                    self.check_budget('tab retry')
                     self.logger.info(f"  Tab {idx+1}: reloading {report.get('label', url.split('/')[-1])}...")
                     try:
-                        tab.goto(url, wait_until='commit', timeout=self.PAGE_LOAD_TIMEOUT)
+                        tab.goto(url, wait_until='commit', timeout=self.budget_timeout(self.PAGE_LOAD_TIMEOUT))
                     except Exception as e:
+                        self.check_budget('tab retry')
                         if not tab.url or tab.url == 'about:blank':
                             raise
                         self.logger.debug(f"  Tab {idx+1}: goto raised (expected SAML): {e}")
                     self._switch_to_table_view(tab)
                     self.logger.info(f"  Tab {idx+1}: ready after retry")
+                except ReportTimeout as e:
+                    self.logger.warning(f"  Tab {idx+1}: {e} - not retried")
+                    timed_out[idx] = str(e)
                 except Exception as e:
                     self.logger.warning(f"  Tab {idx+1}: retry failed: {e}")
                     still_failed.append(idx)
 
             failed_tabs = still_failed
+        self.clear_report_budget()
+
+        for i, reason in sorted(timed_out.items()):
+            tab, report, label, report_id, definition_hash = tabs[i]
+            log_scrape(
+                'smax', label, 'timeout', 0, time.time() - opened_at[i], reason,
+                report_id=report_id, definition_hash=definition_hash,
+            )
+            flush_scrape_log()
+            report_batches.append({
+                'report_id': report_id,
+                'definition_hash': definition_hash,
+                'report_name': label,
+                'status': 'timeout',
+                'rows': [],
+            })
 
         if failed_tabs:
             failed_labels = []
+            if self.run_deadline_passed():
+                status, reason = 'timeout', 'Run deadline reached before the grid loaded'
+            else:
+                status, reason = 'error', 'Tab failed after all retries'
             for i in failed_tabs:
                 lbl = tabs[i][2]
                 report_id = tabs[i][3]
                 definition_hash = tabs[i][4]
                 failed_labels.append(lbl)
                 log_scrape(
-                    'smax', lbl, 'error', 0, 0, 'Tab failed after all retries',
+                    'smax', lbl, status, 0, 0, reason,
                     report_id=report_id, definition_hash=definition_hash,
                 )
+                flush_scrape_log()
                 report_batches.append({
                     'report_id': report_id,
                     'definition_hash': definition_hash,
                     'report_name': lbl,
-                    'status': 'error',
+                    'status': status,
                     'rows': [],
                 })
             self.logger.warning(f"{len(failed_tabs)} tab(s) still failed: {failed_labels}")
-        failed_tab_set = set(failed_tabs)
+        failed_tab_set = set(failed_tabs) | set(timed_out)
         
         # Wait for grid to be ready rather than arbitrary timeout
         try:
             tabs[0][0].locator(self.GRID_ROW_SELECTOR).first.wait_for(
-                state='visible', timeout=5000)
+                state='visible', timeout=self.budget_timeout(5000))
         except Exception:
             pass  # Best-effort; scraping will fail clearly if grid isn't ready
         
@@ -598,8 +697,24 @@ class Worker(BaseWorker):
         for i, (tab, report, label, report_id, definition_hash) in enumerate(tabs):
             if i in failed_tab_set:
                 continue
+            if self.run_deadline_passed():
+                self.logger.warning(f"  Tab {i+1}: run deadline reached - not scraped")
+                log_scrape(
+                    'smax', label, 'timeout', 0, 0, 'Run deadline reached',
+                    report_id=report_id, definition_hash=definition_hash,
+                )
+                flush_scrape_log()
+                report_batches.append({
+                    'report_id': report_id,
+                    'definition_hash': definition_hash,
+                    'report_name': label,
+                    'status': 'timeout',
+                    'rows': [],
+                })
+                continue
             url = report.get('url', '')
             t0 = time.time()
+            self.start_report_budget(report, opened_at[i])
             try:
                 report_data = self._extract_from_page(
                     tab, url, label, report_id=report_id, definition_hash=definition_hash,
@@ -610,6 +725,7 @@ class Worker(BaseWorker):
                         'smax', label, 'success', len(report_data), elapsed, '',
                         report_id=report_id, definition_hash=definition_hash,
                     )
+                    flush_scrape_log()
                     report_batches.append({
                         'report_id': report_id,
                         'definition_hash': definition_hash,
@@ -622,6 +738,7 @@ class Worker(BaseWorker):
                         'smax', label, 'no_data', 0, elapsed, 'No data returned',
                         report_id=report_id, definition_hash=definition_hash,
                     )
+                    flush_scrape_log()
                     report_batches.append({
                         'report_id': report_id,
                         'definition_hash': definition_hash,
@@ -629,6 +746,21 @@ class Worker(BaseWorker):
                         'status': 'no_data',
                         'rows': [],
                     })
+            except ReportTimeout as e:
+                elapsed = time.time() - t0
+                self.logger.warning(f"  Tab {i+1}: {e} after {elapsed:.1f}s - moving on")
+                log_scrape(
+                    'smax', label, 'timeout', 0, elapsed, str(e),
+                    report_id=report_id, definition_hash=definition_hash,
+                )
+                flush_scrape_log()
+                report_batches.append({
+                    'report_id': report_id,
+                    'definition_hash': definition_hash,
+                    'report_name': label,
+                    'status': 'timeout',
+                    'rows': [],
+                })
             except Exception as e:
                 elapsed = time.time() - t0
                 self.logger.error(f"  Tab {i+1}: scrape failed for {label}: {e}")
@@ -636,6 +768,7 @@ class Worker(BaseWorker):
                     'smax', label, 'error', 0, elapsed, str(e),
                     report_id=report_id, definition_hash=definition_hash,
                 )
+                flush_scrape_log()
                 report_batches.append({
                     'report_id': report_id,
                     'definition_hash': definition_hash,
@@ -644,6 +777,8 @@ class Worker(BaseWorker):
                     'rows': [],
                 })
 
+        self.clear_report_budget()
+
         # ---- PHASE 4: Clean up extra tabs ----
         for i, (tab, report, label, report_id, definition_hash) in enumerate(tabs):
             if i > 0:
@@ -683,21 +818,23 @@ class Worker(BaseWorker):
             page: Playwright Page object
         """
         for sel in self.TABLE_VIEW_FALLBACKS:
+            self.check_budget('table view')
             try:
                 btn = page.locator(sel).first
                 # wait_for() blocks until the button is in the DOM — this gives
                 # Angular time to bootstrap. Do NOT use count() here: count() is
                 # an instant synchronous check that returns 0 before Angular loads,
                 # causing all fallbacks to be skipped before any waiting happens.
-                btn.wait_for(state='visible', timeout=self.ELEMENT_WAIT_TIMEOUT)
+                btn.wait_for(state='visible', timeout=self.budget_timeout(self.ELEMENT_WAIT_TIMEOUT))
                 btn.click()
                 # Wait for SlickGrid rows to render after the view switch
                 page.locator(self.GRID_ROW_SELECTOR).first.wait_for(
-                    state='visible', timeout=self.ELEMENT_WAIT_TIMEOUT)
+                    state='visible', timeout=self.budget_timeout(self.ELEMENT_WAIT_TIMEOUT))
                 self.logger.info(f"  Table view activated via: {sel}")
                 return
             except Exception:
                 continue
+        self.check_budget('table view')
         raise Exception("Table View button not found with any selector")
     
     # ============================================================
@@ -889,7 +1026,7 @@ class Worker(BaseWorker):
                 at_bottom_count = 0
                 
             # SlickGrid virtual scroll render buffer — no DOM event to wait for
-            page.wait_for_timeout(500)
+            self.budget_wait(500, 'grid scroll', page=page)
             
         return headers, collected_rows
 
@@ -1079,6 +1216,7 @@ class Worker(BaseWorker):
                         f"Failed to remove stale Chrome lock '{lock_path}': {e}"
                     ) from e
 
+        from playwright.sync_api import sync_playwright
         self._playwright = sync_playwright().start()
         headed = not headless
         # launch_persistent_context returns BrowserContext directly — no Browser object